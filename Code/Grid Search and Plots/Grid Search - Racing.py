@@ -0,0 +1,57 @@
+# Importing the necessary libraries
+from operators.crossovers import *
+from operators.mutators import *
+from algorithm.racing import configurations, successive_halving
+from base.data import *
+from base.oracle import solve_exact
+
+
+# Same parameters as the Grid Search, except the number of generations: it is the budget of the race instead, growing
+# from min_gens in the first round to max_gens in the last one
+pop_size_values = [50, 100]
+p_m_values = [0.1, 0.2, 0.35, 0.8, 0.9]
+p_c_values = [0.1, 0.2, 0.35, 0.8, 0.9]
+crossover_operators = [pmx_crossover, improved_cycle_crossover, ordered_crossover, fog_crossover, slide_crossover]
+mutation_operators = [inverted_exchange_mutation, twors_mutation, reverse_sequence_mutation,
+                      partial_shuffle_mutation]
+min_gens, max_gens = 25, 200
+
+exec_dict = {}    # Dictionary to hold the combinations and their respective values
+
+# Seeds of the datasets, and seeds given to the GA for each dataset, to guarantee that the results can be replicated
+seeds = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+run_seeds = [1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+# ---------------------------------------------- RACING SEARCH ------------------------------------------------------
+# Instead of running every combination to the end, the combinations are raced with successive halving: all of them
+# start with few generations on one seed, and only the best third goes on to the next round, with more generations
+# and seeds
+if __name__ == '__main__':
+    candidates = configurations(pop_size_values, p_m_values, p_c_values, crossover_operators, mutation_operators)
+    # Evaluations of the grid search with the same budget as the last round of the race: every combination run with
+    # max_gens generations on every seed in run_seeds
+    full_grid = sum(pop_size * (max_gens + 1) for pop_size, *_ in candidates) * len(run_seeds)
+
+    for iteration_seed in seeds:
+        best_parameters, best_run, evaluations = successive_halving(
+            iteration_seed, candidates, run_seeds, min_gens=min_gens, max_gens=max_gens, verbose=True)
+        best_fitness, best_solution, best_execution_time = \
+            best_run.best_fitness, best_run.best_solution, best_run.execution_time
+
+        fl = random_focus_gen(seed=iteration_seed)
+        optimal_solution, optimal_fitness, _ = solve_exact(fl)   # True optimum, to know how far each run is from it
+
+        # Printing at each run, the best values found for that dataset
+        print(f"Run {iteration_seed}. Best Solution: {best_solution}")
+        print(f"Run {iteration_seed}. Best Fitness Score: {best_fitness}")
+        print(f"Run {iteration_seed}. Optimal Solution: {optimal_solution}, Optimal Fitness: {optimal_fitness}")
+        print(f"Run {iteration_seed}. Optimality gap: {(best_fitness - optimal_fitness) / optimal_fitness:.2%}")
+        print(f"Run {iteration_seed}. Best Parameters: {best_parameters}")
+        print(f"Run {iteration_seed}. Execution Time: {best_execution_time}")
+        print(f"Run {iteration_seed}. Stopped by: {best_run.reason}, after generation {best_run.generation}")
+        print(f"Run {iteration_seed}. Evaluations: {evaluations}, {evaluations / full_grid:.1%} of the grid search")
+
+        # Storing the values in a dictionary, so that they can be compared later
+        exec_dict[iteration_seed] = [best_parameters, best_fitness, best_solution, best_execution_time]
+
+    print(exec_dict)  # Printing the execution dictionary, so that we can compare the results for each run
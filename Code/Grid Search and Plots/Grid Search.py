@@ -1,12 +1,10 @@
 # Importing the necessary libraries
-import time
 from operators.crossovers import *
 from operators.mutators import *
-from operators.selectors import *
-from base.individual import *
-from algorithm.algorithm import GA
-import itertools
+from algorithm.grid_search import grid_tasks, run_grid
+from algorithm.result_store import ResultStore
 from base.data import *
+from base.oracle import solve_exact
 
 
 # Defining parameters for the Grid Search
@@ -24,72 +22,43 @@ exec_dict = {}    # Dictionary to hold the combinations and their respective val
 seeds = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
 
 # ----------------------------------------------- GRID SEARCH -------------------------------------------------------
-for iteration_seed in range(1, len(seeds) + 1):
-    fl = random_focus_gen(seed=iteration_seed)
-    fit_foc_loss = calculate_pop_fit(fl)
-    # Initializing variables that will be used in the Grid Search
-    best_solution = None
-    best_fitness = float('inf')  # Initializing with infinity, so that we can never find a higher value
-    best_parameters = None
-    best_execution_time = float('inf')
-
-    for pop_size, p_m, p_c, crossover_op, mutation_op, gens \
-            in itertools.product(pop_size_values, p_m_values, p_c_values, crossover_operators, mutation_operators,
-                                 gens_values):
-        # Measure execution time for the current combination
-        start_time = time.time()
-
-        # Run the genetic algorithm with the current parameters in the iteration
-        population, fitness_scores = GA(create_population=create_pop,
-                                        evaluate_population=fit_foc_loss,
-                                        maximization=False,
-                                        gens=gens,
-                                        pop_size=pop_size,
-                                        selector=roulette_selection,
-                                        mutator=mutation_op,
-                                        crossover_operator=crossover_op,
-                                        p_c=p_c,
-                                        p_m=p_m,
-                                        elitism=True,
-                                        verbose=False,
-                                        log=False,
-                                        path=None,
-                                        seed=iteration_seed)
-
-        end_time = time.time()
-        execution_time = end_time - start_time   #Calculating the execution time for each combination
-
-        # Find the best solution and fitness value in the current population
-        min_fitness = min(fitness_scores)
-        min_index = fitness_scores.index(min_fitness)
-        solution = population[min_index]
-
-        # Check if the current solution is the best so far
-        if min_fitness < best_fitness:
-            best_fitness = min_fitness
-            best_solution = solution
-            best_parameters = (pop_size, p_m, p_c, crossover_op, mutation_op, gens)
-
-        # Check, in the case where fitness is repeated, if it has a better execution time
-        elif min_fitness == best_fitness and execution_time < best_execution_time:
-            best_solution = solution
-            best_parameters = (pop_size, p_m, p_c, crossover_op, mutation_op, gens)
-            best_execution_time = execution_time
-
-        print(f"Run {iteration_seed}. Combination: {pop_size}, {p_m}, {p_c}, {crossover_op}, {mutation_op}, {gens}")
-        print(f"Run {iteration_seed}.Execution Time: {execution_time:.2f} seconds")
-
-    # Printing at each run, the best values found for that dataset
-    print(f"Run {iteration_seed}. Best Solution: {best_solution}")
-    print(f"Run {iteration_seed}. Best Fitness Score: {best_fitness}")
-    print(f"Run {iteration_seed}. Best Parameters: {best_parameters}")
-    print(f"Run {iteration_seed}. Best Parameters: {best_execution_time}")
-
-    # Storing the values in a dictionary, so that they can be compared later
-    if iteration_seed not in exec_dict:
-        exec_dict[iteration_seed] = []
-
-    exec_dict[iteration_seed].extend([best_parameters, best_fitness, best_solution, best_execution_time])
+# The combinations are run in parallel, in a pool with one process per CPU. Each run sets its own seed, so the results
+# are the same as running them one after the other. The results are saved to a file as they arrive, so if the grid
+# search is interrupted, running it again only runs the combinations that are missing
+if __name__ == '__main__':
+    tasks = grid_tasks(seeds, pop_size_values, p_m_values, p_c_values, crossover_operators, mutation_operators,
+                       gens_values)
+
+    with ResultStore('log/grid_search.sqlite') as store:
+        pending = store.pending(tasks)
+        print(f"{len(tasks) - len(pending)} combinations already done, {len(pending)} to run")
+
+        for result in run_grid(pending):
+            store.add(*result)   # Also storing why and when the run stopped
+
+            task, execution_time = result.task, result.execution_time
+            iteration_seed, pop_size, p_m, p_c, crossover_op, mutation_op, gens, _ = task
+            print(f"Run {iteration_seed}. Combination: {pop_size}, {p_m}, {p_c}, {crossover_op}, {mutation_op}, {gens}")
+            print(f"Run {iteration_seed}.Execution Time: {execution_time:.2f} seconds")
+        store.commit()
+
+        for iteration_seed in seeds:
+            fl = random_focus_gen(seed=iteration_seed)
+            optimal_solution, optimal_fitness, _ = solve_exact(fl)   # True optimum, to know how far each run is from it
+
+            # Lowest fitness found for this dataset and, in the case of a tie, the fastest run
+            best_parameters, best_fitness, best_solution, best_execution_time = store.best_parameters(iteration_seed)
+
+            # Printing at each run, the best values found for that dataset
+            print(f"Run {iteration_seed}. Best Solution: {best_solution}")
+            print(f"Run {iteration_seed}. Best Fitness Score: {best_fitness}")
+            print(f"Run {iteration_seed}. Optimal Solution: {optimal_solution}, Optimal Fitness: {optimal_fitness}")
+            print(f"Run {iteration_seed}. Optimality gap: {(best_fitness - optimal_fitness) / optimal_fitness:.2%}")
+            print(f"Run {iteration_seed}. Best Parameters: {best_parameters}")
+            print(f"Run {iteration_seed}. Best Parameters: {best_execution_time}")
+
+            # Storing the values in a dictionary, so that they can be compared later
+            exec_dict[iteration_seed] = [best_parameters, best_fitness, best_solution, best_execution_time]
 
     print(exec_dict)  # Printing the execution dictionary, so that we can compare the results for each run
 
@@ -4,6 +4,8 @@ from operators.mutators import *
 from operators.selectors import *
 from base.individual import *
 from algorithm.algorithm import *
+from algorithm.array_algorithm import replica_GA
+from base.population import calculate_pop_fit_array
 import numpy as np
 import matplotlib.pyplot as plt
 import statistics
@@ -28,39 +30,34 @@ gens = 200
 crossover_operators = [pmx_crossover, improved_cycle_crossover, ordered_crossover, fog_crossover, slide_crossover]
 mutation_operators = [twors_mutation, reverse_sequence_mutation, inverted_exchange_mutation,
                       partial_shuffle_mutation]
-fit_foc_loss = calculate_pop_fit(focus_loss)
+fit_foc_loss = calculate_pop_fit_array(focus_loss)
 
 # Initializing everything needed
 medians = []  # List to store median fitnesses later
-convergence_list = []  # List to store convergence values for each run
 list_for_plots = []  # Initializing list to store all convergence values from all combinations and runs
 
 
 ##################################################################################################################
 # ------------------------- Convergence plots for Crossover and Mutation Operators -------------------------------
 
+# The 15 runs of each combination are evolved together by replica_GA, in a single vectorized loop
 for crossover_op, mutation_op in itertools.product(crossover_operators, mutation_operators):
-    convergence_list = []
-    for counter in range(1, 16):
-        population, fitness_scores, convergence = GA(create_population=create_pop,
-                                                     evaluate_population=fit_foc_loss,
-                                                     maximization=False,
-                                                     gens=gens,
-                                                     pop_size=pop_size,
-                                                     selector=roulette_selection,
-                                                     mutator=mutation_op,
-                                                     crossover_operator=crossover_op,
-                                                     p_c=p_c,
-                                                     p_m=p_m,
-                                                     elitism=True,
-                                                     verbose=False,
-                                                     log=False,
-                                                     path=None, return_convergence=True)
+    population, fitness_scores, convergence = replica_GA(create_population=create_pop,
+                                                         evaluate_population=fit_foc_loss,
+                                                         maximization=False,
+                                                         gens=gens,
+                                                         pop_size=pop_size,
+                                                         replicas=15,
+                                                         selector=RouletteSelection(),
+                                                         mutator=mutation_op,
+                                                         crossover_operator=crossover_op,
+                                                         p_c=p_c,
+                                                         p_m=p_m,
+                                                         elitism=True,
+                                                         return_convergence=True)
 
-        convergence_list.append(convergence)  # Appending each convergence list
-        print(f"Operator: {crossover_op} {mutation_op}")
-        print(f"Run: {counter}")
-    list_for_plots.append(convergence_list)  # Appending each list of convergences, in the proper order
+    print(f"Operator: {crossover_op} {mutation_op}")
+    list_for_plots.append(convergence.tolist())  # Appending the convergence of each run, in the proper order
 
 
 pointer = 0  # It's going to be used to access to each combination of parameters
@@ -1,7 +1,190 @@
-import csv
+import itertools
 import random
+from collections import namedtuple
 from copy import deepcopy
 import numpy as np
+from algorithm.instrumentation import no_phase
+from algorithm.log_sinks import open_sink, generation_stats, count_unique
+from base.evaluators import Deduplicator
+
+
+# State of a generation, as given by stream_GA. pop and fit_pop are the lists used by the algorithm (not copies), so
+# they should not be changed. duplicate_ratio is only set when the population is deduplicated before evaluation
+GenerationState = namedtuple('GenerationState', ['generation', 'best_genome', 'best_fitness', 'mean_fitness',
+                                                 'evaluations', 'pop', 'fit_pop', 'duplicate_ratio'],
+                             defaults=[None])
+
+
+def stream_GA(create_population,
+              evaluate_population,
+              maximization,
+              pop_size,
+              selector,
+              mutator,
+              crossover_operator,
+              p_c,
+              p_m,
+              elitism,
+              gens=None,
+              seed=None,
+              problem=None,
+              termination=None,
+              local_search=None,
+              repair=None,
+              instrumentation=None,
+              deduplicate=False):
+    """
+    Generator version of GA: each generation is only run when the next state is requested, and its state is given as
+    soon as it's evaluated. The caller can stop at any moment by not asking for more (for example with break), so no
+    generation is run after that. GA is built on top of it
+
+    Parameters:
+    --------
+        gens : integer, default None
+                    Number of generations. If None, generations are given until the caller stops or termination is met
+        Other parameters are the same as in GA.
+
+    Yields:
+    --------
+        GenerationState
+            generation, best_genome, best_fitness, mean_fitness, evaluations (individuals evaluated since the start,
+            including the first population, counting every copy), pop, fit_pop and duplicate_ratio (share of the
+            population that was a copy of another individual, only if deduplicate is True)
+
+    Returns:
+    --------
+        pop, fit_pop
+            Last population and its fitness values (the value of StopIteration), also when no generation was run
+    """
+
+    if seed is not None:     # Adding a seed, if needed
+        random.seed(seed)
+
+    # Operators only receive the problem if one is given, so that functions without that parameter can still be used
+    problem_args = {} if problem is None else {'problem': problem}
+
+    prepare_selector = getattr(selector, 'prepare', None)
+
+    # Evaluation functions with an evaluate_offspring method (see base/delta.py) update the fitness of the parents
+    evaluate_offspring = getattr(evaluate_population, 'evaluate_offspring', None)
+
+    # Evaluating each distinct genome of a generation once. Not needed when the offspring are scored from their parents
+    deduplicator = None
+    if deduplicate and evaluate_offspring is None:
+        evaluate_population = deduplicator = Deduplicator(evaluate_population)
+
+    # With an instrumentation, the operators are wrapped so that each call is measured. Without it they are used
+    # directly, so the loop does exactly the same work as before
+    phase = no_phase
+    if instrumentation is not None:
+        phase = instrumentation.phase
+        crossover_operator = instrumentation.timed('crossover', crossover_operator)
+        mutator = instrumentation.timed('mutation', mutator)
+        if repair is not None:
+            repair = instrumentation.timed('repair', repair)
+        if local_search is not None:
+            local_search = instrumentation.timed('local_search', local_search)
+        if prepare_selector is not None:
+            prepare_selector = instrumentation.timed('selection', prepare_selector)
+        evaluate_population = instrumentation.timed_evaluation(evaluate_population)
+        if evaluate_offspring is not None:
+            evaluate_offspring = instrumentation.timed_evaluation(evaluate_offspring)
+
+    # Creating the first population
+    pop = create_population(population_size=pop_size, **problem_args)
+
+    # Calculating population fitness
+    fit_pop = evaluate_population(pop)
+    evaluations = len(pop)
+
+    if termination is not None:
+        termination.start()
+
+    for it in (range(gens) if gens is not None else itertools.count()):
+
+        if instrumentation is not None:
+            instrumentation.generation_start(it)
+
+        off_pop = []   # Initializing the offspring list
+        parents, changes = [], []   # Parent and changed positions of each offspring, only used by evaluate_offspring
+
+        # Selectors with a prepare method (see operators/selectors.py) build their structure once per generation and
+        # then draw each parent cheaply. Plain functions are called with the whole population each time
+        if prepare_selector is not None:
+            select = prepare_selector(pop, fit_pop).select
+        else:
+            select = lambda: selector(pop, fit_pop)
+        if instrumentation is not None:
+            select = instrumentation.timed('selection', select)
+
+        while len(off_pop) < len(pop):     # Repeating the process until we have a population of offspring of the same
+            # size as the original
+
+            p1, p2 = select(), select()    # Selecting the parents
+
+            if random.random() < p_c:   # See if a crossover is applied
+                o1, o2 = crossover_operator(p1[:-1], p2[:-1], **problem_args)    # Getting the offspring from the crossover operator
+                # We do not provide room H to the crossover operator since it always needs to be at the end
+                parent1 = parent2 = None
+            else:
+                o1, o2 = deepcopy(p1), deepcopy(p2)    # If crossover is not applied, copying parents to next population
+                parent1, parent2 = p1, p2
+
+            # Not providing the last room, as it needs to always be 7 (room H)
+            if evaluate_offspring is None:
+                o1, o2 = mutator(o1[:-1], p_m, **problem_args), mutator(o2[:-1], p_m, **problem_args)    # Applying mutation operator
+            else:   # Also getting the positions changed by the mutation
+                changed1, changed2 = [], []
+                o1 = mutator(o1[:-1], p_m, changed=changed1, **problem_args)
+                o2 = mutator(o2[:-1], p_m, changed=changed2, **problem_args)
+                parents.extend([parent1, parent2])
+                changes.extend([changed1, changed2])
+
+            if repair is not None:   # Making each offspring valid, also getting the positions it changes if needed
+                if evaluate_offspring is None:
+                    o1, o2 = repair(o1), repair(o2)
+                else:
+                    o1, o2 = repair(o1, changed=changes[-2]), repair(o2, changed=changes[-1])
+
+            if local_search is not None:   # Improving each offspring, also getting the positions it changes if needed
+                if evaluate_offspring is None:
+                    o1, o2 = local_search(o1), local_search(o2)
+                else:
+                    o1, o2 = local_search(o1, changed=changes[-2]), local_search(o2, changed=changes[-1])
+
+            off_pop.extend([o1, o2])    # Adding the offspring to the new population
+
+        if elitism:    # Passing the best individuals to the next generation, to avoid losing them, if elitism = True
+            with phase('elitism'):
+                if maximization:
+                    off_pop[-1] = pop[np.argmax(fit_pop)]
+                else:
+                    off_pop[-1] = pop[np.argmin(fit_pop)]
+                if evaluate_offspring is not None:   # The best individual is not changed
+                    parents[-1], changes[-1] = off_pop[-1], []
+
+        pop = off_pop  # Replacing the old population with the new one
+
+        if evaluate_offspring is None:
+            fit_pop = evaluate_population(pop)    # Evaluating the new population
+        else:
+            fit_pop = evaluate_offspring(pop, parents, changes)
+        evaluations += len(pop)
+
+        # Giving the state of the generation. The caller runs (its logging, for example) before the generation ends
+        best = int(np.argmax(fit_pop)) if maximization else int(np.argmin(fit_pop))
+        duplicate_ratio = None if deduplicator is None else deduplicator.last_ratio
+        yield GenerationState(it, pop[best], fit_pop[best], sum(fit_pop) / len(fit_pop), evaluations, pop, fit_pop,
+                              duplicate_ratio)
+
+        if instrumentation is not None:
+            instrumentation.generation_end(it, pop, fit_pop)
+
+        # Stopping early if any of the termination criteria is met
+        if termination is not None and termination.update(it, fit_pop, evaluations, maximization):
+            break
+
+    return pop, fit_pop
 
 
 def GA(create_population,
@@ -19,7 +202,13 @@ def GA(create_population,
        log,
        path,
        seed=None,
-       return_convergence=False):    # Return converge will only be used to plot convergence
+       return_convergence=False,    # Return converge will only be used to plot convergence
+       problem=None,
+       termination=None,
+       local_search=None,
+       repair=None,
+       instrumentation=None,
+       deduplicate=False):
 
     """
     Returns the offspring after applying an improved cycle crossover
@@ -29,7 +218,9 @@ def GA(create_population,
         create_population : function
                     function that will create a population
         evaluate_population : function
-                    function that will return the fitness of a population
+                    function that will return the fitness of a population. If it has an evaluate_offspring method (such
+                    as DeltaFitness), the offspring that are mutated copies of their parents are scored from the
+                    positions changed by the mutator, which then needs to accept the changed parameter
         maximization : Boolean
                     Boolean value to indicate if it's a maximization (True) or minimization (False) problem.
         gens : integer
@@ -37,7 +228,8 @@ def GA(create_population,
         pop_size : integer
                     Number indicating the size of a population
         selector : function
-                    function to select individuals from the population
+                    function to select individuals from the population, or a selection object with prepare and select
+                    methods (such as RouletteSelection), that is prepared once per generation
         mutator : function
                     function that performs mutation on an individual
         crossover_operator : function
@@ -51,15 +243,36 @@ def GA(create_population,
         verbose : Boolean
                     Indicates if there should be information printed (True), or not (False), on each generation and
                     final solution
-        log : Boolean
-                    Indicates if the values at each generation should be stored in a csv file
+        log : Boolean or LogSink
+                    Indicates if the values at each generation should be stored in a csv file. A sink from
+                    algorithm/log_sinks.py can be given instead, to store the statistics of each generation (best, mean,
+                    std, worst and number of unique individuals) in memory, in a csv file or in binary columns
         path : string
-                    Path of the location of the csv file that will store fitness values of each generation
+                    Path of the location of the csv file that will store fitness values of each generation, only used if
+                    log is True
         seed : integer, default None
                     If indicated, it will help set the random.seed value, so that results can be replicated
         return_convergence : Boolean, default False
                     Indicates if fitness values at each iteration should be return. They can later be used for
                     convergence plots
+        problem : Problem, default None
+                    Definition of the rooms and of the rules a valid individual needs to follow. If indicated, it's
+                    passed to create_population, crossover_operator and mutator, otherwise they use their default
+        termination : Termination, default None
+                    Criteria to stop before gens generations (see algorithm/termination.py). After the run, it records
+                    why and when the run stopped
+        local_search : function, default None
+                    If indicated, it's applied to each offspring after the mutation, such as a LocalSearch (see
+                    operators/local_search.py), turning the GA into a memetic algorithm
+        repair : function, default None
+                    If indicated, it's applied to each offspring after the mutation (and before local_search), such as
+                    a ConstraintModel (see base/constraints.py), so that no offspring needs to get the penalty
+        instrumentation : Instrumentation, default None
+                    If indicated, the time and number of calls of each phase of the generations are measured, and its
+                    hooks are called (see algorithm/instrumentation.py). Without it, nothing is measured
+        deduplicate : Boolean, default False
+                    If True, each distinct individual of a generation is evaluated only once, and its fitness is given
+                    to its copies (see Deduplicator in base/evaluators.py). Not used with an evaluate_offspring method
 
     Returns:
     --------
@@ -73,74 +286,64 @@ def GA(create_population,
     if return_convergence:
         convergence = []     # Initializing the list to store convergence, in the case that it is needed
 
-    if seed is not None:     # Adding a seed, if needed
-        random.seed(seed)
-
-    # Making sure that a path is provided if we want to log the results
-    if log and path == None:
-        raise Exception('If log is True then a valid path should be provided')
-
-    # Creating the first population
-    pop = create_population(population_size=pop_size)
-
-    # Calculating population fitness
-    fit_pop = evaluate_population(pop)
-
-    for it in range(gens):
-
-        off_pop = []   # Initializing the offspring list
-
-        while len(off_pop) < len(pop):     # Repeating the process until we have a population of offspring of the same
-            # size as the original
-
-            p1, p2 = selector(pop, fit_pop), selector(pop, fit_pop)    # Selecting the parents
-
-            if random.random() < p_c:   # See if a crossover is applied
-                o1, o2 = crossover_operator(p1[:-1], p2[:-1])    # Getting the offspring from the crossover operator
-                # We do not provide room H to the crossover operator since it always needs to be at the end
-            else:
-                o1, o2 = deepcopy(p1), deepcopy(p2)    # If crossover is not applied, copying parents to next population
-
-            # Not providing the last room, as it needs to always be 7 (room H)
-            o1, o2 = mutator(o1[:-1], p_m), mutator(o2[:-1], p_m)    # Applying mutation operator
+    # Getting where to log the results (making sure that a path is provided if log is True). Rows are buffered, so the
+    # file is not opened at every generation
+    sink = open_sink(log, path)
+    phase = no_phase if instrumentation is None else instrumentation.phase
 
-            off_pop.extend([o1, o2])    # Adding the offspring to the new population
+    generations = stream_GA(create_population=create_population,
+                            evaluate_population=evaluate_population,
+                            maximization=maximization,
+                            pop_size=pop_size,
+                            selector=selector,
+                            mutator=mutator,
+                            crossover_operator=crossover_operator,
+                            p_c=p_c,
+                            p_m=p_m,
+                            elitism=elitism,
+                            gens=gens,
+                            seed=seed,
+                            problem=problem,
+                            termination=termination,
+                            local_search=local_search,
+                            repair=repair,
+                            instrumentation=instrumentation,
+                            deduplicate=deduplicate)
 
-        if elitism:    # Passing the best individuals to the next generation, to avoid losing them, if elitism = True
-            if maximization:
-                off_pop[-1] = pop[np.argmax(fit_pop)]
-            else:
-                off_pop[-1] = pop[np.argmin(fit_pop)]
+    # The buffered rows are written even if a generation fails, so the log has every generation that finished
+    try:
+        while True:
+            try:
+                state = next(generations)
+            except StopIteration as stop:   # The generator returns the last population
+                pop, fit_pop = stop.value
+                break
+            it, pop, fit_pop = state.generation, state.pop, state.fit_pop
 
-        pop = off_pop  # Replacing the old population with the new one
-
-        fit_pop = evaluate_population(pop)    # Evaluating the new population
+            with phase('logging'):
+                if verbose:   # Print the best fitness at each generation if verbose
 
-        if verbose:   # Print the best fitness at each generation if verbose
+                    if maximization:   # Case for maximization problem
+                        print(f'     {it}       |       {max(fit_pop)}      ')
+                        print('-' * 32)
 
-            if maximization:   # Case for maximization problem
-                print(f'     {it}       |       {max(fit_pop)}      ')
-                print('-' * 32)
+                    else:       # Case of minimization problem, which is our case
+                        print(f'     {it}       |       {min(fit_pop)}      ')
+                        print('-' * 32)
 
-            else:       # Case of minimization problem, which is our case
-                print(f'     {it}       |       {min(fit_pop)}      ')
-                print('-' * 32)
+                if sink is not None:  # Storing the statistics of each generation, if there is a log
+                    # Counting the unique individuals only if the sink stores them
+                    unique = count_unique(pop) if 'unique' in sink.columns else None
+                    sink.write(generation_stats(it, fit_pop, unique, maximization))
 
-        if log:  # Storing the best results at each generation if log = True
-            if maximization:
-                with open(path, 'a', newline='') as file:
-                    writer = csv.writer(file)
-                    writer.writerow([it, max(fit_pop)])
-            else:
-                with open(path, 'a', newline='') as file:
-                    writer = csv.writer(file)
-                    writer.writerow([it, min(fit_pop)])
-
-        if return_convergence:    # If convergence, appending the best fitness at each generation
-            if maximization:
-                convergence.append(max(fit_pop))
-            else:
-                convergence.append(min(fit_pop))
+                if return_convergence:    # If convergence, appending the best fitness at each generation
+                    if maximization:
+                        convergence.append(max(fit_pop))
+                    else:
+                        convergence.append(min(fit_pop))
+    finally:
+        if sink is not None:
+            sink.flush()
 
     if verbose:
         print('Final solution:', pop[fit_pop.index(min(fit_pop))])
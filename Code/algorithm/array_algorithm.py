@@ -0,0 +1,354 @@
+import random
+import numpy as np
+from algorithm.log_sinks import open_sink, generation_stats, count_unique
+from base.population import encode_pop, decode_pop
+from base.problem import DEFAULT_PROBLEM
+from base.workspace import Workspace
+from operators.batch_crossovers import BATCH_CROSSOVERS
+from operators.batch_mutators import BATCH_MUTATORS
+from operators.selectors import roulette_selection, RouletteSelection
+
+
+def array_GA(create_population,
+             evaluate_population,
+             maximization,
+             gens,
+             pop_size,
+             selector,
+             mutator,
+             crossover_operator,
+             p_c,
+             p_m,
+             elitism,
+             verbose,
+             log,
+             path,
+             seed=None,
+             return_convergence=False,
+             problem=None,
+             termination=None):
+    """
+    Array version of GA, with the same parameters. The population is kept in the array representation of
+    base/population.py, in two preallocated buffers: the offspring of each generation are written into the buffer that
+    is not in use, and the buffers are swapped at the end of the generation. The final room (room H) is written only
+    once, when the buffers are created, and the operators work on a view without it, so it never needs to be appended
+    again.
+    Selection, crossover and mutation are applied to the whole generation at once.
+    After the first generation no array is created: the selected parents are copied into the offspring buffer, the
+    batch operators write into arrays of a Workspace and into preallocated offspring arrays (crossover is applied to
+    every pair, and only the pairs drawn with probability p_c are copied back), and the functions made by
+    calculate_pop_fit_array score the offspring directly into the fitness buffer (their score_into attribute). Measured
+    with tracemalloc, a generation allocates a few kilobytes of small numpy objects, whatever the size of the
+    population (see tests/test_array_algorithm.py). Selectors without select_into, operators that are not in
+    operators/batch_crossovers.py and operators/batch_mutators.py and other evaluation functions still work, creating
+    their own arrays
+
+    Parameters:
+    --------
+        create_population : function
+                    function that will create a population (list of lists), used for the first generation
+        evaluate_population : function
+                    function that will return the fitness of a population given as a (rooms, skip) tuple, such as the
+                    ones created by calculate_pop_fit_array
+        selector : object
+                    selection with a select_into method, or with prepare and select_indices methods (see
+                    operators/selectors.py). roulette_selection is replaced by RouletteSelection
+        mutator : function
+                    batch mutator (see operators/batch_mutators.py), or one of the mutators in operators/mutators.py
+        crossover_operator : function
+                    batch crossover (see operators/batch_crossovers.py), or one of the crossovers in
+                    operators/crossovers.py
+        seed : integer, default None
+                    If indicated, it seeds both random (used to create the first population) and the numpy generator
+                    used by the operators
+        termination : Termination, default None
+                    Criteria to stop before gens generations (see algorithm/termination.py)
+        Other parameters are the same as in GA.
+
+    Returns:
+    --------
+        pop, fit_pop
+            Lists with population and its fitness values
+        convergence
+            Only if return_convergence is True
+            List with best fitness at each generation
+    """
+    if return_convergence:
+        convergence = []
+
+    if seed is not None:
+        random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    sink = open_sink(log, path)
+
+    problem_args = {} if problem is None else {'problem': problem}
+    problem = problem or DEFAULT_PROBLEM
+
+    # Accepting the list operators, using their batch versions
+    crossover_operator = BATCH_CROSSOVERS.get(crossover_operator, crossover_operator)
+    mutator = BATCH_MUTATORS.get(mutator, mutator)
+    if selector is roulette_selection:
+        selector = RouletteSelection()
+
+    n_pairs = (pop_size + 1) // 2
+    capacity = 2 * n_pairs   # With an odd size, the second offspring of the last pair is written but not used
+
+    # Two buffers for the rooms, the skipped rooms and the fitness. cur is the population, the other one the offspring
+    rooms = np.empty((2, capacity, problem.size), dtype=np.int64)
+    skip = np.zeros((2, capacity, problem.size), dtype=bool)
+    fitness = np.empty((2, capacity))
+    rooms[:, :, -1] = problem.final_room   # Written once, never changed by the operators
+
+    first_rooms, first_skip = encode_pop(create_population(population_size=pop_size, **problem_args), problem)
+    rooms[0, :pop_size], skip[0, :pop_size] = first_rooms, first_skip
+    fitness[0, :pop_size] = evaluate_population((rooms[0, :pop_size], skip[0, :pop_size]))
+    evaluations = pop_size
+    cur = 0
+
+    if termination is not None:
+        termination.start()
+
+    best = np.argmax if maximization else np.argmin
+
+    # Arrays reused at every generation: the parents (the first one of each pair in the even positions), the random
+    # draws, and the offspring of the crossover, before the pairs that are crossed are copied into the buffer
+    workspace = Workspace()
+    parents = np.empty(capacity, dtype=np.int64)
+    draws = np.empty(capacity)
+    crossed = np.empty(n_pairs, dtype=bool)
+    mutate = np.empty(capacity, dtype=bool)
+    children = tuple((np.empty((n_pairs, problem.size - 1), dtype=np.int64),
+                      np.empty((n_pairs, problem.size - 1), dtype=bool)) for _ in range(2))
+    batch_crossover = crossover_operator in BATCH_CROSSOVERS.values()
+    batch_mutator = mutator in BATCH_MUTATORS.values()
+    select_into = getattr(selector, 'select_into', None)
+    score_into = getattr(evaluate_population, 'score_into', None)
+
+    # The buffered rows are written even if a generation fails, so the log has every generation that finished
+    try:
+        for it in range(gens):
+            nxt = 1 - cur
+            pop_rooms, pop_skip, fit_pop = rooms[cur, :pop_size], skip[cur, :pop_size], fitness[cur, :pop_size]
+            off_rooms, off_skip = rooms[nxt], skip[nxt]
+
+            # Selecting the parents of every pair at once
+            if select_into is not None:
+                select_into(fit_pop, parents, rng, workspace)
+            else:
+                selector.prepare(pop_rooms, fit_pop)
+                parents[0::2] = selector.select_indices(n_pairs, rng)
+                parents[1::2] = selector.select_indices(n_pairs, rng)
+
+            # By default the parents are copied to the offspring buffer (the case where crossover is not applied)
+            np.take(pop_rooms, parents, axis=0, out=off_rooms, mode='clip')
+            np.take(pop_skip, parents, axis=0, out=off_skip, mode='clip')
+
+            # Replacing the pairs where crossover is applied by their offspring (without room H)
+            rng.random(out=draws[:n_pairs])
+            np.less(draws[:n_pairs], p_c, out=crossed)
+            if batch_crossover:
+                if crossed.any():
+                    crossover_operator((off_rooms[0::2, :-1], off_skip[0::2, :-1]),
+                                       (off_rooms[1::2, :-1], off_skip[1::2, :-1]),
+                                       rng, problem, children, workspace)
+                    crossed_rows = workspace.by_row('crossed_rows', crossed, problem.size - 1)
+                    for first, (child_rooms, child_skip) in enumerate(children):
+                        np.copyto(off_rooms[first::2, :-1], child_rooms, where=crossed_rows)
+                        np.copyto(off_skip[first::2, :-1], child_skip, where=crossed_rows)
+            else:
+                pairs = np.nonzero(crossed)[0]
+                if len(pairs):
+                    (o1_rooms, o1_skip), (o2_rooms, o2_skip) = crossover_operator(
+                        (off_rooms[2 * pairs, :-1], off_skip[2 * pairs, :-1]),
+                        (off_rooms[2 * pairs + 1, :-1], off_skip[2 * pairs + 1, :-1]),
+                        rng, problem)
+                    off_rooms[2 * pairs, :-1], off_skip[2 * pairs, :-1] = o1_rooms, o1_skip
+                    off_rooms[2 * pairs + 1, :-1], off_skip[2 * pairs + 1, :-1] = o2_rooms, o2_skip
+
+            # Mutating in place, on the view without room H
+            rng.random(out=draws)
+            np.less(draws, p_m, out=mutate)
+            if batch_mutator:
+                mutator(off_rooms[:, :-1], off_skip[:, :-1], mutate, rng, workspace)
+            else:
+                mutator(off_rooms[:, :-1], off_skip[:, :-1], mutate, rng)
+
+            if elitism:    # Passing the best individual to the last position of the next generation
+                elite = best(fit_pop)
+                off_rooms[pop_size - 1] = pop_rooms[elite]
+                off_skip[pop_size - 1] = pop_skip[elite]
+
+            if score_into is not None:
+                score_into(off_rooms[:pop_size], off_skip[:pop_size], fitness[nxt, :pop_size], workspace)
+            else:
+                fitness[nxt, :pop_size] = evaluate_population((off_rooms[:pop_size], off_skip[:pop_size]))
+            evaluations += pop_size
+            cur = nxt   # Swapping the buffers
+
+            best_fitness = fitness[cur, best(fitness[cur, :pop_size])]
+
+            if verbose:
+                print(f'     {it}       |       {best_fitness}      ')
+                print('-' * 32)
+
+            if sink is not None:
+                unique = None
+                if 'unique' in sink.columns:
+                    unique = count_unique((rooms[cur, :pop_size], skip[cur, :pop_size]))
+                sink.write(generation_stats(it, fitness[cur, :pop_size], unique, maximization))
+
+            if return_convergence:
+                convergence.append(best_fitness)
+
+            if termination is not None and termination.update(it, fitness[cur, :pop_size], evaluations, maximization):
+                break
+    finally:
+        if sink is not None:
+            sink.flush()
+
+    pop = decode_pop(rooms[cur, :pop_size], skip[cur, :pop_size], problem)
+    fit_pop = fitness[cur, :pop_size].tolist()
+
+    if verbose:
+        print('Final solution:', pop[fit_pop.index(min(fit_pop))])
+        print('Best fitness:', min(fit_pop))
+
+    if return_convergence:
+        return pop, fit_pop, convergence
+    else:
+        return pop, fit_pop
+
+
+def replica_GA(create_population,
+               evaluate_population,
+               maximization,
+               gens,
+               pop_size,
+               replicas,
+               selector,
+               mutator,
+               crossover_operator,
+               p_c,
+               p_m,
+               elitism,
+               verbose=False,
+               seed=None,
+               return_convergence=False,
+               problem=None):
+    """
+    Runs replicas independent runs of array_GA in lockstep, instead of one after the other. The populations are kept in
+    (replicas, pop_size, n_rooms) buffers, and each step of a generation is applied to every replica at once: the
+    parents are selected inside their own population with select_replica_indices, and the crossover, the mutation and
+    the evaluation see all the replicas as a single population of replicas * pop_size rows, since they work row by row.
+    The replicas only differ in their random numbers, so the results are those of replicas runs with different seeds
+
+    Parameters:
+    --------
+        replicas : integer
+                    Number of independent runs
+        selector : object
+                    selection with a select_replica_indices method (see operators/selectors.py).
+                    roulette_selection is replaced by RouletteSelection
+        seed : integer, default None
+                    If indicated, it seeds both random (used to create the first populations) and the numpy generator
+                    used by the operators, fixing the results of every replica
+        Other parameters are the same as in array_GA.
+
+    Returns:
+    --------
+        pops, fit_pops
+            List with the final population of each replica, and (replicas, pop_size) array with their fitness values
+        convergence
+            Only if return_convergence is True
+            (replicas, gens) array with the best fitness of each replica at each generation
+    """
+    if seed is not None:
+        random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    problem_args = {} if problem is None else {'problem': problem}
+    problem = problem or DEFAULT_PROBLEM
+
+    crossover_operator = BATCH_CROSSOVERS.get(crossover_operator, crossover_operator)
+    mutator = BATCH_MUTATORS.get(mutator, mutator)
+    if selector is roulette_selection:
+        selector = RouletteSelection()
+
+    n_pairs = (pop_size + 1) // 2
+    capacity = 2 * n_pairs
+    size = problem.size
+
+    rooms = np.empty((2, replicas, capacity, size), dtype=np.int64)
+    skip = np.zeros((2, replicas, capacity, size), dtype=bool)
+    fitness = np.empty((2, replicas, pop_size))
+    rooms[:, :, :, -1] = problem.final_room
+
+    for replica in range(replicas):
+        first_rooms, first_skip = encode_pop(create_population(population_size=pop_size, **problem_args), problem)
+        rooms[0, replica, :pop_size], skip[0, replica, :pop_size] = first_rooms, first_skip
+
+    def evaluate(buffer):
+        # Every replica is scored in a single call, as one population
+        flat_rooms = rooms[buffer, :, :pop_size].reshape(-1, size)
+        flat_skip = skip[buffer, :, :pop_size].reshape(-1, size)
+        fitness[buffer] = np.reshape(evaluate_population((flat_rooms, flat_skip)), (replicas, pop_size))
+
+    evaluate(0)
+    cur = 0
+
+    best = np.argmax if maximization else np.argmin
+    every = np.arange(replicas)
+    convergence = np.empty((replicas, gens))
+
+    for it in range(gens):
+        nxt = 1 - cur
+        pop_rooms, pop_skip, fit_pop = rooms[cur, :, :pop_size], skip[cur, :, :pop_size], fitness[cur]
+        off_rooms, off_skip = rooms[nxt], skip[nxt]
+
+        # Selecting the parents of every pair of every replica, each one inside its own population
+        parents1 = selector.select_replica_indices(fit_pop, n_pairs, rng)
+        parents2 = selector.select_replica_indices(fit_pop, n_pairs, rng)
+
+        off_rooms[:, 0::2] = np.take_along_axis(pop_rooms, parents1[:, :, None], axis=1)
+        off_rooms[:, 1::2] = np.take_along_axis(pop_rooms, parents2[:, :, None], axis=1)
+        off_skip[:, 0::2] = np.take_along_axis(pop_skip, parents1[:, :, None], axis=1)
+        off_skip[:, 1::2] = np.take_along_axis(pop_skip, parents2[:, :, None], axis=1)
+
+        # The crossed pairs of all the replicas go to the crossover together
+        replica, pair = np.nonzero(rng.random((replicas, n_pairs)) < p_c)
+        if len(pair):
+            first, second = parents1[replica, pair], parents2[replica, pair]
+            (o1_rooms, o1_skip), (o2_rooms, o2_skip) = crossover_operator(
+                (pop_rooms[replica, first, :-1], pop_skip[replica, first, :-1]),
+                (pop_rooms[replica, second, :-1], pop_skip[replica, second, :-1]),
+                rng, problem)
+            off_rooms[replica, 2 * pair, :-1], off_skip[replica, 2 * pair, :-1] = o1_rooms, o1_skip
+            off_rooms[replica, 2 * pair + 1, :-1], off_skip[replica, 2 * pair + 1, :-1] = o2_rooms, o2_skip
+
+        # The buffers are contiguous, so the flattened arrays are views and the mutation is still in place
+        mutator(off_rooms.reshape(-1, size)[:, :-1], off_skip.reshape(-1, size)[:, :-1],
+                rng.random(replicas * capacity) < p_m, rng)
+
+        if elitism:    # Passing the best individual of each replica to the last position of its next generation
+            elite = best(fit_pop, axis=1)
+            off_rooms[:, pop_size - 1] = pop_rooms[every, elite]
+            off_skip[:, pop_size - 1] = pop_skip[every, elite]
+
+        evaluate(nxt)
+        cur = nxt
+
+        convergence[:, it] = fitness[cur, every, best(fitness[cur], axis=1)]
+
+        if verbose:
+            print(f'     {it}       |       {convergence[:, it].tolist()}      ')
+            print('-' * 32)
+
+    pops = [decode_pop(rooms[cur, replica, :pop_size], skip[cur, replica, :pop_size], problem)
+            for replica in range(replicas)]
+    fit_pops = fitness[cur].copy()
+
+    if return_convergence:
+        return pops, fit_pops, convergence
+    else:
+        return pops, fit_pops
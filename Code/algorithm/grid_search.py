@@ -0,0 +1,171 @@
+import copy
+import itertools
+import math
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from algorithm.algorithm import GA
+from base.cache import FitnessCache
+from base.data import random_focus_gen
+from base.individual import create_pop
+from base.oracle import EXACT_MAX_ROOMS, solve_exact
+from base.population import calculate_pop_fit_array
+from base.problem import DEFAULT_PROBLEM
+from operators.selectors import RouletteSelection
+
+# Result of a task of the grid search. reason, generation and evaluations tell why and when the run stopped: reason is
+# the name of the termination criterion that stopped it, 'generations' if it ran every generation, or 'exact' if the
+# instance was solved by enumeration instead of the GA
+RunResult = namedtuple('RunResult', ['task', 'best_fitness', 'best_solution', 'execution_time', 'reason', 'generation',
+                                     'evaluations'])
+
+# Datasets already created in this process, one for each instance seed, so the tasks on the same dataset only create it
+# once. The fitness cache is not kept here: each task gets its own (see run_task)
+_focus_losses = {}
+
+
+def grid_tasks(instance_seeds, pop_size_values, p_m_values, p_c_values, crossover_operators, mutation_operators,
+               gens_values, run_seed=None):
+    """
+    Returns every combination of the grid, in the same order as the loops of the original grid search
+    --------
+    Parameters:
+        instance_seeds : list
+                Seeds given to random_focus_gen to create each dataset
+        pop_size_values, p_m_values, p_c_values, crossover_operators, mutation_operators, gens_values : list
+                Values to be tested for each parameter of the GA
+        run_seed : integer, default None
+                Seed given to the GA. If None, the seed of the instance is used (as in the original grid search)
+    Returns:
+        list
+            List of tasks, each one a tuple (instance_seed, pop_size, p_m, p_c, crossover_op, mutation_op, gens, run_seed)
+    """
+    tasks = []
+    for instance_seed in instance_seeds:
+        for pop_size, p_m, p_c, crossover_op, mutation_op, gens \
+                in itertools.product(pop_size_values, p_m_values, p_c_values, crossover_operators, mutation_operators,
+                                     gens_values):
+            seed = instance_seed if run_seed is None else run_seed
+            tasks.append((instance_seed, pop_size, p_m, p_c, crossover_op, mutation_op, gens, seed))
+    return tasks
+
+
+def _evaluator(instance_seed):
+    """
+    Returns a new evaluation function for an instance, with an empty fitness cache. The dataset is created only the
+    first time it's needed in this process
+    """
+    if instance_seed not in _focus_losses:
+        _focus_losses[instance_seed] = random_focus_gen(seed=instance_seed)
+    return calculate_pop_fit_array(_focus_losses[instance_seed], cache=FitnessCache(maxsize=20000))
+
+
+def run_task(task, selector=None, termination=None, exact=False):
+    """
+    Runs the GA for one combination of the grid. The GA is always seeded with the seed of the task, and it gets a new
+    fitness cache, so neither the result nor the execution time depend on the process it runs in, or on the other tasks
+    that ran before it (a cache shared with them would make a task faster when it follows a similar one, and
+    execution_time breaks ties in ResultStore.best_parameters)
+    --------
+    Parameters:
+        task : tuple
+                (instance_seed, pop_size, p_m, p_c, crossover_op, mutation_op, gens, run_seed), as given by grid_tasks
+        selector : function, default None
+                function to select individuals from the population. If None, a new RouletteSelection is used. Like
+                termination, each task uses its own copy
+        termination : Termination, default None
+                Criteria to stop the GA before its last generation (see algorithm/termination.py). Each task uses its
+                own copy, so the object given is not changed
+        exact : Boolean, default False
+                If True and the instance is small enough to be enumerated (see base/oracle.py), the GA is skipped and
+                the optimum found by solve_exact is returned, with every valid individual counted as evaluated
+    Returns:
+        RunResult
+            task, best_fitness, best_solution, execution_time, reason, generation and evaluations
+    """
+    instance_seed, pop_size, p_m, p_c, crossover_op, mutation_op, gens, run_seed = task
+    if exact and DEFAULT_PROBLEM.size <= EXACT_MAX_ROOMS:
+        start_time = time.time()
+        best_solution, best_fitness, fitness_scores = solve_exact(random_focus_gen(seed=instance_seed))
+        return RunResult(task, best_fitness, best_solution, time.time() - start_time, 'exact', None,
+                         len(fitness_scores))
+
+    evaluate_population = _evaluator(instance_seed)
+    selector = RouletteSelection() if selector is None else copy.deepcopy(selector)   # Selectors keep state
+    termination = copy.deepcopy(termination)
+
+    start_time = time.time()
+    population, fitness_scores = GA(create_population=create_pop,
+                                    evaluate_population=evaluate_population,
+                                    maximization=False,
+                                    gens=gens,
+                                    pop_size=pop_size,
+                                    selector=selector,
+                                    mutator=mutation_op,
+                                    crossover_operator=crossover_op,
+                                    p_c=p_c,
+                                    p_m=p_m,
+                                    elitism=True,
+                                    verbose=False,
+                                    log=False,
+                                    path=None,
+                                    seed=run_seed,
+                                    termination=termination)
+    execution_time = time.time() - start_time
+
+    best_fitness = min(fitness_scores)
+    best_solution = population[fitness_scores.index(best_fitness)]
+    if termination is None:   # Every generation was run, with the first population and the offspring of each one
+        reason, generation, evaluations = 'generations', gens - 1, pop_size * (gens + 1)
+    else:
+        reason, generation, evaluations = termination.reason, termination.generation, termination.evaluations
+    return RunResult(task, best_fitness, best_solution, execution_time, reason, generation, evaluations)
+
+
+def _run_chunk(chunk, selector, termination, exact):
+    """
+    Runs a list of tasks in a worker process, so that each message between processes carries many tasks
+    """
+    return [run_task(task, selector, termination, exact) for task in chunk]
+
+
+def run_grid(tasks, workers=None, chunksize=None, selector=None, termination=None, exact=False):
+    """
+    Runs the tasks of a grid search in a pool of processes, returning each result as soon as its chunk is finished.
+    Since every task sets its own seed, the results are the same as running the tasks one after the other, only the
+    order in which they are returned changes
+    --------
+    Parameters:
+        tasks : list
+                Tasks to run, as given by grid_tasks
+        workers : integer, default None
+                Number of processes. If None, the number of CPUs is used. With 1, the tasks run in this process
+        chunksize : integer, default None
+                Number of tasks sent to a process at a time. If None, each process gets around 4 chunks
+        selector : function, default None
+                function to select individuals from the population. If None, each task uses a new RouletteSelection
+        termination : Termination, default None
+                Criteria to stop each GA before its last generation, for example Termination(Stagnation(20))
+        exact : Boolean, default False
+                If True, instances small enough to be enumerated are solved by solve_exact instead of the GA
+    Returns:
+        generator
+            Generator of RunResult, in the order they finish
+    """
+    tasks = list(tasks)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:   # No need for a pool, running everything in order in this process
+        for task in tasks:
+            yield run_task(task, selector, termination, exact)
+        return
+
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(tasks) / (workers * 4)))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, tasks[i:i + chunksize], selector, termination, exact)
+                   for i in range(0, len(tasks), chunksize)]
+        for future in as_completed(futures):
+            yield from future.result()
@@ -0,0 +1,130 @@
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+# Order in which the phases of a generation are reported
+PHASES = ('selection', 'crossover', 'mutation', 'repair', 'local_search', 'evaluation', 'elitism', 'logging')
+
+
+def no_phase(name):
+    """
+    Used by GA instead of Instrumentation.phase when there is no instrumentation, so nothing is measured
+    """
+    return nullcontext()
+
+
+class Instrumentation:
+    """
+    Measures where the time of a GA run goes. GA wraps its operators with timed, so that each call adds to the timer and
+    counter of its phase, and measures the rest of the generation with phase. Without an Instrumentation, GA uses its
+    operators directly, so nothing is measured and nothing is added to each call.
+    Hooks can be given to follow the run from outside (a profiler or a metrics exporter), or the methods can be
+    overridden in a subclass
+    --------
+    Parameters:
+        on_generation_start : function, default None
+                Called with the number of the generation before it starts
+        on_generation_end : function, default None
+                Called with the number of the generation, the population and its fitness after it ends
+        on_evaluate : function, default None
+                Called with the population and its fitness after each evaluation
+    """
+
+    def __init__(self, on_generation_start=None, on_generation_end=None, on_evaluate=None):
+        self.on_generation_start = on_generation_start
+        self.on_generation_end = on_generation_end
+        self.on_evaluate = on_evaluate
+        self.reset()
+
+    def reset(self):
+        """
+        Sets every timer and counter to 0
+        """
+        self.timers = {}         # Seconds spent in each phase
+        self.counters = {}       # Number of calls of each phase
+        self.evaluations = 0     # Number of individuals evaluated
+        self.generations = 0
+        self.generation_time = 0.0
+        self.other_time = 0.0    # Time of the generations that is not in any phase
+        self._generation_start = None
+        self._phases_at_start = 0.0
+
+    def timed(self, phase, function):
+        """
+        Returns function wrapped so that each call is added to the timer and counter of phase
+        """
+        timers, counters = self.timers, self.counters
+        timers.setdefault(phase, 0.0)
+        counters.setdefault(phase, 0)
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            result = function(*args, **kwargs)
+            timers[phase] += perf_counter() - start
+            counters[phase] += 1
+            return result
+        return wrapper
+
+    def timed_evaluation(self, function):
+        """
+        Returns an evaluation function wrapped so that it's timed, the evaluated individuals are counted and on_evaluate
+        is called
+        """
+        timed_function = self.timed('evaluation', function)
+
+        def wrapper(population, *args):
+            fitness = timed_function(population, *args)
+            self.evaluations += len(population)
+            if self.on_evaluate is not None:
+                self.on_evaluate(population, fitness)
+            return fitness
+        return wrapper
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager that adds the time of its block to the timer of phase name
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] = self.timers.get(name, 0.0) + perf_counter() - start
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def generation_start(self, generation):
+        if self.on_generation_start is not None:
+            self.on_generation_start(generation)
+        self._phases_at_start = sum(self.timers.values())
+        self._generation_start = perf_counter()
+
+    def generation_end(self, generation, pop, fit_pop):
+        elapsed = perf_counter() - self._generation_start
+        self.generation_time += elapsed
+        self.other_time += elapsed - (sum(self.timers.values()) - self._phases_at_start)
+        self.generations += 1
+        if self.on_generation_end is not None:
+            self.on_generation_end(generation, pop, fit_pop)
+
+    def summary(self):
+        """
+        Returns a dictionary with the seconds, number of calls and share of the total time of each phase, and the time of
+        the generations that is not in any phase as 'other'
+        """
+        phases = [phase for phase in PHASES if phase in self.timers]
+        phases += [phase for phase in self.timers if phase not in PHASES]
+        total = sum(self.timers.values()) + self.other_time or 1
+        summary = {phase: {'seconds': self.timers[phase], 'calls': self.counters[phase],
+                           'share': self.timers[phase] / total} for phase in phases}
+        summary['other'] = {'seconds': self.other_time, 'calls': self.generations, 'share': self.other_time / total}
+        return summary
+
+    def report(self):
+        """
+        Returns a table with the summary, to be printed
+        """
+        lines = [f'{"phase":14} {"seconds":>10} {"calls":>10} {"share":>8}']
+        for phase, values in self.summary().items():
+            lines.append(f'{phase:14} {values["seconds"]:>10.4f} {values["calls"]:>10} {values["share"]:>8.1%}')
+        lines.append(f'{self.generations} generations, {self.evaluations} individuals evaluated, '
+                     f'{self.generation_time:.4f} seconds in generations')
+        return '\n'.join(lines)
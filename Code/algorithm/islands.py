@@ -0,0 +1,267 @@
+import multiprocessing
+import pickle
+import queue
+import numpy as np
+from algorithm.algorithm import GA
+from base.individual import create_pop
+from base.population import calculate_pop_fit_array
+from base.problem import DEFAULT_PROBLEM
+from base.shared import SharedArray
+from operators.crossovers import improved_cycle_crossover
+from operators.mutators import twors_mutation
+from operators.selectors import RouletteSelection
+
+
+def migration_targets(n_islands, topology):
+    """
+    Returns the islands that each island sends its migrants to
+    --------
+    Parameters:
+        n_islands : integer
+                Number of islands
+        topology : string
+                'ring' (each island sends to the next one) or 'full' (each island sends to all the others)
+    Returns:
+        list
+            List where the value at index i is the list of islands that receive the migrants of island i
+    """
+    if topology == 'ring':
+        return [[(i + 1) % n_islands] for i in range(n_islands)] if n_islands > 1 else [[]]
+    if topology == 'full':
+        return [[j for j in range(n_islands) if j != i] for i in range(n_islands)]
+    raise ValueError("topology should be 'ring' or 'full'")
+
+
+def _receive(inbox, epoch, expected, stash, stop):
+    """
+    Waits for the migrants of an epoch from every neighbour. Migrants from later epochs (neighbours that are ahead) are
+    kept in stash. Returns None if the run is stopped while waiting
+    """
+    while len(stash.get(epoch, [])) < expected:
+        try:
+            message_epoch, sender, genomes = inbox.get(timeout=0.05)
+        except queue.Empty:
+            if stop.is_set():   # Another island reached the target, so the migrants will never arrive
+                return None
+            continue
+        stash.setdefault(message_epoch, []).append((sender, genomes))
+
+    # Sorting by sender, so that the result does not depend on the order in which the messages arrived
+    return [genomes for _, genomes in sorted(stash.pop(epoch), key=lambda message: message[0])]
+
+
+def _island(index, settings, focus_loss, problem, maximization, gens, migration_interval, n_migrants, targets,
+            n_sources, inboxes, results, stop, target_fitness):
+    """
+    Runs _evolve in the process of an island. If it fails, the other islands are stopped (they would otherwise wait for
+    its migrants forever) and the exception is sent to the parent instead of the results
+    """
+    try:
+        result = _evolve(index, settings, focus_loss, problem, maximization, gens, migration_interval, n_migrants,
+                         targets, n_sources, inboxes, stop, target_fitness)
+    except Exception as error:
+        stop.set()
+        try:
+            pickle.dumps(error)
+        except Exception:   # Sending a description instead of an exception that cannot be sent to the parent
+            error = RuntimeError(f'{type(error).__name__}: {error}')
+        results.put((index, error))
+    else:
+        results.put((index, result))
+
+
+def _evolve(index, settings, focus_loss, problem, maximization, gens, migration_interval, n_migrants, targets,
+            n_sources, inboxes, stop, target_fitness):
+    """
+    Evolves one island, exchanging its best individuals with its neighbours. Returns (pop, fit_pop, convergence)
+    """
+    evaluate_population = calculate_pop_fit_array(focus_loss.array, problem=problem or DEFAULT_PROBLEM)
+    pop = None
+    convergence = []
+    stash = {}   # Migrants that arrived before they were needed, by epoch
+    epoch = 0
+    done_gens = 0
+
+    while done_gens < gens:
+        epoch_gens = min(migration_interval, gens - done_gens)
+
+        # The first epoch creates the population, the others continue from the current one (with the migrants)
+        current = pop
+        create_population = settings['create_population'] if pop is None else lambda population_size, **_: current
+
+        pop, fit_pop, epoch_convergence = GA(create_population=create_population,
+                                             evaluate_population=evaluate_population,
+                                             maximization=maximization,
+                                             gens=epoch_gens,
+                                             pop_size=settings['pop_size'],
+                                             selector=settings['selector'],
+                                             mutator=settings['mutator'],
+                                             crossover_operator=settings['crossover_operator'],
+                                             p_c=settings['p_c'],
+                                             p_m=settings['p_m'],
+                                             elitism=settings['elitism'],
+                                             verbose=False,
+                                             log=False,
+                                             path=None,
+                                             seed=settings['seed'] if epoch == 0 else None,   # Seeding only once
+                                             return_convergence=True,
+                                             problem=problem)
+        convergence.extend(epoch_convergence)
+        done_gens += epoch_gens
+
+        best_fitness = max(fit_pop) if maximization else min(fit_pop)
+        if target_fitness is not None and (best_fitness >= target_fitness if maximization
+                                           else best_fitness <= target_fitness):
+            stop.set()   # Telling the other islands that the target was reached
+
+        if stop.is_set() or done_gens >= gens:
+            break
+
+        # Sending the best individuals as a compact integer array
+        ranking = sorted(range(len(pop)), key=lambda i: fit_pop[i], reverse=maximization)
+        migrants = np.array([pop[i] for i in ranking[:n_migrants]], dtype=np.int16)
+        for target in targets:
+            inboxes[target].put((epoch, index, migrants))
+
+        received = _receive(inboxes[index], epoch, n_sources, stash, stop)
+        if received is None:
+            break
+
+        # The migrants replace the worst individuals of the island
+        worst = ranking[::-1]
+        for position, genome in zip(worst, (genome for genomes in received for genome in genomes.tolist())):
+            pop[position] = genome
+
+        epoch += 1
+
+    return pop, fit_pop, convergence
+
+
+def island_GA(focus_loss,
+              islands,
+              gens,
+              migration_interval,
+              n_migrants=2,
+              topology='ring',
+              maximization=False,
+              create_population=create_pop,
+              pop_size=50,
+              selector=None,
+              mutator=twors_mutation,
+              crossover_operator=improved_cycle_crossover,
+              p_c=0.9,
+              p_m=0.1,
+              elitism=True,
+              seed=None,
+              target_fitness=None,
+              problem=None):
+    """
+    Runs an island model GA: several populations evolve at the same time, each one in its own process, and every
+    migration_interval generations the best individuals of each island are sent to its neighbours, replacing their
+    worst individuals
+
+    Parameters:
+    --------
+        focus_loss : list
+                    List with our data, that has the losses of focus from room to room.
+        islands : integer or list
+                    Number of islands, or a list with one dictionary per island with the parameters that are different
+                    in that island (for example {'mutator': twors_mutation, 'p_m': 0.2})
+        gens : integer
+                    Number of generations for each island
+        migration_interval : integer
+                    Number of generations between migrations
+        n_migrants : integer, default 2
+                    Number of individuals each island sends to each of its neighbours
+        topology : string, default 'ring'
+                    'ring' (each island sends to the next one) or 'full' (each island sends to all the others)
+        maximization : Boolean, default False
+                    Boolean value to indicate if it's a maximization (True) or minimization (False) problem.
+        create_population, pop_size, selector, mutator, crossover_operator, p_c, p_m, elitism
+                    Parameters of the GA used by every island that does not change them. If selector is None, each
+                    island uses a new RouletteSelection. The default operators are the ones used in main.py
+        seed : integer, default None
+                    If indicated, island i uses seed + i, so that results can be replicated
+        target_fitness : float, default None
+                    If indicated, every island stops at the end of its epoch once any island reaches this fitness
+        problem : Problem, default None
+                    Definition of the rooms and of the rules a valid individual needs to follow
+
+    Returns:
+    --------
+        best_solution, best_fitness, island_results
+            Best individual over all islands, its fitness, and a list with (pop, fit_pop, convergence) for each island
+
+    If an island fails, the other islands are stopped and the exception of the first island that failed is raised
+    """
+    if isinstance(islands, int):
+        islands = [{} for _ in range(islands)]
+
+    targets = migration_targets(len(islands), topology)
+    n_sources = [sum(i in island_targets for island_targets in targets) for i in range(len(islands))]
+
+    inboxes = [multiprocessing.Queue() for _ in islands]
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+
+    # The islands map the same copy of the matrix, instead of each one receiving its own
+    shared_focus_loss = SharedArray.from_array(focus_loss, dtype=float)
+
+    processes = []
+    island_results = [None] * len(islands)
+    error = None   # Exception of the first island that failed
+    try:
+        for index, overrides in enumerate(islands):
+            settings = {'create_population': create_population, 'pop_size': pop_size,
+                        'selector': RouletteSelection() if selector is None else selector,
+                        'mutator': mutator, 'crossover_operator': crossover_operator, 'p_c': p_c, 'p_m': p_m,
+                        'elitism': elitism, 'seed': None if seed is None else seed + index}
+            settings.update(overrides)
+
+            process = multiprocessing.Process(target=_island,
+                                              args=(index, settings, shared_focus_loss, problem, maximization, gens,
+                                                    migration_interval, n_migrants, targets[index], n_sources[index],
+                                                    inboxes, results, stop, target_fitness))
+            process.start()
+            processes.append(process)
+
+        # Reading the results before joining the processes, so that they are not blocked writing to the queue. The
+        # queue is polled, so that an island that died without sending anything (killed, or out of memory) is noticed
+        pending = set(range(len(islands)))
+        while pending:
+            try:
+                index, result = results.get(timeout=0.1)
+            except queue.Empty:
+                for index in sorted(pending):
+                    exitcode = processes[index].exitcode
+                    if exitcode is not None and exitcode != 0:
+                        pending.discard(index)
+                        stop.set()
+                        error = error or RuntimeError(f'Island {index} stopped with exit code {exitcode}')
+                continue
+            pending.discard(index)
+            if isinstance(result, BaseException):
+                error = error or result
+            else:
+                island_results[index] = result
+
+        for process in processes:
+            process.join()
+    finally:
+        if any(process.is_alive() for process in processes):   # Only when the parent itself was interrupted
+            stop.set()
+            for process in processes:
+                process.terminate()
+                process.join()
+        shared_focus_loss.close()
+
+    if error is not None:
+        raise error
+
+    best_fitness, best_solution = None, None
+    for pop, fit_pop, _ in island_results:
+        island_best = max(fit_pop) if maximization else min(fit_pop)
+        if best_fitness is None or (island_best > best_fitness if maximization else island_best < best_fitness):
+            best_fitness, best_solution = island_best, pop[fit_pop.index(island_best)]
+
+    return best_solution, best_fitness, island_results
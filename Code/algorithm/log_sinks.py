@@ -0,0 +1,193 @@
+import abc
+import csv
+import os
+import time
+import numpy as np
+
+# Statistics recorded for each generation, in the order they are written
+STATS_COLUMNS = ('generation', 'best', 'mean', 'std', 'worst', 'unique')
+
+
+def generation_stats(generation, fit_pop, unique, maximization):
+    """
+    Returns the statistics of one generation
+    --------
+    Parameters:
+        generation : integer
+                Number of the generation
+        fit_pop : list or numpy array
+                Fitness values of the population
+        unique : integer
+                Number of different individuals in the population
+        maximization : Boolean
+                Indicates if it's a maximization (True) or minimization (False) problem
+    Returns:
+        dictionary
+            Dictionary with a value for each name in STATS_COLUMNS
+    """
+    best, worst = (max(fit_pop), min(fit_pop)) if maximization else (min(fit_pop), max(fit_pop))
+    fitness = np.asarray(fit_pop, dtype=float)
+    return {'generation': generation, 'best': best, 'mean': float(fitness.mean()), 'std': float(fitness.std()),
+            'worst': worst, 'unique': unique}
+
+
+def count_unique(pop):
+    """
+    Returns the number of different individuals in a population, given as a list of lists or as a (rooms, skip) tuple
+    """
+    if isinstance(pop, tuple):
+        rooms, skip = pop
+        return len(np.unique(np.hstack([rooms, skip]), axis=0))
+    return len(set(map(tuple, pop)))
+
+
+class LogSink(abc.ABC):
+    """
+    Destination of the statistics of each generation. Rows are kept in a buffer and only written when it has
+    buffer_size rows, when flush_interval seconds have passed since the last write, or when the sink is closed.
+    Subclasses only need to implement _write_rows. Sinks can be used as context managers, closing them at the end
+    """
+
+    def __init__(self, columns=STATS_COLUMNS, buffer_size=100, flush_interval=5.0):
+        self.columns = tuple(columns)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def write(self, stats):
+        """
+        Adds the statistics of a generation (a dictionary like the ones returned by generation_stats)
+        """
+        self.buffer.append([stats[column] for column in self.columns])
+        if len(self.buffer) >= self.buffer_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every buffered row
+        """
+        if self.buffer:
+            self._write_rows(self.buffer)
+            self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+    @abc.abstractmethod
+    def _write_rows(self, rows):
+        """
+        Writes a list of rows to the destination of the sink
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MemorySink(LogSink):
+    """
+    Keeps every row in memory, in the rows attribute. Nothing is buffered, since there is nothing to save by batching
+    """
+
+    def __init__(self, columns=STATS_COLUMNS):
+        super().__init__(columns, buffer_size=1)
+        self.rows = []
+
+    def write(self, stats):
+        self.rows.append([stats[column] for column in self.columns])
+
+    def _write_rows(self, rows):
+        self.rows.extend(rows)
+
+    def column(self, name):
+        """
+        Returns the list of values of one of the columns
+        """
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+
+class CSVSink(LogSink):
+    """
+    Appends the rows to a csv file, opening it only when the buffer is written
+    --------
+    Parameters:
+        path : string
+                Path of the csv file
+        columns : tuple, default STATS_COLUMNS
+                Statistics to write, in order
+        header : Boolean, default False
+                If True, the names of the columns are written first when the file is empty or does not exist
+        buffer_size, flush_interval
+                Number of rows and seconds after which the buffer is written
+    """
+
+    def __init__(self, path, columns=STATS_COLUMNS, header=False, buffer_size=100, flush_interval=5.0):
+        super().__init__(columns, buffer_size, flush_interval)
+        self.path = path
+        if header and (not os.path.exists(path) or os.path.getsize(path) == 0):
+            self._write_rows([self.columns])
+
+    def _write_rows(self, rows):
+        with open(self.path, 'a', newline='') as file:
+            csv.writer(file).writerows(rows)
+
+
+class ColumnarSink(LogSink):
+    """
+    Stores each column as a binary file of float64 values inside a directory, appending a whole block of values per
+    column each time the buffer is written. The columns can be read back with read_columns
+    --------
+    Parameters:
+        path : string
+                Directory where the files are stored (created if needed)
+        columns : tuple, default STATS_COLUMNS
+                Statistics to store, one file each
+        buffer_size, flush_interval
+                Number of rows and seconds after which the buffer is written
+    """
+
+    def __init__(self, path, columns=STATS_COLUMNS, buffer_size=1000, flush_interval=5.0):
+        super().__init__(columns, buffer_size, flush_interval)
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _write_rows(self, rows):
+        block = np.array(rows, dtype=np.float64)
+        for index, column in enumerate(self.columns):
+            with open(os.path.join(self.path, column + '.f8'), 'ab') as file:
+                block[:, index].tofile(file)
+
+
+def open_sink(log, path):
+    """
+    Returns the sink used by GA for its log parameter: log itself if it's a LogSink, a CSVSink that appends the generation
+    and best fitness to path (the format of the original log) if log is True, or None if nothing is logged
+    """
+    if isinstance(log, LogSink):
+        return log
+    if log:
+        if path is None:
+            raise Exception('If log is True then a valid path should be provided')
+        return CSVSink(path, columns=('generation', 'best'))
+    return None
+
+
+def read_columns(path, columns=STATS_COLUMNS):
+    """
+    Reads the columns stored by a ColumnarSink
+    --------
+    Parameters:
+        path : string
+                Directory of the ColumnarSink
+        columns : tuple, default STATS_COLUMNS
+                Columns to read
+    Returns:
+        dictionary
+            Dictionary with a numpy array for each column
+    """
+    return {column: np.fromfile(os.path.join(path, column + '.f8'), dtype=np.float64) for column in columns}
@@ -0,0 +1,131 @@
+import itertools
+import math
+import numpy as np
+from algorithm.grid_search import run_grid
+
+
+def configurations(pop_size_values, p_m_values, p_c_values, crossover_operators, mutation_operators):
+    """
+    Returns every combination of the parameters raced by successive_halving, in the same order as grid_tasks
+    --------
+    Returns:
+        list
+            List of tuples (pop_size, p_m, p_c, crossover_op, mutation_op)
+    """
+    return list(itertools.product(pop_size_values, p_m_values, p_c_values, crossover_operators, mutation_operators))
+
+
+def budgets(n_candidates, min_gens, max_gens, min_seeds, max_seeds, eta=3):
+    """
+    Returns the budget of each round of successive halving. There are enough rounds to go from n_candidates to a single
+    configuration, keeping 1 / eta of them at each round, and the budget of the last round is max_gens generations on
+    max_seeds seeds. Going back from the last round, the number of generations and of seeds are divided by eta at each
+    round, down to min_gens and min_seeds, so that each round costs about the same
+    --------
+    Returns:
+        list
+            List of (gens, n_seeds) for each round
+    """
+    n_rounds = 1
+    while math.ceil(n_candidates / eta ** (n_rounds - 1)) > 1:
+        n_rounds += 1
+    return [(max(min_gens, round(max_gens / eta ** (n_rounds - 1 - number))),
+             max(min_seeds, math.ceil(max_seeds / eta ** (n_rounds - 1 - number))))
+            for number in range(n_rounds)]
+
+
+def mean_ranks(results):
+    """
+    Ranks the configurations on each seed (1 for the lowest fitness, the average position for ties), and returns the
+    mean rank of each one over the seeds, as in the Friedman test used by F-race. Ranking on each seed first means a
+    seed where every configuration does badly does not weigh more than the others
+    --------
+    Parameters:
+        results : numpy array
+                (n_configurations, n_seeds) best fitness of each configuration on each seed
+    Returns:
+        numpy array
+            Mean rank of each configuration
+    """
+    ranks = np.empty(results.shape)
+    for seed in range(results.shape[1]):
+        values = results[:, seed]
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        # Each group of equal values gets the average of the positions it takes
+        starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+        ends = np.r_[starts[1:], len(values)]
+        for start, end in zip(starts, ends):
+            ranks[order[start:end], seed] = (start + end + 1) / 2
+    return ranks.mean(axis=1)
+
+
+def successive_halving(instance_seed, candidates, run_seeds, min_gens=25, max_gens=200, min_seeds=1, eta=3,
+                       workers=None, selector=None, termination=None, verbose=False):
+    """
+    Finds the best configuration of the GA for one instance without running every configuration to the end. Every
+    configuration starts with a small budget (few generations on few seeds), then only the best 1 / eta of them, by
+    mean rank over the seeds, go on to the next round, where the budget is larger (see budgets). The last round runs
+    the survivors with max_gens generations on every seed in run_seeds, so the number of generations is the budget of
+    the race and not one of the parameters it tunes.
+    Each round is a list of grid search tasks, so it runs in parallel with run_grid
+    --------
+    Parameters:
+        instance_seed : integer
+                Seed given to random_focus_gen to create the dataset
+        candidates : list
+                Configurations to race, as given by configurations
+        run_seeds : list
+                Seeds given to the GA, the first ones are used in the first rounds
+        min_gens : integer, default 25
+                Number of generations in the first round
+        max_gens : integer, default 200
+                Number of generations in the last round
+        min_seeds : integer, default 1
+                Number of seeds in the first round
+        eta : integer, default 3
+                Factor by which the configurations are reduced, and the budget is increased, at each round
+        workers : integer, default None
+                Number of processes given to run_grid
+        selector : function, default None
+                function to select individuals from the population. If None, each run uses a new RouletteSelection
+        termination : Termination, default None
+                Criteria to stop each GA before its last generation
+        verbose : Boolean, default False
+                If True, the number of configurations and the budget of each round are printed
+    Returns:
+        best_parameters, best_run, evaluations
+            best_parameters as (pop_size, p_m, p_c, crossover_op, mutation_op), the RunResult of the best run of
+            the winner (with its fitness, solution, time, and why and when it stopped), and the number of individuals
+            evaluated in the whole race
+    """
+    survivors = list(candidates)
+    evaluations = 0
+    rounds = budgets(len(survivors), min_gens, max_gens, min_seeds, len(run_seeds), eta)
+    runs = {}   # Every run is seeded, so rounds with the same budget reuse the runs of the previous ones
+
+    for number, (gens, n_seeds) in enumerate(rounds):
+        seeds = run_seeds[:n_seeds]
+        tasks = [(instance_seed, *configuration, gens, seed) for configuration in survivors for seed in seeds]
+        tasks = [task for task in tasks if task not in runs]
+        for result in run_grid(tasks, workers=workers, selector=selector, termination=termination):
+            runs[result.task] = result
+            evaluations += result.evaluations
+
+        results = np.array([[runs[(instance_seed, *configuration, gens, seed)].best_fitness for seed in seeds]
+                            for configuration in survivors])
+        ranks = mean_ranks(results)
+        # Ties in the mean rank are broken by the mean fitness
+        order = sorted(range(len(survivors)), key=lambda i: (ranks[i], results[i].mean()))
+
+        if verbose:
+            print(f"Round {number}: {len(survivors)} configurations, {gens} generations, {n_seeds} seeds")
+
+        if number == len(rounds) - 1:
+            winner = survivors[order[0]]
+            # Best run of the winner, the fastest one in the case of a tie
+            best_run = min((runs[(instance_seed, *winner, gens, seed)] for seed in seeds),
+                           key=lambda run: (run.best_fitness, run.execution_time))
+            return winner, best_run, evaluations
+
+        survivors = [survivors[i] for i in order[:max(1, math.ceil(len(survivors) / eta))]]
@@ -0,0 +1,192 @@
+import json
+import sqlite3
+
+# Columns that identify a run of the grid search, in the same order as the tasks from grid_tasks
+KEY_COLUMNS = ('instance_seed', 'pop_size', 'p_m', 'p_c', 'crossover', 'mutator', 'gens', 'run_seed')
+
+# Columns that tell why and when each run stopped
+STOP_COLUMNS = (('stop_reason', 'TEXT'), ('last_generation', 'INTEGER'), ('evaluations', 'INTEGER'))
+
+
+class ResultStore:
+    """
+    Stores the results of a grid search in a SQLite file, as they are produced. If the grid search is interrupted, the
+    results are kept, and running it again only runs the combinations that are not in the file yet
+    --------
+    Parameters:
+        path : string
+                Path of the SQLite file. ':memory:' keeps the results in memory only
+        commit_every : integer, default 50
+                Number of results written before saving them to the file. At most this number of runs is lost if
+                the process is interrupted
+    """
+
+    def __init__(self, path, commit_every=50):
+        self.connection = sqlite3.connect(path)
+        self.commit_every = commit_every
+        self._uncommitted = 0
+
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS results (
+                instance_seed INTEGER NOT NULL,
+                pop_size INTEGER NOT NULL,
+                p_m REAL NOT NULL,
+                p_c REAL NOT NULL,
+                crossover TEXT NOT NULL,
+                mutator TEXT NOT NULL,
+                gens INTEGER NOT NULL,
+                run_seed INTEGER NOT NULL,
+                best_fitness REAL NOT NULL,
+                best_solution TEXT NOT NULL,
+                execution_time REAL NOT NULL,
+                stop_reason TEXT,
+                last_generation INTEGER,
+                evaluations INTEGER,
+                PRIMARY KEY (instance_seed, pop_size, p_m, p_c, crossover, mutator, gens, run_seed)
+            );
+            -- Best parameters for each instance
+            CREATE INDEX IF NOT EXISTS results_by_instance ON results (instance_seed, best_fitness, execution_time);
+            -- Fitness distribution of each combination of operators, already sorted for the medians
+            CREATE INDEX IF NOT EXISTS results_by_operators ON results (crossover, mutator, gens, best_fitness);
+        ''')
+
+        # Files written before the runs recorded why they stopped get the new columns, empty for the old results
+        columns = {row[1] for row in self.connection.execute('PRAGMA table_info(results)')}
+        for column, kind in STOP_COLUMNS:
+            if column not in columns:
+                self.connection.execute(f'ALTER TABLE results ADD COLUMN {column} {kind}')
+
+    @staticmethod
+    def key(task):
+        """
+        Returns the values that identify a task in the file, using the names of the operators
+        --------
+        Parameters:
+            task : tuple
+                    (instance_seed, pop_size, p_m, p_c, crossover_op, mutation_op, gens, run_seed), as in grid_tasks
+        Returns:
+            tuple
+        """
+        instance_seed, pop_size, p_m, p_c, crossover_op, mutation_op, gens, run_seed = task
+        return instance_seed, pop_size, p_m, p_c, crossover_op.__name__, mutation_op.__name__, gens, run_seed
+
+    def add(self, task, best_fitness, best_solution, execution_time, reason=None, generation=None, evaluations=None):
+        """
+        Writes the result of a task (the values of a RunResult, from run_grid)
+        --------
+        Parameters:
+            task : tuple
+                    Task that was run, as in grid_tasks
+            best_fitness : float
+                    Best fitness found in the run
+            best_solution : list
+                    Individual with the best fitness
+            execution_time : float
+                    Time the run took, in seconds
+            reason, generation, evaluations : default None
+                    Why the run stopped (name of the termination criterion, or 'generations'), its last generation and
+                    the number of individuals evaluated
+        """
+        self.connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                self.key(task) + (best_fitness, json.dumps(best_solution), execution_time, reason,
+                                                  generation, evaluations))
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        """
+        Saves the results written so far to the file
+        """
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        """
+        Saves the results and closes the file
+        """
+        self.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def pending(self, tasks):
+        """
+        Returns the tasks that do not have a result in the file yet
+        --------
+        Parameters:
+            tasks : list
+                    Tasks of the grid search, as given by grid_tasks
+        Returns:
+            list
+                Tasks that still need to be run, in the same order
+        """
+        done = set(self.connection.execute(f'SELECT {", ".join(KEY_COLUMNS)} FROM results'))
+        return [task for task in tasks if self.key(task) not in done]
+
+    def best_parameters(self, instance_seed):
+        """
+        Returns the best result of an instance: the lowest fitness and, in the case of a tie, the fastest run
+        --------
+        Parameters:
+            instance_seed : integer
+                    Seed of the instance
+        Returns:
+            best_parameters, best_fitness, best_solution, best_execution_time
+                best_parameters is (pop_size, p_m, p_c, crossover, mutator, gens). None if there are no results
+        """
+        row = self.connection.execute('''
+            SELECT pop_size, p_m, p_c, crossover, mutator, gens, best_fitness, best_solution, execution_time
+            FROM results WHERE instance_seed = ? ORDER BY best_fitness, execution_time LIMIT 1
+        ''', (instance_seed,)).fetchone()
+
+        if row is None:
+            return None
+        return row[:6], row[6], json.loads(row[7]), row[8]
+
+    def fitness_by_combination(self, **filters):
+        """
+        Returns the best fitness of every run, grouped by (crossover, mutator, gens), as used in the box-plots
+        --------
+        Parameters:
+            filters : keyword arguments
+                    Only runs with these values are used, for example pop_size=50, p_m=0.1
+        Returns:
+            dict
+                Dictionary with (crossover, mutator, gens) as keys and the sorted list of fitness values as values
+        """
+        for column in filters:
+            if column not in KEY_COLUMNS:
+                raise ValueError(f'{column} is not one of {KEY_COLUMNS}')
+
+        where = ' AND '.join(f'{column} = ?' for column in filters) or '1'
+        rows = self.connection.execute(f'''
+            SELECT crossover, mutator, gens, best_fitness FROM results
+            WHERE {where} ORDER BY crossover, mutator, gens, best_fitness
+        ''', tuple(filters.values()))
+
+        fitness_scores = {}
+        for crossover, mutator, gens, best_fitness in rows:
+            fitness_scores.setdefault((crossover, mutator, gens), []).append(best_fitness)
+        return fitness_scores
+
+    def median_by_combination(self, **filters):
+        """
+        Returns the median of the best fitness of each (crossover, mutator, gens) combination
+        --------
+        Parameters:
+            filters : keyword arguments
+                    Only runs with these values are used, for example pop_size=50, p_m=0.1
+        Returns:
+            dict
+                Dictionary with (crossover, mutator, gens) as keys and the median fitness as values
+        """
+        medians = {}
+        for combination, values in self.fitness_by_combination(**filters).items():
+            middle = len(values) // 2   # The values are already sorted by the query
+            medians[combination] = values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+        return medians
@@ -0,0 +1,153 @@
+import time
+
+# Criteria to stop the GA before the last generation. Each one is an object with a start method, called when the run
+# starts, and a check method, called after each generation, that returns True when the run should stop. They are
+# combined with Termination, which is what GA receives and which records why and when the run stopped
+
+
+class Stagnation:
+    """
+    Stops when the best fitness has not improved for a number of generations
+    --------
+    Parameters:
+        generations : integer
+                Number of generations without improvement after which the run stops
+        tolerance : float, default 0
+                Minimum change of the best fitness that counts as an improvement
+    """
+    name = 'stagnation'
+
+    def __init__(self, generations, tolerance=0):
+        self.generations = generations
+        self.tolerance = tolerance
+
+    def start(self):
+        self.best = None
+        self.since_improvement = 0
+
+    def check(self, generation, best_fitness, evaluations, pop_size, maximization):
+        improvement = None if self.best is None else \
+            (best_fitness - self.best if maximization else self.best - best_fitness)
+        if improvement is None or improvement > self.tolerance:
+            self.best, self.since_improvement = best_fitness, 0
+        else:
+            self.since_improvement += 1
+        return self.since_improvement >= self.generations
+
+
+class TargetFitness:
+    """
+    Stops when the best fitness reaches a target, for example the optimum given by base/oracle.py
+    --------
+    Parameters:
+        target : float
+                Fitness that is good enough
+    """
+    name = 'target'
+
+    def __init__(self, target):
+        self.target = target
+
+    def start(self):
+        pass
+
+    def check(self, generation, best_fitness, evaluations, pop_size, maximization):
+        return best_fitness >= self.target if maximization else best_fitness <= self.target
+
+
+class MaxEvaluations:
+    """
+    Stops before the number of evaluated individuals goes over a budget, so that another generation is only created if
+    all of it can be evaluated
+    --------
+    Parameters:
+        max_evaluations : integer
+                Maximum number of individuals evaluated in the run, including the first population
+    """
+    name = 'evaluations'
+
+    def __init__(self, max_evaluations):
+        self.max_evaluations = max_evaluations
+
+    def start(self):
+        pass
+
+    def check(self, generation, best_fitness, evaluations, pop_size, maximization):
+        return evaluations + pop_size > self.max_evaluations
+
+
+class Deadline:
+    """
+    Stops when a number of seconds has passed since the start of the run. The generation that is running at that moment
+    is finished, so the run can take a little longer
+    --------
+    Parameters:
+        seconds : float
+                Wall-clock time available for the run
+    """
+    name = 'deadline'
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def start(self):
+        self.end = time.monotonic() + self.seconds
+
+    def check(self, generation, best_fitness, evaluations, pop_size, maximization):
+        return time.monotonic() >= self.end
+
+
+class Termination:
+    """
+    Combination of termination criteria: the run stops as soon as any of them is met. After the run, the attributes
+    reason (name of the criterion that stopped it, or 'generations' if all the generations were run), generation (last
+    generation that was run), evaluations and elapsed (seconds) describe when it stopped
+    --------
+    Parameters:
+        *criteria : objects
+                Criteria such as Stagnation(20), TargetFitness(26.1), MaxEvaluations(5000) or Deadline(60)
+    """
+
+    def __init__(self, *criteria):
+        self.criteria = criteria
+        self.reason = self.generation = self.evaluations = self.elapsed = None
+
+    def start(self):
+        """
+        Resets the criteria, so that the same object can be used for several runs
+        """
+        for criterion in self.criteria:
+            criterion.start()
+        self.start_time = time.monotonic()
+        self.reason, self.generation, self.evaluations, self.elapsed = 'generations', None, 0, 0
+
+    def update(self, generation, fit_pop, evaluations, maximization):
+        """
+        Records a finished generation and returns True if the run should stop
+        --------
+        Parameters:
+            generation : integer
+                    Number of the generation that was just evaluated
+            fit_pop : list or numpy array
+                    Fitness values of its population
+            evaluations : integer
+                    Number of individuals evaluated since the start of the run
+            maximization : Boolean
+                    Indicates if it's a maximization (True) or minimization (False) problem
+        Returns:
+            Boolean
+        """
+        self.generation, self.evaluations = generation, evaluations
+        self.elapsed = time.monotonic() - self.start_time
+        best_fitness = max(fit_pop) if maximization else min(fit_pop)
+
+        # Every criterion is checked, so that the ones that count generations are always updated
+        met = [criterion.name for criterion in self.criteria
+               if criterion.check(generation, best_fitness, evaluations, len(fit_pop), maximization)]
+        if met:
+            self.reason = met[0]
+        return bool(met)
+
+    def __repr__(self):
+        return f'Termination(reason={self.reason!r}, generation={self.generation}, evaluations={self.evaluations}, ' \
+               f'elapsed={self.elapsed})'
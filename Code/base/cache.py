@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+
+class FitnessCache:
+    """
+    Bounded memory of fitness values, with least recently used (LRU) eviction. With 8 rooms there are only a few
+    thousand distinct valid paths, so most individuals in a run (and across runs on the same data) were already scored.
+    A cache should only be shared between evaluations that use the same focus loss data.
+    --------
+    Parameters:
+        maxsize : integer, default 4096
+                Maximum number of genomes stored. None means that the cache is unbounded
+    """
+
+    def __init__(self, maxsize=4096):
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError('maxsize should be a positive integer or None')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.focus_loss = None   # Data the stored values were computed with, set on the first use
+        self._store = OrderedDict()
+
+    def bind(self, focus_loss):
+        """
+        Associates the cache with a focus loss matrix, making sure it is not reused with different data
+        --------
+        Parameters:
+            focus_loss : list
+                        List with our data, that has the losses of focus from room to room.
+        """
+        if self.focus_loss is None:
+            self.focus_loss = focus_loss
+        elif self.focus_loss is not focus_loss:
+            raise ValueError('This cache was already used with a different focus loss matrix')
+
+    def get(self, genome):
+        """
+        Returns the stored fitness of a genome, or None if it is not in the cache
+        --------
+        Parameters:
+            genome : tuple
+                    Hashable version of the individual
+        Returns:
+            float or None
+        """
+        fitness = self._store.get(genome)
+        if fitness is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._store.move_to_end(genome)   # Marking it as the most recently used
+        return fitness
+
+    def put(self, genome, fitness):
+        """
+        Stores the fitness of a genome, removing the least recently used one if the cache is full
+        --------
+        Parameters:
+            genome : tuple
+                    Hashable version of the individual
+            fitness : float
+                    Fitness of the individual
+        """
+        self._store[genome] = fitness
+        self._store.move_to_end(genome)
+        if self.maxsize is not None and len(self._store) > self.maxsize:
+            self._store.popitem(last=False)   # The first item is the least recently used
+
+    def clear(self):
+        """
+        Removes all stored values and resets the counters
+        """
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+        self.focus_loss = None
+
+    def hit_rate(self):
+        """
+        Returns the fraction of lookups that were found in the cache
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._store)
+
+    def __repr__(self):
+        return f'FitnessCache(maxsize={self.maxsize}, size={len(self)}, hits={self.hits}, misses={self.misses})'
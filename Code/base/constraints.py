@@ -0,0 +1,169 @@
+from base.individual import create_indiv
+from base.problem import DEFAULT_PROBLEM
+
+
+class ConstraintModel:
+    """
+    Rules of a problem compiled into lists of positions to compare, so that an individual is checked with one pass over
+    its rooms, and repaired with the smallest change that makes it follow the rules, instead of being given the penalty
+    --------
+    Parameters:
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+    """
+
+    def __init__(self, problem=DEFAULT_PROBLEM):
+        self.problem = problem
+        self.size = problem.size
+        self.final_room = problem.final_room
+        self.room_of = problem.room_of
+        self.before = [before for before, _ in problem.precedence]
+        self.after = [after for _, after in problem.precedence]
+        self.optional = [(room, problem.markers[room], first, second)
+                         for room, (first, second) in problem.optional.items()]
+
+        # Order in which the rooms with precedence rules are placed when one of the rules is broken
+        self.precedence_rooms = sorted({room for pair in problem.precedence for room in pair})
+        self._check_acyclic()
+
+    def valid(self, individual):
+        """
+        Checks if an individual follows every rule (same result as valid_indiv)
+        --------
+        Parameters:
+            individual : list
+                        List representing an individual.
+        Returns:
+            Boolean
+        """
+        position = self.problem.positions(individual)
+        return position is not None and self._follows_rules(individual, position)
+
+    def repair(self, individual, changed=None):
+        """
+        Returns a valid individual that differs as little as possible from the given one (the list given is not
+        changed). Each problem is fixed in turn:
+            - repeated rooms (or unknown values) are replaced by the missing rooms, keeping the first occurrence
+            - the final room (room H) is moved to the end
+            - if a precedence rule is broken (room F before room A), the rooms with precedence rules are placed again in
+              the positions they already use, in an order that follows the rules and is as close as possible to theirs
+            - a skipped room (room C) whose condition is not met (room B right after room F) is visited again
+        --------
+        Parameters:
+            individual : list
+                        List representing an individual, with room H at the end
+            changed : list, default None
+                        If indicated, the (start, end) ranges of changed positions are appended to it, like the mutators
+        Returns:
+            list
+                Valid individual
+        """
+        individual = list(individual)
+        room_of = self.room_of
+        changed_positions = set()
+
+        # Visiting each room once: keeping the first occurrence and replacing the others by the missing rooms
+        position = self.problem.positions(individual)
+        if position is None:
+            individual = (individual + [None] * self.size)[:self.size]
+            seen, repeated = set(), []
+            for index, value in enumerate(individual):
+                room = room_of.get(value, value)
+                if room in seen or not (isinstance(room, int) and 0 <= room < self.size):
+                    repeated.append(index)
+                else:
+                    seen.add(room)
+            missing = [room for room in range(self.size) if room not in seen]
+            for index, room in zip(repeated, missing):
+                individual[index] = room
+                changed_positions.add(index)
+            position = self.problem.positions(individual)
+
+        # Room H at the end
+        final_position = position[self.final_room]
+        if final_position != self.size - 1:
+            final_value = individual.pop(final_position)
+            individual.append(final_value)
+            changed_positions.update(range(final_position, self.size))
+            position = self.problem.positions(individual)
+
+        # Precedence rules, placing the rooms again in the positions they use
+        if any(position[before] > position[after] for before, after in zip(self.before, self.after)):
+            slots = sorted(position[room] for room in self.precedence_rooms)
+            values = {room: individual[position[room]] for room in self.precedence_rooms}
+            for slot, room in zip(slots, self._precedence_order(position)):
+                if individual[slot] != values[room]:
+                    individual[slot] = values[room]
+                    changed_positions.add(slot)
+                position[room] = slot
+
+        # Optional rooms skipped without meeting their condition are visited
+        for room, marker, first, second in self.optional:
+            if individual[position[room]] == marker and position[second] != position[first] + 1:
+                individual[position[room]] = room
+                changed_positions.add(position[room])
+
+        if changed is not None:
+            changed.extend((index, index) for index in sorted(changed_positions))
+        return individual
+
+    def __call__(self, individual, changed=None):
+        return self.repair(individual, changed)
+
+    def _follows_rules(self, individual, position):
+        if individual[-1] != self.final_room:
+            return False
+        for before, after in zip(self.before, self.after):
+            if position[before] > position[after]:
+                return False
+        for room, marker, first, second in self.optional:
+            if individual[position[room]] == marker and position[second] != position[first] + 1:
+                return False
+        return True
+
+    def _precedence_order(self, position):
+        """
+        Orders the rooms with precedence rules so that every rule is followed, taking at each step, among the rooms whose
+        preceding rooms were already placed, the one that is first in the individual
+        """
+        remaining = {room: 0 for room in self.precedence_rooms}
+        for after in self.after:
+            remaining[after] += 1
+        order = []
+        available = [room for room, count in remaining.items() if count == 0]
+        while available:
+            room = min(available, key=position.__getitem__)
+            available.remove(room)
+            order.append(room)
+            for before, after in zip(self.before, self.after):
+                if before == room:
+                    remaining[after] -= 1
+                    if remaining[after] == 0:
+                        available.append(after)
+        return order
+
+    def _check_acyclic(self):
+        if len(self._precedence_order(list(range(self.size)))) != len(self.precedence_rooms):
+            raise ValueError('The precedence rules have a cycle, no individual can follow them')
+
+
+def create_repaired_pop(population_size, problem=DEFAULT_PROBLEM):
+    """
+    Creates a population like create_pop, but each random individual that breaks a rule is repaired instead of being
+    replaced, so the time needed does not depend on how many random individuals are invalid
+    --------
+    Parameters:
+        population_size : integer
+                          Size of the population
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        list
+            List of lists, with each list representing an individual
+    """
+    model = ConstraintModel(problem)
+    population = []
+    for _ in range(population_size):
+        individual = create_indiv(problem)
+        population.append(individual if model.valid(individual) else model.repair(individual))
+    return population
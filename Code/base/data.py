@@ -12,20 +12,32 @@ focus_loss = [[0, 10.2, 16, 4, 6, 12, 7.5, 9],
 
 
 # This function generates random focus loss, with the necessary conditions for the list of list to be valid
-def random_focus_gen(size = 8, seed = None):
+def random_focus_gen(size = 8, seed = None, problem = None):
     """
     Returns a list of lists, representing the focus loss between rooms
     --------
     Parameters:
     size : integer
            Size of the list of lists, in this case it has a predefined value of 8, so 8x8 matrix
+    seed : integer, default None
+           If indicated, it will help set the random.seed value, so that results can be replicated
+    problem : Problem, default None
+           If indicated, the size and the pairs of rooms with the highest focus loss (A to C) are taken from it
     Returns:
-    8x8 matrix,representing the focus loss between rooms
+    size x size matrix,representing the focus loss between rooms
     """
 
     if seed is not None:
         random.seed(seed)
 
+    costly_pairs = [(0, 2)]   # By default, the focus loss between A and C is the highest
+    if problem is not None:
+        size = problem.size
+        costly_pairs = problem.costly_pairs
+
+    # Highest random value: 20 for 8 rooms, and smaller for bigger sizes, so that the rows can still sum up to 100
+    max_value = min(20, 160 / size)
+
     # Creating a placeholder list, with the correct size, because the indexes will be used later
     data = [[0] * size for _ in range(size)]
 
@@ -36,7 +48,7 @@ def random_focus_gen(size = 8, seed = None):
         for i in range(size):    # Iterating through each list in the matrix
             # Iterating through each element in a list, and also guaranteeing that when i = j, the value is 0
             for j in range(i + 1, size):
-                value = round(random.uniform(0, 20), 1)    # Generating a random value, and rounding it to one decimal
+                value = round(random.uniform(0, max_value), 1)    # Generating a random value, and rounding it to one decimal
                 # place. 20 is an arbitrary number, and as the maximum for each row must be 100, it seemed the most reasonable
 
                 data[i][j] = value
@@ -46,8 +58,9 @@ def random_focus_gen(size = 8, seed = None):
         min_focus = max_focus * 1.04    # Multiplying the max value found by 4%
 
         # Making sure that the focus loss between A and C is at least 4% bigger than the maximum focus loss between other two rooms:
-        data[0][2] = round(random.uniform(min_focus, min_focus + 20), 1)
-        data[2][0] = data[0][2]   # The matrix must be symmetrical
+        for i, j in costly_pairs:
+            data[i][j] = round(random.uniform(min_focus, min_focus + max_value), 1)
+            data[j][i] = data[i][j]   # The matrix must be symmetrical
 
         #Checking that none of the rows has a sum greater than 100, if it does, the loop is repeated, if not, we terminate
         if all(sum(row) <= 100 for row in data):
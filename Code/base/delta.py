@@ -0,0 +1,162 @@
+from base.problem import DEFAULT_PROBLEM
+
+
+class DeltaFitness:
+    """
+    Evaluation function (it can be used wherever calculate_pop_fit is) that also keeps, for each individual of the last
+    evaluated population, its fitness before rounding and the positions of the rooms used by the rules. A mutated copy of
+    one of those individuals is then scored from the positions the mutator changed only: the loss of focus is
+    recomputed between the closest visited rooms around each changed range, and the rules are checked with the
+    positions of the few rooms that moved, so the cost depends on the size of the mutation, not on the number of rooms
+    --------
+    Parameters:
+        focus_loss : list
+                    List with our data, that has the losses of focus from room to room.
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms and of the rules a valid individual needs to follow
+    """
+
+    def __init__(self, focus_loss, problem=DEFAULT_PROBLEM):
+        self.focus_loss = focus_loss
+        self.problem = problem
+        self.markers = problem.room_of
+        # Rooms whose position is needed to check the rules
+        self.rule_rooms = {room for pair in problem.precedence for room in pair}
+        for room, pair in problem.optional.items():
+            self.rule_rooms.update((room,) + pair)
+
+        # Last evaluated population (kept, so the ids of its individuals stay valid) and the state of each individual
+        self._population = []
+        self._index = {}
+        self._states = []
+        self.full_evaluations = 0
+        self.delta_evaluations = 0
+
+    def state(self, individual):
+        """
+        Returns the fitness before rounding and the rule positions of an individual, scoring the whole path
+        --------
+        Parameters:
+            individual : list
+                        List representing an individual.
+        Returns:
+            cost, rule_positions
+                Sum of the losses of focus, and dictionary with the position of each rule room (None if the
+                individual does not visit each room exactly once)
+        """
+        self.full_evaluations += 1
+        position = self.problem.positions(individual)
+        rule_positions = None if position is None else {room: position[room] for room in self.rule_rooms}
+        return self._segment_cost(individual, 0, len(individual) - 1), rule_positions
+
+    def mutated_state(self, parent, parent_state, child, changed):
+        """
+        Returns the state of a child that only differs from its parent in the changed positions
+        --------
+        Parameters:
+            parent : list
+                        Parent individual
+            parent_state : tuple
+                        State of the parent, as returned by state
+            child : list
+                        Parent after the mutation, with the rooms in the same positions outside of changed
+            changed : list
+                        (start, end) ranges of changed positions, as reported by the mutators
+        Returns:
+            cost, rule_positions
+        """
+        cost, rule_positions = parent_state
+        if rule_positions is None:   # Not a permutation, the positions of the rooms are unknown
+            return self.state(child)
+        self.delta_evaluations += 1
+        if not changed:
+            return parent_state
+
+        # Extending each range to the closest visited room on each side (in both paths), since the loss of focus of a
+        # skipped room is taken from the room before it to the room after it. Overlapping ranges are merged
+        regions = []
+        for start, end in sorted(changed):
+            low, high = start - 1, end + 1
+            while low >= 0 and (parent[low] in self.markers or child[low] in self.markers):
+                low -= 1
+            while high < len(child) and (parent[high] in self.markers or child[high] in self.markers):
+                high += 1
+            low, high = max(low, 0), min(high, len(child) - 1)
+            if regions and low < regions[-1][1]:
+                regions[-1] = [min(regions[-1][0], low), max(regions[-1][1], high)]
+            else:
+                regions.append([low, high])
+
+        rule_positions = dict(rule_positions)
+        for low, high in regions:
+            cost += self._segment_cost(child, low, high) - self._segment_cost(parent, low, high)
+            for index in range(low, high + 1):   # Updating the positions of the rule rooms that moved
+                room = self.markers.get(child[index], child[index])
+                if room in rule_positions:
+                    rule_positions[room] = index
+        return cost, rule_positions
+
+    def fitness(self, individual, state):
+        """
+        Returns the fitness of an individual from its state, with the penalty if it's not valid
+        """
+        cost, rule_positions = state
+        if rule_positions is None or individual[-1] != self.problem.final_room:
+            return self.problem.penalty
+        for before, after in self.problem.precedence:
+            if rule_positions[before] > rule_positions[after]:
+                return self.problem.penalty
+        for room, (first, second) in self.problem.optional.items():
+            if individual[rule_positions[room]] != room and rule_positions[second] != rule_positions[first] + 1:
+                return self.problem.penalty
+        return round(cost, 1)
+
+    def __call__(self, population):
+        """
+        Calculates the fitness of each individual in the population, scoring every path
+        """
+        return self.evaluate_offspring(population, [None] * len(population), [None] * len(population))
+
+    def evaluate_offspring(self, population, parents, changes):
+        """
+        Calculates the fitness of each individual in the population, using the state of its parent when it's a mutated
+        copy of an individual of the previous evaluated population
+        --------
+        Parameters:
+            population : list
+                        List of individuals
+            parents : list
+                        For each individual, the individual of the previous population it was copied from, or None
+            changes : list
+                        For each individual, the list of (start, end) ranges changed by the mutator, or None
+        Returns:
+            list
+                Fitness for each element in the population.
+        """
+        states = []
+        for individual, parent, changed in zip(population, parents, changes):
+            index = None if parent is None or changed is None else self._index.get(id(parent))
+            if index is not None and self._population[index] is parent:
+                states.append(self.mutated_state(parent, self._states[index], individual, changed))
+            else:
+                states.append(self.state(individual))
+
+        self._population, self._states = population, states
+        self._index = {id(individual): index for index, individual in enumerate(population)}
+        return [self.fitness(individual, state) for individual, state in zip(population, states)]
+
+    def _segment_cost(self, individual, low, high):
+        """
+        Loss of focus of the path between positions low and high (both included), skipping the rooms that are not visited
+        """
+        focus_loss, markers = self.focus_loss, self.markers
+        cost = 0
+        previous_room = None
+        for index in range(low, high + 1):
+            room = individual[index]
+            if room in markers:
+                continue
+            if previous_room is not None:
+                cost += focus_loss[previous_room][room]
+            previous_room = room
+        return cost
@@ -0,0 +1,157 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from base.population import decode_pop
+from base.problem import DEFAULT_PROBLEM
+
+BACKENDS = ('serial', 'thread', 'process')
+
+# Fitness function of the evaluator, set once in each worker process, so that the tasks only carry individuals
+_worker = {}
+
+
+def _init_worker(fitness_function):
+    _worker['fitness_function'] = fitness_function
+
+
+def _evaluate_chunk(chunk):
+    fitness_function = _worker['fitness_function']
+    return [fitness_function(individual) for individual in chunk]
+
+
+class Evaluator:
+    """
+    Evaluates a population with a fitness function of one individual, in this process ('serial'), in a pool of threads
+    ('thread', for functions that release the GIL, such as calls to a simulator or to numpy) or in a pool of processes
+    ('process', for functions written in Python). The population is split into chunks, each chunk is a task, and the
+    results are gathered in the order of the population, so GA gets the same values whatever the backend is, and a
+    seeded run gives the same results (as long as the fitness function itself does not use random).
+    The pool is created on the first evaluation and kept until close, so the same workers are used in every generation,
+    and in every run the evaluator is given to. With the 'process' backend the fitness function is sent once to each
+    worker, when the pool starts, and then only the chunks of individuals are sent
+    --------
+    Parameters:
+        fitness_function : function
+                Function that receives an individual and returns its fitness, for example
+                functools.partial(calculate_individual_fitness, focus_loss=focus_loss). With the 'process' backend it
+                needs to be defined at the top level of a module, so that it can be sent to the workers
+        backend : string, default 'serial'
+                'serial', 'thread' or 'process'
+        workers : integer, default None
+                Number of threads or processes. If None, the number of CPUs is used
+        chunksize : integer, default None
+                Number of individuals in each task. If None, each worker gets around 4 chunks of each population
+        problem : Problem, default DEFAULT_PROBLEM
+                Used to convert populations given in the array representation back to lists
+    """
+
+    def __init__(self, fitness_function, backend='serial', workers=None, chunksize=None, problem=DEFAULT_PROBLEM):
+        if backend not in BACKENDS:
+            raise ValueError(f'backend should be one of {BACKENDS}')
+        self.fitness_function = fitness_function
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.problem = problem
+        self.executor = None
+
+    def _pool(self):
+        if self.executor is None:
+            if self.backend == 'thread':
+                self.executor = ThreadPoolExecutor(max_workers=self.workers)
+            else:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                    initargs=(self.fitness_function,))
+        return self.executor
+
+    def __call__(self, population):
+        """
+        Returns the fitness of each individual, as a list in the same order as the population
+        --------
+        Parameters:
+            population : list or tuple
+                    List of lists, or (rooms, skip) in the array representation
+        """
+        if isinstance(population, tuple):
+            population = decode_pop(*population, self.problem)
+        if self.backend == 'serial':
+            return [self.fitness_function(individual) for individual in population]
+
+        chunksize = self.chunksize or max(1, math.ceil(len(population) / (self.workers * 4)))
+        chunks = [population[i:i + chunksize] for i in range(0, len(population), chunksize)]
+        if self.backend == 'thread':
+            fitness_function = self.fitness_function
+            results = self._pool().map(lambda chunk: [fitness_function(individual) for individual in chunk], chunks)
+        else:
+            results = self._pool().map(_evaluate_chunk, chunks)
+        return [fitness for chunk in results for fitness in chunk]   # map returns the chunks in order
+
+    def close(self):
+        """
+        Stops the workers. The evaluator can still be used, a new pool is created if needed
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Deduplicator:
+    """
+    Wraps an evaluation function so that each distinct genome of a population is only evaluated once: the genomes are
+    hashed, only the first copy of each one is given to evaluate_population, and its fitness is given to every copy.
+    Nothing is kept from one population to the next (unlike FitnessCache), so it needs no memory beyond the current
+    generation, and it pays off when many individuals are copies of each other (with elitism and low p_c and p_m) and
+    the fitness function is expensive
+    --------
+    Parameters:
+        evaluate_population : function
+                Function that receives a population (list of lists, or (rooms, skip) in the array representation) and
+                returns the fitness of each individual
+    """
+
+    def __init__(self, evaluate_population):
+        self.evaluate_population = evaluate_population
+        self.individuals = 0     # Individuals received
+        self.evaluated = 0       # Individuals given to evaluate_population
+        self.last_ratio = None   # Share of duplicates in the last population
+
+    @property
+    def duplicate_ratio(self):
+        """
+        Share of the individuals received that were copies of another one in their population, so were not evaluated
+        """
+        return 1 - self.evaluated / self.individuals if self.individuals else 0.0
+
+    def __call__(self, population):
+        if isinstance(population, tuple):
+            rooms, skip = population
+            # Skipped rooms are told apart from visited ones by adding the number of rooms
+            _, first, inverse = np.unique(rooms + skip * rooms.shape[1], axis=0, return_index=True,
+                                          return_inverse=True)
+            unique_fitness = self.evaluate_population((rooms[first], skip[first]))
+            fitness_scores = np.asarray(unique_fitness)[inverse.ravel()].tolist()
+            n_unique = len(first)
+        else:
+            unique, inverse, positions = [], [], {}
+            for individual in population:
+                key = tuple(individual)
+                position = positions.get(key)
+                if position is None:
+                    position = positions[key] = len(unique)
+                    unique.append(individual)
+                inverse.append(position)
+            unique_fitness = self.evaluate_population(unique)
+            fitness_scores = [unique_fitness[position] for position in inverse]
+            n_unique = len(unique)
+
+        self.individuals += len(fitness_scores)
+        self.evaluated += n_unique
+        self.last_ratio = 1 - n_unique / len(fitness_scores) if fitness_scores else 0.0
+        return fitness_scores
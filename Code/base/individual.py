@@ -1,74 +1,79 @@
 import random
+from array import array
+from base.problem import DEFAULT_PROBLEM, Problem
 
 
-def valid_indiv(individual):
+def valid_indiv(individual, problem=DEFAULT_PROBLEM):
     """
         Function to check if an individual meets the necessary conditions to be valid
         --------
         Parameters:
             individual : list
                         List representing an individual.
+            problem : Problem, default DEFAULT_PROBLEM
+                        Definition of the rooms and of the rules a valid individual needs to follow
         Returns:
             Boolean
                     True if individual is valid, False otherwise
         """
-    # Check if each room is visited only once
-    for i in [0,1,3,4,5,6,7]:
-        if i not in individual:
-            return False
-
-    # Checking if there are no repeated individuals
-    if len(set(individual)) != len(individual):
+    # Check if each room is visited only once and the length is correct. The positions of each room are kept, so that
+    # each of the other conditions is checked in constant time
+    position = problem.positions(individual)
+    if position is None:
         return False
 
-    # Check if the length is 8
-    if len(individual) != 8:
+    # Check if the final room (Room H) is the last room
+    if individual[-1] != problem.final_room:
         return False
 
-    # Check if Room A is visited before Room F
-    if individual.index(0) > individual.index(5):
-        return False
-
-    # Check if Room C is not in the list only if Room B is visited right after Room F
-    if 99 in individual and individual.index(1) != individual.index(5)+1:
-        return False
+    # Check the precedence conditions (Room A is visited before Room F)
+    for before, after in problem.precedence:
+        if position[before] > position[after]:
+            return False
 
-    # Check if Room H is the last room
-    if individual[-1] != 7:
-        return False
+    # Check if an optional room (Room C) is not in the list only if its condition is met (Room B is visited right after
+    # Room F)
+    for room, (first, second) in problem.optional.items():
+        if individual[position[room]] != room and position[second] != position[first] + 1:
+            return False
 
     return True
 
 
-def create_indiv():
+def create_indiv(problem=DEFAULT_PROBLEM):
     """
         Creating an individual in the population
         --------
+        Parameters:
+            problem : Problem, default DEFAULT_PROBLEM
+                        Definition of the rooms and of the rules a valid individual needs to follow
         Returns:
             list
                 Individual of length 8, representing a path with rooms from A to H, in number format, starting in 0 until 7
         """
 
-    individual = list(range(0, 7))
-    # Shuffle the first 7 rooms (Room H needs to be the last one, so we do not shuffle it)
+    individual = problem.free_rooms[:]
+    # Shuffle the rooms (Room H needs to be the last one, so we do not shuffle it)
     random.shuffle(individual)
-    individual.append(7)  #Appending 7 (room H) at the end
+    individual.append(problem.final_room)  #Appending room H at the end
 
-    if individual.index(1) == individual.index(5)+1:   # Checking if room B is seen right after room F
-        # Set room C as optional
-        if random.choice([True, False]):
-            individual[individual.index(2)] = 99
-            # population_set.append(sol_i)
+    for room, (first, second) in problem.optional.items():
+        if individual.index(second) == individual.index(first)+1:   # Checking if room B is seen right after room F
+            # Set room C as optional
+            if random.choice([True, False]):
+                individual[individual.index(room)] = problem.markers[room]
     return individual
 
 
-def create_pop(population_size):
+def create_pop(population_size, problem=DEFAULT_PROBLEM):
     """
         Function to create the population
         --------
         Parameters:
             population_size : integer
                               Size of the population
+            problem : Problem, default DEFAULT_PROBLEM
+                        Definition of the rooms and of the rules a valid individual needs to follow
         Returns:
             list
                 List of lists, with each list representing an individual
@@ -76,14 +81,14 @@ def create_pop(population_size):
     population = []   # Initializing an empty list, where we will put our individuals to form a population
 
     while len(population) < population_size:  # Making sure it has the necessary size
-        individual = create_indiv()
-        if valid_indiv(individual):   # Confirming that only valid individuals are part of the population
+        individual = create_indiv(problem)
+        if valid_indiv(individual, problem):   # Confirming that only valid individuals are part of the population
             population.append(individual)
 
     return population
 
 
-def calculate_individual_fitness(individual, focus_loss):
+def calculate_individual_fitness(individual, focus_loss, problem=DEFAULT_PROBLEM):
     """
         Calculates the fitness of an individual, based on the loss of focus from room to room
         --------
@@ -92,52 +97,253 @@ def calculate_individual_fitness(individual, focus_loss):
                         List representing a path, with rooms represented as numbers from 0 to 7 (A to H).
             focus_loss : list
                         List with our data, that has the losses of focus from room to room.
+            problem : Problem, default DEFAULT_PROBLEM
+                        Definition of the rooms and of the rules a valid individual needs to follow
         Returns:
             list
                 Fitness of an individual, in percentage
         """
     fitness_score = 0   # This is the initial fitness score of any solution, as it cannot be higher than 100%
+    markers = problem.room_of
 
-    for room in range(len(individual) - 1):
-        room1 = individual[room]       # Defining the first room
-        room2 = individual[room + 1]   # Getting the next room
-        if room1 == 99:  # If room1 is 99, it means C is not in the list, so we do not need to calculate that focus loss
-            continue     # so we move to the next iteration
+    previous_room = None   # Last room that was visited, skipped rooms (99) are never the previous room
+    for room in individual:
+        if room in markers:   # If the room is 99, it means C is not in the list, so we do not calculate that focus loss
+            continue          # and the focus loss is taken from the room before it to the room after it
 
-        if room2 == 99:   # If the second room is 99, meaning that C is not accessed, we need to skip to the next room
-            if room + 2 < len(individual):    # Checking if there are any rooms after the current room2
-                room2 = individual[room + 2]  # Updating room2 with the correct value, as 99 needs to be skipped
-            else:
-                break   # Breaking out of the loop because there are no more rooms to consider after the current room2
-
-        fitness_score += focus_loss[room1][room2]   # Subtracting the loss of focus in each iteration
+        if previous_room is not None:
+            fitness_score += focus_loss[previous_room][room]   # Adding the loss of focus in each iteration
+        previous_room = room
 
-    if not valid_indiv(individual):  # If we have a valid individual, we do not want it to continue in the next generations
-        fitness_score = 150           # So a very high fitness is attributed
+    if not valid_indiv(individual, problem):  # If we have a valid individual, we do not want it to continue in the next generations
+        fitness_score = problem.penalty           # So a very high fitness is attributed
 
     return round(fitness_score, 1)
 
 
-def calculate_pop_fit(focus_loss):
+def calculate_pop_fit(focus_loss, cache=None, problem=DEFAULT_PROBLEM):
     """
     Calculates the fitness of each individual in the population.
     --------
     Parameters:
         focus_loss : list
                     List with our data, that has the losses of focus from room to room.
+        cache : FitnessCache, default None
+                    If indicated, fitness values are looked up in (and stored to) the cache, so that repeated
+                    individuals are not scored again. The same cache can be shared by every run on this focus_loss
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms and of the rules a valid individual needs to follow
     Returns:
         list
             Fitness for each element in the population.
     """
+    if cache is not None:
+        cache.bind(focus_loss)   # A cache can only hold values computed with one dataset
 
     # Using a nested functions to avoid passing focus loss as a parameter for the GA
     def inner_calculate_pop_fit(population):
 
         fitness_scores = []   # Initializing hte list that will store the fitness values
         for individual in population:
-            fitness_score = calculate_individual_fitness(individual, focus_loss)   # Calculating each individual fitness
+            if cache is None:
+                fitness_score = calculate_individual_fitness(individual, focus_loss, problem)   # Calculating each individual fitness
+            else:
+                genome = tuple(individual)   # Lists cannot be used as keys, so a tuple is used
+                fitness_score = cache.get(genome)
+                if fitness_score is None:   # Only calculating the fitness if it was not seen before
+                    fitness_score = calculate_individual_fitness(individual, focus_loss, problem)
+                    cache.put(genome, fitness_score)
             fitness_scores.append(fitness_score)   # Appending each score to the list with all the fitness values in the population
         return fitness_scores
 
     return inner_calculate_pop_fit
 
+
+def _typecode(size):
+    """
+    Smallest array type that holds the rooms of a problem with size rooms
+    """
+    return 'b' if size <= 128 else 'h' if size <= 32768 else 'i'
+
+
+class Individual:
+    """
+    Compact individual: the rooms are stored in an array of small integers, in the order they are visited, and the
+    skipped optional rooms in a bit mask (bit r is set when room r is skipped), instead of a list of Python integers
+    with the value 99 for room C. Its hash and its fitness are kept once computed, and forgotten when it's changed.
+    It can be read like the list representation (with the marker of each skipped room), so valid_indiv,
+    calculate_individual_fitness and calculate_pop_fit can be given individuals directly. It should only be changed
+    with item assignment, swap, reverse and set_skipped, so that the kept values are forgotten (the array of rooms is
+    private for that reason)
+    --------
+    Parameters:
+        individual : list
+                List representing an individual, with the marker of each skipped room
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms, with the optional rooms and the values that replace them
+        fitness : float, default None
+                Fitness of the individual, if it's already known
+    """
+
+    __slots__ = ('_genome', 'skip', 'problem', '_hash', '_fitness')
+
+    def __init__(self, individual, problem=DEFAULT_PROBLEM, fitness=None):
+        room_of = problem.room_of
+        self._genome = array(_typecode(problem.size), [room_of.get(room, room) for room in individual])
+        self.skip = 0
+        for marker, room in room_of.items():
+            if marker in individual:
+                self.skip |= 1 << room
+        self.problem = problem
+        self._hash = None
+        self._fitness = fitness
+
+    @property
+    def fitness(self):
+        return self._fitness
+
+    @fitness.setter
+    def fitness(self, value):
+        self._fitness = value
+
+    def clone(self):
+        """
+        Returns a copy of the individual, that keeps its hash and fitness. Only the array of rooms is copied
+        """
+        copy = Individual.__new__(Individual)
+        copy._genome = array(self._genome.typecode, self._genome)
+        copy.skip = self.skip
+        copy.problem = self.problem
+        copy._hash = self._hash
+        copy._fitness = self._fitness
+        return copy
+
+    __copy__ = clone
+
+    def __deepcopy__(self, memo):
+        return self.clone()
+
+    def skipped(self, room):
+        return bool(self.skip >> room & 1)
+
+    def tolist(self):
+        """
+        Returns the individual in the list representation
+        """
+        if not self.skip:
+            return self._genome.tolist()
+        return [self.problem.markers[room] if self.skip >> room & 1 else room for room in self._genome]
+
+    def __len__(self):
+        return len(self._genome)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.tolist()[index]
+        room = self._genome[index]
+        return self.problem.markers[room] if self.skip >> room & 1 else room
+
+    def __eq__(self, other):
+        if isinstance(other, Individual):
+            return self.skip == other.skip and self._genome == other._genome
+        return self.tolist() == other
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self._genome.tobytes(), self.skip))
+        return self._hash
+
+    def __repr__(self):
+        return f'Individual({self.tolist()}, fitness={self._fitness})'
+
+    def _changed(self):
+        self._hash = None
+        self._fitness = None
+
+    def __setitem__(self, index, value):
+        """
+        Sets a room (or the rooms of a slice), given as in the list representation: the marker of an optional room
+        places the room and marks it as skipped. A slice needs as many values as the rooms it replaces, as an individual
+        always has one position for each room
+        """
+        room_of = self.problem.room_of
+        values = list(value) if isinstance(index, slice) else [value]   # value can be any iterable, read only once
+        if isinstance(index, slice) and len(values) != len(range(*index.indices(len(self._genome)))):
+            raise ValueError('slice assignment cannot change the length of an individual')
+        for value in values:
+            room = room_of.get(value, value)
+            if value in room_of:
+                self.skip |= 1 << room
+            else:
+                self.skip &= ~(1 << room)
+        if isinstance(index, slice):
+            self._genome[index] = array(self._genome.typecode, [room_of.get(value, value) for value in values])
+        else:
+            self._genome[index] = room_of.get(values[0], values[0])
+        self._changed()
+
+    def swap(self, i, j):
+        """
+        Switches the rooms in positions i and j (a skipped room stays skipped)
+        """
+        genome = self._genome
+        genome[i], genome[j] = genome[j], genome[i]
+        self._changed()
+
+    def reverse(self, start, end):
+        """
+        Reverses the rooms between positions start and end (both included)
+        """
+        self._genome[start:end + 1] = self._genome[start:end + 1][::-1]
+        self._changed()
+
+    def set_skipped(self, room, skipped=True):
+        if skipped:
+            self.skip |= 1 << room
+        else:
+            self.skip &= ~(1 << room)
+        self._changed()
+
+
+def to_individuals(population, problem=DEFAULT_PROBLEM, fitness=None):
+    """
+    Converts a population of lists into Individual objects, with their fitness if it's given
+    --------
+    Parameters:
+        population : list
+                    List of lists, with each list representing an individual
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms, with the optional rooms and the values that replace them
+        fitness : list, default None
+                    Fitness of each individual
+    Returns:
+        list
+            List of Individual
+    """
+    fitness = fitness or [None] * len(population)
+    return [Individual(individual, problem, fitness_score) for individual, fitness_score in zip(population, fitness)]
+
+
+def evaluate_individuals(individuals, evaluate_population):
+    """
+    Returns the fitness of each Individual, only evaluating the ones whose fitness is not known (the ones created
+    without it or changed since they were evaluated), in a single call of evaluate_population with their lists
+    --------
+    Parameters:
+        individuals : list
+                    List of Individual
+        evaluate_population : function
+                    function that will return the fitness of a population of lists, such as calculate_pop_fit
+    Returns:
+        list
+            Fitness of each individual
+    """
+    missing = [individual for individual in individuals if individual.fitness is None]
+    if missing:
+        fitness_scores = evaluate_population([individual.tolist() for individual in missing])
+        for individual, fitness_score in zip(missing, fitness_scores):
+            individual.fitness = fitness_score
+    return [individual.fitness for individual in individuals]
@@ -0,0 +1,203 @@
+import random
+from functools import lru_cache
+import numpy as np
+from base.population import decode_pop
+from base.problem import DEFAULT_PROBLEM
+
+
+# Maximum number of valid orders listed for a group of rooms with precedence rules. Bigger groups are sampled by
+# drawing orders until they are valid
+MAX_ORDERS = 10000
+
+
+@lru_cache(maxsize=None)
+def precedence_groups(problem=DEFAULT_PROBLEM):
+    """
+    Splits the rooms with precedence rules into groups that share no rule, and lists every valid order of each group
+    (for room A before room F, only A, F). Computed once per problem
+    --------
+    Parameters:
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        list
+            List of (rooms, predecessors, orders) for each group: array with its rooms in increasing order, dictionary
+            with the rooms that need to come before each one, and (n_orders, n_rooms) array with the valid orders (None
+            if there are more than MAX_ORDERS)
+    """
+    # Rules with the final room are left out, since it's always the last one
+    precedence = [pair for pair in problem.precedence if problem.final_room not in pair]
+
+    # Joining the rooms of each rule into groups
+    group_of = {}
+    for before, after in precedence:
+        group = group_of.get(before, {before}) | group_of.get(after, {after})
+        for room in group:
+            group_of[room] = group
+    groups = {id(group): sorted(group) for group in group_of.values()}
+
+    result = []
+    for rooms in sorted(groups.values()):
+        predecessors = {room: {before for before, after in precedence if after == room} for room in rooms}
+        orders = []
+
+        def extend(order, placed):
+            if len(orders) > MAX_ORDERS:
+                return
+            if len(order) == len(rooms):
+                orders.append(list(order))
+                return
+            for room in rooms:
+                if room not in placed and predecessors[room] <= placed:
+                    order.append(room)
+                    placed.add(room)
+                    extend(order, placed)
+                    placed.remove(room)
+                    order.pop()
+
+        extend([], set())
+        if not orders:
+            raise ValueError('The precedence rules have a cycle, no individual can follow them')
+
+        orders = np.array(orders, dtype=np.int64) if len(orders) <= MAX_ORDERS else None
+        if orders is not None:
+            orders.flags.writeable = False
+        result.append((np.array(rooms, dtype=np.int64), predecessors, orders))
+    return result
+
+
+def _sample_orders(rooms, predecessors, orders, n, rng):
+    """
+    Draws n valid orders of a group of rooms, uniformly
+    """
+    if orders is not None:
+        return orders[rng.integers(0, len(orders), n)]
+
+    # Too many orders to list them: drawing random orders and keeping the valid ones, until there are n
+    sampled = np.empty((0, len(rooms)), dtype=np.int64)
+    index = {room: i for i, room in enumerate(rooms)}
+    pairs = [(index[before], index[after]) for after in rooms for before in predecessors[after]]
+    while len(sampled) < n:
+        candidates = rng.permuted(np.broadcast_to(rooms, (2 * n, len(rooms))), axis=1)
+        # rooms is sorted, so sorting each candidate gives, for the i-th room of the group, its position in the candidate
+        position = np.argsort(candidates, axis=1)
+        valid = np.ones(len(candidates), dtype=bool)
+        for before, after in pairs:
+            valid &= position[:, before] < position[:, after]
+        sampled = np.concatenate([sampled, candidates[valid]])
+    return sampled[:n]
+
+
+def feasible_pop_array(pop_size, rng, problem=DEFAULT_PROBLEM):
+    """
+    Creates a population of valid individuals in the array representation (see base/population.py), without rejecting
+    any. The individuals have the same distribution as the ones of create_pop: every order of the rooms that follows
+    the precedence rules is equally likely, and each optional room is skipped with probability 1/2 when its condition is
+    met.
+    The rooms are shuffled, and then the rooms of each group with precedence rules are placed again in the positions
+    they took, in an order drawn from the valid ones. Since those positions are random, the result is uniform among the
+    valid orders
+    --------
+    Parameters:
+        pop_size : integer
+                Size of the population
+        rng : numpy Generator
+                Random number generator
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        rooms, skip
+    """
+    free_rooms = np.array(problem.free_rooms, dtype=np.int64)
+    rooms = np.empty((pop_size, problem.size), dtype=np.int64)
+    rooms[:, :-1] = rng.permuted(np.broadcast_to(free_rooms, (pop_size, len(free_rooms))), axis=1)
+    rooms[:, -1] = problem.final_room
+    individuals = np.arange(pop_size)[:, None]
+
+    # Groups of rooms without rules between them are independent in a random order, so each one is placed separately
+    position = np.argsort(rooms, axis=1)
+    for group_rooms, predecessors, orders in precedence_groups(problem):
+        slots = np.sort(position[:, group_rooms], axis=1)
+        rooms[individuals, slots] = _sample_orders(group_rooms, predecessors, orders, pop_size, rng)
+
+    # Skipping each optional room, with probability 1/2, where the room after it is right after the room before it
+    skip = np.zeros(rooms.shape, dtype=bool)
+    if problem.optional:
+        position = np.argsort(rooms, axis=1)
+        for room, (first, second) in problem.optional.items():
+            allowed = position[:, second] == position[:, first] + 1
+            skip[individuals[:, 0], position[:, room]] = allowed & (rng.random(pop_size) < 0.5)
+    return rooms, skip
+
+
+def nearest_neighbour_indiv(focus_loss, start, problem=DEFAULT_PROBLEM):
+    """
+    Builds a valid individual starting in room start and always going to the room with the lowest loss of focus among
+    the ones whose preceding rooms were already visited. Optional rooms are skipped when their condition is met and that
+    lowers the loss of focus
+    --------
+    Parameters:
+        focus_loss : list
+                List with our data, that has the losses of focus from room to room.
+        start : integer
+                First room, it needs to have no preceding rooms
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        list
+            Individual, with room H at the end
+    """
+    predecessors = {room: {before for before, after in problem.precedence if after == room}
+                    for room in problem.free_rooms}
+    individual = [start]
+    visited = {start}
+    while len(individual) < len(problem.free_rooms):
+        current = individual[-1]
+        available = [room for room in problem.free_rooms if room not in visited and predecessors[room] <= visited]
+        room = min(available, key=lambda room: focus_loss[current][room])
+        individual.append(room)
+        visited.add(room)
+    individual.append(problem.final_room)
+
+    for room, (first, second) in problem.optional.items():
+        index = individual.index(room)
+        if individual.index(second) == individual.index(first) + 1 and 0 < index < len(individual) - 1:
+            before, after = individual[index - 1], individual[index + 1]
+            if focus_loss[before][after] < focus_loss[before][room] + focus_loss[room][after]:
+                individual[index] = problem.markers[room]
+    return individual
+
+
+def create_feasible_pop(population_size, problem=DEFAULT_PROBLEM, focus_loss=None, heuristic_share=0.0):
+    """
+    Creates a population of valid individuals with feasible_pop_array, so that it can be used as create_population in
+    GA. The numpy generator is seeded from random, so the seed given to GA also fixes this population.
+    A share of the population can be built with nearest_neighbour_indiv instead, each one starting in a different room
+    --------
+    Parameters:
+        population_size : integer
+                Size of the population
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+        focus_loss : list, default None
+                List with our data, only needed if heuristic_share is higher than 0
+        heuristic_share : float, default 0.0
+                Number between 0 and 1 that indicates the share of the population built with the nearest neighbour
+                heuristic (at most one individual per possible starting room)
+    Returns:
+        list
+            List of lists, with each list representing an individual
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    population = decode_pop(*feasible_pop_array(population_size, rng, problem), problem)
+
+    if heuristic_share > 0:
+        if focus_loss is None:
+            raise ValueError('focus_loss is needed to build individuals with the nearest neighbour heuristic')
+        starts = [room for room in problem.free_rooms
+                  if not any(after == room for _, after in problem.precedence)]
+        random.shuffle(starts)
+        n_heuristic = min(round(heuristic_share * population_size), len(starts))
+        for index, start in enumerate(starts[:n_heuristic]):
+            population[index] = nearest_neighbour_indiv(focus_loss, start, problem)
+    return population
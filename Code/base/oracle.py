@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import permutations
+import numpy as np
+from base.population import batch_fitness, decode_pop
+from base.data import random_focus_gen
+from base.problem import DEFAULT_PROBLEM
+
+# Biggest problem that can be solved by enumeration (with 10 rooms there are 9! = 362880 paths to score)
+EXACT_MAX_ROOMS = 10
+
+# Results already computed, one entry per focus loss matrix, so that each instance is only solved once. Only the most
+# recently used ones are kept (like in FitnessCache), as each entry holds the fitness of every valid individual
+_exact_solutions = OrderedDict()
+EXACT_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=None)   # The valid individuals do not depend on the data, so they are only enumerated once
+def enumerate_valid(problem=DEFAULT_PROBLEM):
+    """
+    Enumerates every valid individual: the permutations of the rooms that follow the precedence conditions (room A
+    before room F), followed by the final room (room H), plus the version without each optional room (room C) of every
+    path where its condition is met (room B visited right after room F)
+    --------
+    Parameters:
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        rooms, skip
+            Array representation (see base.population) of all the valid individuals
+    """
+    if problem.size > EXACT_MAX_ROOMS:
+        raise ValueError(f'Only problems with up to {EXACT_MAX_ROOMS} rooms can be enumerated')
+
+    paths = np.array(list(permutations(problem.free_rooms)), dtype=np.int64).reshape(-1, problem.size - 1)
+    rooms = np.hstack([paths, np.full((len(paths), 1), problem.final_room)])   # Room H is always the last room
+    position = np.argsort(rooms, axis=1)
+
+    for before, after in problem.precedence:   # Room A is visited before Room F
+        kept = position[:, before] < position[:, after]
+        rooms, position = rooms[kept], position[kept]
+
+    skip = np.zeros(rooms.shape, dtype=bool)
+
+    # Paths where room C can be skipped are repeated, with room C marked as not visited
+    for room, (first, second) in problem.optional.items():
+        optional = position[:, second] == position[:, first] + 1
+        optional_skip = skip[optional]
+        optional_skip[np.arange(len(optional_skip)), position[optional, room]] = True
+
+        rooms = np.vstack([rooms, rooms[optional]])
+        position = np.vstack([position, position[optional]])
+        skip = np.vstack([skip, optional_skip])
+
+    rooms.setflags(write=False)   # The arrays are shared by every call, so they cannot be changed
+    skip.setflags(write=False)
+    return rooms, skip
+
+
+def solve_exact(focus_loss, problem=DEFAULT_PROBLEM):
+    """
+    Finds the best individual by scoring every valid individual in one batch. With 8 rooms there are only 2880 of them,
+    so this takes a few milliseconds and can be used instead of the GA, or as a reference for its results
+    --------
+    Parameters:
+        focus_loss : list
+                    List with our data, that has the losses of focus from room to room.
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        best_solution, best_fitness, fitness_scores
+            Best individual (as a list), its fitness, and an array with the fitness of every valid individual
+    """
+    focus_loss = np.asarray(focus_loss, dtype=float)
+    key = (problem, focus_loss.tobytes())
+
+    if key in _exact_solutions:
+        _exact_solutions.move_to_end(key)   # Marking it as the most recently used
+    else:
+        rooms, skip = enumerate_valid(problem)
+        fitness_scores = np.round(batch_fitness(rooms, skip, focus_loss), 1)
+        fitness_scores.setflags(write=False)   # The array is returned to every caller, so it cannot be changed
+        best = int(np.argmin(fitness_scores))
+        best_solution = decode_pop(rooms[best:best + 1], skip[best:best + 1], problem)[0]
+        _exact_solutions[key] = (best_solution, float(fitness_scores[best]), fitness_scores)
+        if len(_exact_solutions) > EXACT_CACHE_SIZE:
+            _exact_solutions.popitem(last=False)   # The first item is the least recently used
+
+    best_solution, best_fitness, fitness_scores = _exact_solutions[key]
+    return list(best_solution), best_fitness, fitness_scores   # Copying the list so the cached value is not changed
+
+
+def optimality_gap(fitness, focus_loss, problem=DEFAULT_PROBLEM):
+    """
+    Returns how far a fitness value is from the optimum of the instance, relative to the optimum
+    --------
+    Parameters:
+        fitness : float
+                Fitness of the solution found (for example, by the GA)
+        focus_loss : list
+                    List with our data, that has the losses of focus from room to room.
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        float
+            (fitness - optimum) / optimum, so 0 means the optimum was found
+    """
+    best_fitness = solve_exact(focus_loss, problem)[1]
+    return (fitness - best_fitness) / best_fitness
+
+
+def optimum_table(seeds, problem=DEFAULT_PROBLEM):
+    """
+    Precomputes the optimum of the random instances used in the grid searches
+    --------
+    Parameters:
+        seeds : list
+                Seeds given to random_focus_gen to create each instance
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        dict
+            Dictionary with each seed as key and (best_solution, best_fitness) as value
+    """
+    table = {}
+    for seed in seeds:
+        best_solution, best_fitness, _ = solve_exact(random_focus_gen(seed=seed, problem=problem), problem)
+        table[seed] = (best_solution, best_fitness)
+    return table
@@ -0,0 +1,280 @@
+import numpy as np
+from base.problem import DEFAULT_PROBLEM
+from base.workspace import Workspace
+
+# In the list representation room C (2) is replaced by 99 when it is not visited. In the array representation the room
+# is kept in its position and a boolean mask marks it as skipped, so that every row is still a permutation of the rooms
+
+
+def encode_pop(population, problem=DEFAULT_PROBLEM):
+    """
+    Converts a population of lists into its array representation
+    --------
+    Parameters:
+        population : list
+                    List of lists, with each list representing an individual
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms, with the optional rooms and the values that replace them
+    Returns:
+        rooms, skip
+            rooms is a (pop_size, n_rooms) integer matrix with the rooms visited by each individual, and skip is a boolean
+            matrix of the same shape that is True where the room is not visited (room C replaced by 99)
+    """
+    rooms = np.array(population, dtype=np.int64)   # One call to build the whole matrix
+    skip = np.zeros(rooms.shape, dtype=bool)
+
+    for marker, room in problem.room_of.items():
+        skipped = rooms == marker     # Marking the positions where room C is not visited
+        rooms[skipped] = room         # Keeping room C in its position, so rows are permutations
+        skip |= skipped
+    return rooms, skip
+
+
+def decode_pop(rooms, skip, problem=DEFAULT_PROBLEM):
+    """
+    Converts the array representation of a population back into a list of lists
+    --------
+    Parameters:
+        rooms : numpy array
+                (pop_size, n_rooms) integer matrix with the rooms visited by each individual
+        skip : numpy array
+                Boolean matrix of the same shape as rooms, True where the room is not visited
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms, with the optional rooms and the values that replace them
+    Returns:
+        list
+            List of lists, with each list representing an individual, using 99 for the rooms that are not visited
+    """
+    population = rooms.copy()
+    for room, marker in problem.markers.items():
+        population[skip & (rooms == room)] = marker
+    return population.tolist()
+
+
+def valid_pop(rooms, skip, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+    """
+    Vectorized version of valid_indiv, that checks the conditions for the whole population at once
+    --------
+    Parameters:
+        rooms : numpy array
+                (pop_size, n_rooms) integer matrix with the rooms visited by each individual
+        skip : numpy array
+                Boolean matrix of the same shape as rooms, True where the room is not visited
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+        out : numpy array, default None
+                Boolean array where the result is written. If None, a new array is created
+        workspace : Workspace, default None
+                Arrays to reuse (see base/workspace.py). If None, new arrays are created
+    Returns:
+        numpy array
+            Boolean array, True for the individuals that are valid
+    """
+    n, size = rooms.shape
+    valid = np.empty(n, dtype=bool) if out is None else out
+    if size != problem.size:   # Every individual needs to have the correct length
+        valid.fill(False)
+        return valid
+
+    workspace = workspace or Workspace()
+    rooms = workspace.contiguous('valid_rooms', rooms)
+    skip = workspace.contiguous('valid_skip', skip)
+    row_valid = workspace.array('valid_row', (n,), bool)
+    matches = workspace.array('valid_matches', (n, size), bool)
+
+    # Each room is visited only once: every room from 0 to size - 1 needs to be found in each row, and nothing else
+    room = workspace.array('valid_room', (n, size))
+    np.clip(rooms, 0, size - 1, out=room)
+    np.equal(room, rooms, out=matches)
+    np.all(matches, axis=1, out=valid)
+    room += workspace.row_starts(n, size, size)   # From now on, the flat index of each room in its row
+    matches.fill(False)
+    np.put(matches, room, True, mode='clip')
+    np.all(matches, axis=1, out=row_valid)
+    valid &= row_valid
+
+    # Only optional rooms can be skipped, so any other skipped position makes the individual invalid
+    required = workspace.array('valid_required', (size,), bool)
+    required.fill(True)
+    for optional_room in problem.optional:
+        required[optional_room] = False
+    np.subtract(room, workspace.row_starts(n, size, size), out=room)
+    np.take(required, room, out=matches, mode='clip')
+    matches &= skip
+    np.any(matches, axis=1, out=row_valid)
+    np.logical_not(row_valid, out=row_valid)
+    valid &= row_valid
+
+    # Positions of each room, so that the order conditions can be checked without searching the rows (the invalid
+    # rows found above can give any position, as they are not valid anyway)
+    room += workspace.row_starts(n, size, size)
+    position = workspace.array('valid_position', (n, size))
+    np.put(position, room, workspace.columns(n, size), mode='clip')
+
+    for before, after in problem.precedence:   # Room A is visited before Room F
+        np.less(position[:, before], position[:, after], out=row_valid)
+        valid &= row_valid
+
+    # Room C can only be skipped if Room B is visited right after Room F
+    flat = workspace.array('valid_flat', (n,))
+    skipped = workspace.array('valid_skipped', (n,), bool)
+    for optional_room, (first, second) in problem.optional.items():
+        np.add(position[:, optional_room], workspace.row_starts(n, size), out=flat)
+        np.take(skip, flat, out=skipped, mode='clip')
+        np.subtract(position[:, second], position[:, first], out=flat)
+        np.equal(flat, 1, out=row_valid)
+        np.logical_not(skipped, out=skipped)
+        row_valid |= skipped
+        valid &= row_valid
+
+    np.equal(rooms[:, -1], problem.final_room, out=row_valid)   # Room H is the last room
+    valid &= row_valid
+
+    return valid
+
+
+def batch_fitness(rooms, skip, focus_loss, out=None, workspace=None):
+    """
+    Calculates the fitness of the whole population with a single gather-and-sum over the focus loss matrix. Skipped
+    rooms are left out of the path, so the focus loss is taken between the rooms before and after them
+    --------
+    Parameters:
+        rooms : numpy array
+                (pop_size, n_rooms) integer matrix with the rooms visited by each individual
+        skip : numpy array
+                Boolean matrix of the same shape as rooms, True where the room is not visited
+        focus_loss : list or numpy array
+                List with our data, that has the losses of focus from room to room.
+        out : numpy array, default None
+                Array where the fitness is written. If None, a new array is created
+        workspace : Workspace, default None
+                Arrays to reuse (see base/workspace.py). If None, new arrays are created
+    Returns:
+        numpy array
+            Fitness of each individual (without rounding or the penalty for invalid individuals)
+    """
+    focus_loss = np.asarray(focus_loss, dtype=float)
+    workspace = workspace or Workspace()
+    n, size = rooms.shape
+    rooms = workspace.contiguous('fitness_rooms', rooms)
+    skip = workspace.contiguous('fitness_skip', skip)
+    fitness_scores = np.empty(n) if out is None else out
+
+    # For each position, the index of the last visited room up to that position (-1 if there is none yet)
+    visited = workspace.array('fitness_visited', (n, size))
+    visited.fill(-1)
+    kept = workspace.array('fitness_kept', (n, size), bool)
+    np.logical_not(skip, out=kept)
+    np.copyto(visited, workspace.columns(n, size), where=kept)
+    last_kept = workspace.array('fitness_last_kept', (n, size))
+    np.maximum.accumulate(visited, axis=1, out=last_kept)
+
+    # The room each position is reached from is the last visited room before it, found by shifting the whole matrix
+    # by one position (the first position of each row is reached from nothing)
+    source = workspace.array('fitness_source', (n, size))
+    source.reshape(-1)[1:] = last_kept.reshape(-1)[:-1]
+    source[:, 0] = -1
+
+    # Only counting the transitions into rooms that are visited and that have a visited room before them
+    not_counted = workspace.array('fitness_not_counted', (n, size), bool)
+    np.less(source, 0, out=not_counted)
+    not_counted |= skip
+
+    np.maximum(source, 0, out=source)
+    source += workspace.row_starts(n, size, size)
+    source_room = workspace.array('fitness_source_room', (n, size))
+    np.take(rooms, source, out=source_room, mode='clip')
+    source_room *= focus_loss.shape[1]   # Flat index of each transition in the focus loss matrix
+    source_room += rooms
+    loss = workspace.array('fitness_loss', (n, size), float)
+    np.take(focus_loss, source_room, out=loss, mode='clip')
+    np.copyto(loss, 0, where=not_counted)
+    return np.sum(loss, axis=1, out=fitness_scores)
+
+
+def score_pop(rooms, skip, focus_loss, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+    """
+    Fitness of a population in the array representation, rounded and with the penalty for invalid individuals, as
+    given by calculate_individual_fitness
+    --------
+    Parameters:
+        rooms, skip : numpy array
+                Population in the array representation
+        focus_loss : numpy array
+                Matrix with the losses of focus from room to room
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+        out : numpy array, default None
+                Array where the fitness is written. If None, a new array is created
+        workspace : Workspace, default None
+                Arrays to reuse (see base/workspace.py). If None, new arrays are created
+    Returns:
+        numpy array
+    """
+    workspace = workspace or Workspace()
+    fitness_scores = batch_fitness(rooms, skip, focus_loss, out, workspace)
+    np.round(fitness_scores, 1, out=fitness_scores)
+    invalid = valid_pop(rooms, skip, problem, workspace.array('score_invalid', (len(rooms),), bool), workspace)
+    np.logical_not(invalid, out=invalid)
+    np.copyto(fitness_scores, problem.penalty, where=invalid)   # Same penalty given to invalid individuals
+    return fitness_scores
+
+
+def calculate_pop_fit_array(focus_loss, cache=None, problem=DEFAULT_PROBLEM):
+    """
+    Vectorized alternative to calculate_pop_fit. The population is converted to the array representation and scored in
+    a few numpy calls, giving the same values as calculate_individual_fitness
+    --------
+    Parameters:
+        focus_loss : list
+                    List with our data, that has the losses of focus from room to room.
+        cache : FitnessCache, default None
+                    If indicated, only the individuals that are not in the cache are scored, and their values are stored
+        problem : Problem, default DEFAULT_PROBLEM
+                    Definition of the rooms and of the rules a valid individual needs to follow
+    Returns:
+        function
+            Function that receives a population and returns the fitness for each element in the population. Without
+            a cache, it also has a score_into(rooms, skip, out, workspace) attribute, that writes the fitness of a
+            population in the array representation into out, which array_GA uses to score each generation into its
+            buffers without creating new arrays
+    """
+    if cache is not None:
+        cache.bind(focus_loss)
+
+    focus_loss = np.asarray(focus_loss, dtype=float)   # Converting only once, instead of at each generation
+
+    def score(rooms, skip):
+        return score_pop(rooms, skip, focus_loss, problem).tolist()   # A list, so it's used the same way as before
+
+    def inner_calculate_pop_fit(population):
+
+        # The population can be given as a list of lists or already in the array representation
+        if isinstance(population, tuple):
+            if cache is not None:
+                population = decode_pop(*population, problem)   # The cache is keyed by the list representation
+            else:
+                return score(*population)
+
+        if cache is None:
+            return score(*encode_pop(population, problem))
+
+        genomes = [tuple(individual) for individual in population]
+        fitness_scores = [cache.get(genome) for genome in genomes]
+        missing = [i for i, fitness in enumerate(fitness_scores) if fitness is None]
+
+        if missing:   # Scoring all the individuals that were not in the cache in a single batch
+            new_scores = score(*encode_pop([population[i] for i in missing], problem))
+            for i, fitness in zip(missing, new_scores):
+                fitness_scores[i] = fitness
+                cache.put(genomes[i], fitness)
+
+        return fitness_scores
+
+    if cache is None:
+        def score_into(rooms, skip, out, workspace=None):
+            score_pop(rooms, skip, focus_loss, problem, out, workspace)
+
+        inner_calculate_pop_fit.score_into = score_into
+
+    return inner_calculate_pop_fit
@@ -0,0 +1,86 @@
+class Problem:
+    """
+    Definition of the rooms to visit and of the rules that a valid path needs to follow
+    --------
+    Parameters:
+        size : integer
+                Number of rooms, represented as numbers from 0 to size - 1
+        final_room : integer, default None
+                Room that always needs to be the last one. If None, it's the room with the highest number
+        precedence : list, default ()
+                List of (before, after) pairs, meaning that room before needs to be visited before room after
+        optional : dict, default None
+                Dictionary with the rooms that can be skipped as keys, and a (first, second) pair as values, meaning
+                that the room can only be skipped if room second is visited right after room first
+        markers : dict, default None
+                Value that replaces each optional room when it's not visited. If None, room r is replaced by -(r + 1),
+                so that the value can never be confused with a room, whatever the size
+        costly_pairs : list, default ()
+                Pairs of rooms whose focus loss needs to be higher than the focus loss between any other rooms, used
+                when generating random data
+        penalty : float, default 150
+                Fitness given to invalid individuals
+    """
+
+    def __init__(self, size, final_room=None, precedence=(), optional=None, markers=None, costly_pairs=(),
+                 penalty=150):
+
+        self.size = size
+        self.final_room = size - 1 if final_room is None else final_room
+        self.precedence = tuple(precedence)
+        self.optional = dict(optional or {})
+        self.costly_pairs = tuple(costly_pairs)
+        self.penalty = penalty
+
+        # Value used for each optional room when it's skipped, and the opposite mapping to get the room from the value
+        self.markers = {room: -(room + 1) for room in self.optional}
+        self.markers.update(markers or {})
+        self.room_of = {marker: room for room, marker in self.markers.items()}
+
+        # Rooms that can be in any position, in increasing order (the final room is added at the end of each path)
+        self.free_rooms = [room for room in range(size) if room != self.final_room]
+
+        rooms = set(range(size))
+        for marker in self.room_of:
+            if marker in rooms:
+                raise ValueError(f'Marker {marker} is also a room, it needs to be outside of 0 to {size - 1}')
+        for pair in self.precedence + tuple(self.optional.values()) + self.costly_pairs:
+            if not set(pair) <= rooms:
+                raise ValueError(f'Rooms {pair} are not between 0 and {size - 1}')
+
+    def positions(self, individual):
+        """
+        Returns the position of each room in an individual, so that each rule can be checked without searching it
+        --------
+        Parameters:
+            individual : list
+                        List representing an individual.
+        Returns:
+            list or None
+                List where the value at index r is the position of room r (or of its marker, if it's skipped). None if
+                the individual does not visit each room exactly once, or has values that are not rooms
+        """
+        if len(individual) != self.size:
+            return None
+
+        position = [-1] * self.size
+        room_of = self.room_of
+        try:
+            for index, room in enumerate(individual):
+                room = room_of.get(room, room)   # Skipped rooms are placed where their marker is
+                if not 0 <= room < self.size or position[room] != -1:   # Unknown or repeated room
+                    return None
+                position[room] = index
+        except TypeError:   # Values that are not rooms at all (None, strings, floats...)
+            return None
+        return position
+
+    def __repr__(self):
+        return (f'Problem(size={self.size}, final_room={self.final_room}, precedence={list(self.precedence)}, '
+                f'optional={self.optional})')
+
+
+# The problem from the project description: rooms A to H (0 to 7), room H is the last one, room A is visited before
+# room F and room C can be skipped if room B is visited right after room F, in which case it's replaced by 99
+DEFAULT_PROBLEM = Problem(8, final_room=7, precedence=[(0, 5)], optional={2: (5, 1)}, markers={2: 99},
+                          costly_pairs=[(0, 2)])
@@ -0,0 +1,188 @@
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from base.population import encode_pop, score_pop
+from base.problem import DEFAULT_PROBLEM
+
+# Blocks of shared memory already attached in this process, by name, so that a worker that receives the same array in
+# every task maps it only once. Only the most recent ones are kept open
+_attached = OrderedDict()
+MAX_ATTACHED = 16
+
+
+class SharedArray:
+    """
+    Numpy array stored in a block of shared memory. When it's sent to another process (as an argument of a task, or of
+    a Process), only its name, shape and dtype are pickled, and the other process maps the same memory, without copying
+    the data. The process that created it owns the block, and removes it on close
+    --------
+    Parameters:
+        shape : tuple
+                Shape of the array
+        dtype : numpy dtype, default float
+                Type of the values
+    """
+
+    def __init__(self, shape, dtype=float, _block=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = _block is None
+        if _block is None:
+            size = max(1, math.prod(self.shape) * self.dtype.itemsize)
+            _block = shared_memory.SharedMemory(create=True, size=size)
+        self._block = _block
+        self.name = _block.name
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=_block.buf)
+
+    @classmethod
+    def from_array(cls, values, dtype=None):
+        """
+        Creates a shared array with a copy of values (for example the focus loss matrix, given as a list of lists)
+        """
+        values = np.asarray(values, dtype=dtype)
+        shared = cls(values.shape, values.dtype)
+        shared.array[...] = values
+        return shared
+
+    @classmethod
+    def attach(cls, name, shape, dtype):
+        """
+        Maps a shared array created by another process, reusing the mapping if it was already attached in this process
+        """
+        if name in _attached:
+            _attached.move_to_end(name)
+            return _attached[name]
+        # The worker processes share the resource tracker of the process that created the block, so the block is
+        # still removed only once, by its owner
+        block = shared_memory.SharedMemory(name=name)
+        shared = cls(shape, dtype, _block=block)
+        _attached[name] = shared
+        while len(_attached) > MAX_ATTACHED:
+            _attached.popitem(last=False)[1].close()
+        return shared
+
+    def __reduce__(self):
+        return SharedArray.attach, (self.name, self.shape, self.dtype.str)
+
+    def close(self):
+        """
+        Stops using the array in this process. The owner also removes the block, so it can no longer be attached
+        """
+        if self._block is None:
+            return
+        self.array = None
+        self._block.close()
+        if self.owner:
+            self._block.unlink()
+        self._block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Focus loss matrix and problem of the evaluator, set once in each worker process
+_worker = {}
+
+
+def _init_worker(focus_loss, problem):
+    # With the spawn start method the matrix arrives attached like any buffer. It's used by every task, so it's taken
+    # out of the attached blocks, where it would be closed once enough newer buffers were attached
+    _attached.pop(focus_loss.name, None)
+    _worker['focus_loss'] = focus_loss
+    _worker['problem'] = problem
+
+
+def _score_range(rooms, skip, fitness, start, end):
+    """
+    Scores the individuals from start to end (not included) of the shared population, writing into the shared fitness
+    """
+    fitness.array[start:end] = score_pop(rooms.array[start:end], skip.array[start:end], _worker['focus_loss'].array,
+                                         _worker['problem'])
+
+
+class SharedEvaluator:
+    """
+    Evaluates populations in a pool of worker processes, like calculate_pop_fit_array. The focus loss matrix is placed
+    in shared memory once, when the pool starts, and each population is copied into shared buffers, so the tasks sent
+    to the workers only carry the names of the buffers and the range of individuals to score: the cost of a task does
+    not depend on the size of the matrix or of the population.
+    It can be used as evaluate_population in GA, and should be closed (or used in a with block) to stop the workers and
+    free the shared memory
+    --------
+    Parameters:
+        focus_loss : list
+                List with our data, that has the losses of focus from room to room.
+        workers : integer, default None
+                Number of processes. If None, the number of CPUs is used
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+        mp_context : multiprocessing context, default None
+                Context used to start the workers (for example multiprocessing.get_context('spawn')). If None, the
+                default start method is used
+    """
+
+    def __init__(self, focus_loss, workers=None, problem=DEFAULT_PROBLEM, mp_context=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.problem = problem
+        self.focus_loss = SharedArray.from_array(focus_loss, dtype=float)
+        self.capacity = 0
+        self.rooms = self.skip = self.fitness = None
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context, initializer=_init_worker,
+                                            initargs=(self.focus_loss, problem))
+
+    def _reserve(self, pop_size):
+        """
+        Makes sure the shared buffers hold pop_size individuals, doubling them when they are too small
+        """
+        if pop_size <= self.capacity:
+            return
+        self._close_buffers()
+        self.capacity = max(pop_size, 2 * self.capacity)
+        shape = (self.capacity, self.problem.size)
+        self.rooms = SharedArray(shape, np.int64)
+        self.skip = SharedArray(shape, bool)
+        self.fitness = SharedArray((self.capacity,), float)
+
+    def __call__(self, population):
+        """
+        Returns the fitness of each individual, as a list
+        --------
+        Parameters:
+            population : list or tuple
+                    List of lists, or (rooms, skip) in the array representation
+        """
+        rooms, skip = population if isinstance(population, tuple) else encode_pop(population, self.problem)
+        pop_size = len(rooms)
+        self._reserve(pop_size)
+        self.rooms.array[:pop_size] = rooms
+        self.skip.array[:pop_size] = skip
+
+        # One range of individuals for each worker
+        bounds = np.linspace(0, pop_size, min(self.workers, pop_size) + 1).astype(int)
+        futures = [self.executor.submit(_score_range, self.rooms, self.skip, self.fitness, start, end)
+                   for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+        for future in futures:
+            future.result()
+        return self.fitness.array[:pop_size].tolist()
+
+    def _close_buffers(self):
+        for buffer in (self.rooms, self.skip, self.fitness):
+            if buffer is not None:
+                buffer.close()
+
+    def close(self):
+        self.executor.shutdown()
+        self._close_buffers()
+        self.focus_loss.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
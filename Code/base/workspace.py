@@ -0,0 +1,82 @@
+import numpy as np
+
+
+class Workspace:
+    """
+    Arrays reused by the batch operators from one call to the next. Each array is identified by a name, and is only
+    created again when it's asked for with a different shape or type, so once the first generation of array_GA is done
+    the operators write into the same memory at every generation, instead of creating new arrays.
+    The values left in an array by its previous use are kept, so each operator needs to write every value it reads.
+    Numpy functions are given arrays of the same shape (see columns, row_starts and by_row) instead of broadcasting a
+    column against a matrix, as a broadcast makes them allocate a buffer at every call
+    """
+
+    def __init__(self):
+        self._arrays = {}
+
+    def array(self, name, shape, dtype=np.int64):
+        """
+        Returns the array called name, with the given shape and type
+        """
+        array = self._arrays.get(name)
+        if array is None or array.shape != shape or array.dtype != dtype:
+            array = self._arrays[name] = np.empty(shape, dtype=dtype)
+        return array
+
+    def _constant(self, key, make):
+        """
+        Returns the array stored under key, created with make() the first time
+        """
+        array = self._arrays.get(key)
+        if array is None:
+            array = self._arrays[key] = make()
+        return array
+
+    def arange(self, n):
+        """
+        Returns the array 0, 1, ..., n - 1, created only once. It must not be changed
+        """
+        return self._constant(('arange', n), lambda: np.arange(n))
+
+    def columns(self, n, length):
+        """
+        Returns an (n, length) array where every row is 0, 1, ..., length - 1. It must not be changed
+        """
+        return self._constant(('columns', n, length), lambda: np.tile(np.arange(length), (n, 1)))
+
+    def rows(self, n, length):
+        """
+        Returns an (n, length) array where every value of row i is i. It must not be changed
+        """
+        return self._constant(('rows', n, length), lambda: np.repeat(np.arange(n), length).reshape(n, length))
+
+    def row_starts(self, n, width, length=None):
+        """
+        Returns the flat index of the first value of each row of an (n, width) array, to add to the columns to get the
+        indices to use with np.take and np.put. With length given, it's an (n, length) array with the index repeated
+        in each row, as numpy functions given a column to broadcast allocate buffers. It must not be changed
+        """
+        if length is None:
+            return self._constant(('row_starts', n, width), lambda: np.arange(0, n * width, width))
+        return self._constant(('row_starts', n, width, length),
+                              lambda: np.repeat(np.arange(0, n * width, width), length).reshape(n, length))
+
+    def by_row(self, name, values, length):
+        """
+        Returns the (n, length) array called name with values[i] in every position of row i (values needs to be
+        contiguous)
+        """
+        array = self.array(name, (len(values), length), values.dtype)
+        np.take(values, self.rows(len(values), length), out=array, mode='clip')
+        return array
+
+    def contiguous(self, name, array):
+        """
+        Returns array itself if its values are contiguous in memory (as np.take and np.put need them), or a copy of it
+        in the array called name
+        """
+        if array.flags.c_contiguous:
+            return array
+        copy = self.array(name, array.shape, array.dtype)
+        np.copyto(copy, array)
+        return copy
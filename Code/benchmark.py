@@ -0,0 +1,277 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from algorithm.algorithm import GA
+from base.data import random_focus_gen
+from base.individual import create_pop, calculate_pop_fit
+from base.problem import DEFAULT_PROBLEM, Problem
+from operators.crossovers import pmx_crossover, improved_cycle_crossover, ordered_crossover, fog_crossover, \
+    slide_crossover
+from operators.mutators import twors_mutation, reverse_sequence_mutation, inverted_exchange_mutation, \
+    partial_shuffle_mutation
+from operators.selectors import roulette_selection
+
+# Benchmarks of the operators and of full GA runs. Every benchmark sets its own seed, runs a few warm-up calls, and is
+# then timed several times. The results are compared with a baseline stored in a json file, and the script fails if any
+# benchmark got slower than the baseline by more than the threshold plus its noise.
+# A reference loop is timed together with the benchmarks, and each benchmark is compared as a ratio to it, so that a
+# machine that is busier (or slower) for the whole run does not look like a regression. The noise of a benchmark is how
+# far its first quartile is from its fastest measurement, and the highest noise of the baseline and the current run is
+# added to the threshold.
+# The baseline is not part of the repository, since the times depend on the machine: it's created by the first run (or
+# with --update), locally or in CI, before the changes to compare.
+#
+#   python benchmark.py                    compares with the baseline
+#   python benchmark.py --update           runs the benchmarks and stores them as the new baseline
+#   python benchmark.py --filter mutation  only runs the benchmarks with 'mutation' in their name
+#
+# The script exits with 1 when there are regressions, and with 2 when the baseline can't be used (stored by another
+# version of the script, or without any of the benchmarks that were run), which needs a new baseline made with --update
+
+BASELINE_PATH = os.path.join('log', 'benchmark_baseline.json')
+
+# Version of the results stored in the baseline, increased whenever they change meaning. Baselines without it were
+# stored before the ratios to the reference loop, and can't be compared
+BASELINE_FORMAT = 2
+
+CROSSOVERS = [pmx_crossover, improved_cycle_crossover, ordered_crossover, fog_crossover, slide_crossover]
+MUTATORS = [twors_mutation, reverse_sequence_mutation, inverted_exchange_mutation, partial_shuffle_mutation]
+
+# Problems used by the benchmarks: the one from the project and a bigger one with the same kind of rules
+PROBLEMS = {8: DEFAULT_PROBLEM, 30: Problem(30, precedence=[(0, 5)], optional={2: (5, 1)})}
+
+
+def time_per_call(function, number, repeat=5, warmup=3):
+    """
+    Returns the times of one call of function, in nanoseconds, in each of repeat measurements of number calls
+    --------
+    Parameters:
+        function : function
+                Function without parameters to time
+        number : integer
+                Number of calls in each measurement
+        repeat : integer, default 5
+                Number of measurements
+        warmup : integer, default 3
+                Number of calls before the measurements, that are not timed
+    Returns:
+        list
+    """
+    for _ in range(warmup):
+        function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter_ns() - start) / number)
+    return timings
+
+
+def reference():
+    """
+    Fixed amount of pure Python work, timed with the benchmarks so that they can be compared as ratios to it
+    """
+    total = 0
+    for i in range(2000):
+        total += i * i % 7
+    return total
+
+
+def _sample(size, n, seed):
+    random.seed(seed)
+    return create_pop(n, problem=PROBLEMS[size])
+
+
+def micro_benchmarks():
+    """
+    Returns the micro benchmarks, as a dictionary with a function without parameters for each name. The inputs are
+    created here, with fixed seeds, so only the operator is timed
+    """
+    benchmarks = {}
+    for size, problem in PROBLEMS.items():
+        parents = _sample(size, 64, seed=1)
+        pairs = list(zip(parents[::2], parents[1::2]))
+        focus_loss = random_focus_gen(seed=1, problem=problem)
+
+        # Each benchmark goes through its inputs in turn, with its own iterator
+        for crossover in CROSSOVERS:
+            def run(crossover=crossover, problem=problem, pairs=itertools.cycle(pairs)):
+                p1, p2 = next(pairs)
+                crossover(p1[:-1], p2[:-1], problem=problem)
+            benchmarks[f'{crossover.__name__}[n={size}]'] = run
+
+        for mutator in MUTATORS:
+            def run(mutator=mutator, problem=problem, parents=itertools.cycle(parents)):
+                mutator(next(parents)[:-1], 1.0, problem=problem)   # Always mutating
+            benchmarks[f'{mutator.__name__}[n={size}]'] = run
+
+        evaluate_population = calculate_pop_fit(focus_loss, problem=problem)
+        benchmarks[f'calculate_pop_fit[n={size},pop=64]'] = \
+            lambda evaluate_population=evaluate_population, parents=parents: evaluate_population(parents)
+        benchmarks[f'create_pop[n={size},pop=64]'] = lambda problem=problem: create_pop(64, problem=problem)
+
+    for pop_size in (50, 500):
+        population = _sample(8, pop_size, seed=2)
+        fits = calculate_pop_fit(random_focus_gen(seed=2))(population)
+        benchmarks[f'roulette_selection[pop={pop_size}]'] = lambda population=population, fits=fits: \
+            roulette_selection(population, fits)
+    return benchmarks
+
+
+def ga_benchmarks(gens=20):
+    """
+    Returns the end-to-end benchmarks: full GA runs for several population sizes and numbers of rooms
+    """
+    benchmarks = {}
+    for size, problem in PROBLEMS.items():
+        evaluate_population = calculate_pop_fit(random_focus_gen(seed=1, problem=problem), problem=problem)
+        for pop_size in (50, 200):
+            def run(problem=problem, pop_size=pop_size, evaluate_population=evaluate_population):
+                GA(create_population=create_pop,
+                   evaluate_population=evaluate_population,
+                   maximization=False,
+                   gens=gens,
+                   pop_size=pop_size,
+                   selector=roulette_selection,
+                   mutator=twors_mutation,
+                   crossover_operator=pmx_crossover,
+                   p_c=0.9,
+                   p_m=0.1,
+                   elitism=True,
+                   verbose=False,
+                   log=False,
+                   path=None,
+                   seed=1,
+                   problem=problem)
+            benchmarks[f'GA[n={size},pop={pop_size}]'] = run
+    return benchmarks
+
+
+def run_benchmarks(name_filter='', repeat=15, gens=20):
+    """
+    Runs every benchmark whose name contains name_filter, and the reference loop. The measurements are interleaved (one
+    of each benchmark, then the second one of each, ...), so that a moment when the machine is busy does not affect
+    every measurement of the same benchmark
+    --------
+    Returns:
+        dictionary
+            Dictionary with the name of each benchmark as key, and a dictionary as value with its unit ('ns_per_call' for
+            micro benchmarks and 'ms_per_generation' for GA runs), its fastest time ('min'), its median time, its ratio
+            to the reference loop ('relative') and its noise (how much slower the fastest quarter of the measurements
+            can be than the fastest one)
+    """
+    benchmarks = {name: (function, 'ns_per_call', 1) for name, function in micro_benchmarks().items()}
+    benchmarks.update({name: (function, 'ms_per_generation', gens * 1e6) for name, function in ga_benchmarks(gens).items()})
+    benchmarks = {name: benchmark for name, benchmark in benchmarks.items() if name_filter in name}
+    benchmarks['reference'] = (reference, 'ns_per_call', 1)
+
+    # Calibrating the number of calls so that each measurement takes around 20 ms
+    number = {}
+    for name, (function, _, _) in benchmarks.items():
+        random.seed(0)
+        number[name] = max(1, int(2e7 / max(min(time_per_call(function, 1, repeat=3, warmup=1)), 1)))
+
+    timings = {name: [] for name in benchmarks}
+    for _ in range(repeat):
+        for name, (function, _, _) in benchmarks.items():
+            random.seed(0)   # The random calls inside each benchmark are always the same, whatever runs before it
+            timings[name].extend(time_per_call(function, number[name], repeat=1, warmup=1))
+
+    reference_time = min(timings['reference'])
+    results = {}
+    for name, (_, unit, scale) in benchmarks.items():
+        fastest, median = min(timings[name]), statistics.median(timings[name])
+        lower_quartile = statistics.quantiles(timings[name], n=4)[0] if len(timings[name]) > 1 else fastest
+        results[name] = {'unit': unit, 'min': fastest / scale, 'median': median / scale,
+                         'relative': fastest / reference_time, 'noise': lower_quartile / fastest - 1}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares the results with the baseline, as ratios to the reference loop, returning the names of the benchmarks that
+    are slower than the baseline by more than threshold (0.2 means 20% slower) plus the noise of the benchmark and of
+    the reference loop (the highest of the two runs), and the number of benchmarks that were in the baseline
+    """
+    regressions = []
+    compared = 0
+    reference_noise = max(results['reference']['noise'],
+                          baseline.get('results', {}).get('reference', {}).get('noise', 0))
+    print(f'{"benchmark":45} {"baseline":>14} {"current":>14} {"change":>8} {"allowed":>8}')
+    for name, result in results.items():
+        if name == 'reference':
+            continue
+        unit = result['unit'][:2]
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            print(f'{name:45} {"-":>14} {result["min"]:>11.4g} {unit}      new')
+            continue
+        compared += 1
+        change = result['relative'] / previous['relative'] - 1
+        allowed = threshold + max(result['noise'], previous['noise']) + reference_noise
+        flag = '  <-- slower' if change > allowed else ''
+        print(f'{name:45} {previous["min"]:>11.4g} {unit} {result["min"]:>11.4g} {unit} {change:>+7.1%} '
+              f'{allowed:>+7.1%}{flag}')
+        if change > allowed:
+            regressions.append(name)
+    return regressions, compared
+
+
+def machine():
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'processor': platform.processor()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of the operators and of the GA')
+    parser.add_argument('--update', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='path of the json baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown that counts as a regression')
+    parser.add_argument('--filter', default='', help='only run the benchmarks with this text in their name')
+    parser.add_argument('--repeat', type=int, default=15, help='number of measurements of each benchmark')
+    args = parser.parse_args()
+
+    baseline = None
+    if not args.update and os.path.exists(args.baseline):   # Checked before running anything
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get('format') != BASELINE_FORMAT:
+            print(f'The baseline {args.baseline} has format {baseline.get("format", 1)}, and this version of the '
+                  f'benchmarks uses format {BASELINE_FORMAT}: re-run with --update to store a new baseline')
+            sys.exit(2)
+
+    results = run_benchmarks(args.filter, args.repeat)
+
+    if baseline is None:
+        baseline = {'format': BASELINE_FORMAT, 'machine': machine(), 'results': results}
+        if os.path.exists(args.baseline) and args.filter:   # Only replacing the benchmarks that were run
+            with open(args.baseline) as file:
+                previous = json.load(file)
+            if previous.get('format') == BASELINE_FORMAT:   # Results of another format are dropped, not mixed in
+                baseline['results'] = {**previous['results'], **results}
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=2)
+        for name, result in results.items():
+            print(f'{name:45} {result["min"]:>11.4g} {result["unit"][:2]} (noise {result["noise"]:.1%})')
+        print(f'Baseline stored in {args.baseline}')
+        sys.exit(0)
+
+    if baseline.get('machine') != machine():
+        print('Warning: the baseline was stored on a different machine, even the ratios to the reference loop may not be '
+              'comparable')
+
+    regressions, compared = compare(results, baseline, args.threshold)
+    if not compared:
+        print(f'None of the benchmarks that were run are in the baseline {args.baseline}: re-run with --update to store '
+              f'them')
+        sys.exit(2)
+    if regressions:
+        print(f'{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}')
+        sys.exit(1)
+    print('No regressions')
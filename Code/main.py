@@ -1,4 +1,5 @@
 from base.data import *
+from base.population import calculate_pop_fit_array
 from operators.selectors import *
 from operators.mutators import *
 from operators.crossovers import *
@@ -18,17 +19,17 @@ focus_loss = [[0, 10.2, 16, 4, 6, 12, 7.5, 9],
               [7.5, 3, 7, 5, 4, 8, 0, 10.1],
               [9, 11.5, 5, 2, 10, 8, 10.1, 0]]
 
-# The line where data can be inserted is line 13, on fit_foc_loss = calculate_pop_fit (data)
+# The line where data can be inserted is the one with fit_foc_loss = calculate_pop_fit_array (data)
 # The data used at the moment is random -> random_focus_gen()
 if __name__ == '__main__':
-    fit_foc_loss = calculate_pop_fit(random_focus_gen())
+    fit_foc_loss = calculate_pop_fit_array(random_focus_gen())   # Vectorized, same values as calculate_pop_fit
 
     GA(create_population=create_pop,
        evaluate_population=fit_foc_loss,
        maximization=False,
        gens=200,
        pop_size=50,
-       selector=roulette_selection,
+       selector=RouletteSelection(),   # Same choices as roulette_selection, prepared once per generation
        mutator=twors_mutation,
        crossover_operator=improved_cycle_crossover,
        p_c=0.9,
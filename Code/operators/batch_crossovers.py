@@ -0,0 +1,548 @@
+import numpy as np
+from base.problem import DEFAULT_PROBLEM
+from base.workspace import Workspace
+from operators.crossovers import pmx_crossover, improved_cycle_crossover, ordered_crossover, fog_crossover, \
+    slide_crossover
+
+# Batch versions of the crossovers in operators/crossovers.py. Instead of one pair of lists, they receive every pair of
+# parents of a generation at once, in the array representation of base/population.py: a tuple (rooms, skip) of
+# (n_pairs, n_rooms) arrays, without the final room (room H), exactly like the lists given to the crossovers. The cut
+# points are given for each pair, so that the same offspring as the list versions are obtained for the same points.
+# Every step writes into arrays of a Workspace (np.take and np.put with flat indices, and numpy functions with out), so
+# when array_GA gives them the same workspace and output arrays at every generation, they do not allocate memory
+
+
+def random_cut_points(n_pairs, length, rng, workspace=None):
+    """
+    Returns two different random cut points for each pair, in increasing order, like
+    sorted(random.sample(range(length), 2)) in pmx_crossover and ordered_crossover
+    --------
+    Parameters:
+        n_pairs : integer
+                Number of pairs of parents
+        length : integer
+                Length of the parents (without the final room)
+        rng : numpy Generator
+                Random number generator
+        workspace : Workspace, default None
+                Arrays to reuse. If None, new arrays are created
+    Returns:
+        cut_start, cut_end
+            Integer arrays of length n_pairs
+    """
+    workspace = workspace or Workspace()
+    draws = workspace.array('cut_draws', (2, n_pairs), float)
+    rng.random(out=draws)
+    draws[0] *= length
+    draws[1] *= length - 1
+    points = workspace.array('cut_points', (2, n_pairs))
+    np.copyto(points, draws, casting='unsafe')   # Truncating the positive draws, like floor
+    first, second = points
+
+    later = workspace.array('cut_later', (n_pairs,), bool)
+    np.greater_equal(second, first, out=later)
+    np.add(second, 1, out=second, where=later)   # Making sure the two points are different
+    cut_start, cut_end = workspace.array('cut_start', (n_pairs,)), workspace.array('cut_end', (n_pairs,))
+    np.minimum(first, second, out=cut_start)
+    np.maximum(first, second, out=cut_end)
+    return cut_start, cut_end
+
+
+def random_break_points(n_pairs, length, rng, workspace=None):
+    """
+    Returns a random break point for each pair, like random.randint(0, length - 1) in fog_crossover and slide_crossover
+    --------
+    Parameters:
+        n_pairs : integer
+                Number of pairs of parents
+        length : integer
+                Length of the parents (without the final room)
+        rng : numpy Generator
+                Random number generator
+        workspace : Workspace, default None
+                Arrays to reuse. If None, new arrays are created
+    Returns:
+        numpy array
+            Integer array of length n_pairs
+    """
+    workspace = workspace or Workspace()
+    draws = workspace.array('break_draws', (n_pairs,), float)
+    rng.random(out=draws)
+    draws *= length
+    break_index = workspace.array('break_index', (n_pairs,))
+    np.copyto(break_index, draws, casting='unsafe')
+    return break_index
+
+
+def _segment(cut_start, cut_end, n_pairs, length, workspace):
+    """
+    Returns an (n_pairs, length) boolean array, True for the positions from cut_start to cut_end (not included)
+    """
+    columns = workspace.columns(n_pairs, length)
+    segment = workspace.array('segment', (n_pairs, length), bool)
+    before_end = workspace.array('segment_before_end', (n_pairs, length), bool)
+    np.greater_equal(columns, workspace.by_row('segment_start', cut_start, length), out=segment)
+    np.less(columns, workspace.by_row('segment_end', cut_end, length), out=before_end)
+    np.logical_and(segment, before_end, out=segment)
+    return segment
+
+
+def _positions(rooms, size, workspace, name):
+    """
+    Returns an (n_pairs, size) array with the position of each room in each row (the inverse of each permutation)
+    """
+    n_pairs, length = rooms.shape
+    position = workspace.array(name, (n_pairs, size))
+    position.fill(0)
+    index = workspace.array(name + '_index', (n_pairs, length))
+    np.add(rooms, workspace.row_starts(n_pairs, size, length), out=index)
+    np.put(position, index, workspace.columns(n_pairs, length), mode='clip')
+    return position
+
+
+def _contains(rooms, mask, size, workspace, name):
+    """
+    Returns an (n_pairs, size + 1) boolean array, True for the rooms of each row that are in the positions marked by
+    mask. The rooms in the other positions are sent to the last column, so rows with repeated rooms are also handled.
+    The value of room r in row i is at the flat index i * (size + 1) + r
+    """
+    n_pairs = rooms.shape[0]
+    contained = workspace.array(name, (n_pairs, size + 1), bool)
+    contained.fill(False)
+    index = workspace.array(name + '_index', rooms.shape)
+    np.copyto(index, size)
+    np.copyto(index, rooms, where=mask)
+    np.add(index, workspace.row_starts(n_pairs, size + 1, rooms.shape[1]), out=index)
+    np.put(contained, index, True, mode='clip')
+    return contained
+
+
+def _look_up(contained, rooms, size, workspace, name):
+    """
+    Returns an array with the shape of rooms, True where the room of that row is True in contained (see _contains)
+    """
+    n_pairs = rooms.shape[0]
+    index = workspace.array(name + '_index', rooms.shape)
+    np.add(rooms, workspace.row_starts(n_pairs, size + 1, rooms.shape[1]), out=index)
+    found = workspace.array(name, rooms.shape, bool)
+    np.take(contained, index, out=found, mode='clip')
+    return found
+
+
+def _fill(offspring, fixed, donor, keep, workspace):
+    """
+    Fills the positions of offspring that are not fixed, in order, with the rooms of donor marked by keep, in order.
+    Each row needs to have as many free positions as kept rooms: the k-th kept room goes to the k-th free position,
+    found in a table with the free positions of each row by rank. The rooms that are not kept go to an extra column
+    """
+    n_pairs, length = offspring.shape
+    width = length + 1
+    starts = workspace.row_starts(n_pairs, width, length)
+
+    # Rank of each free position in its row, and the table with the position of each rank
+    rank = workspace.array('fill_rank', (n_pairs, length))
+    counted = workspace.array('fill_counted', (n_pairs, length))
+    np.logical_not(fixed, out=workspace.array('fill_free', (n_pairs, length), bool))
+    np.copyto(counted, workspace.array('fill_free', (n_pairs, length), bool))
+    np.cumsum(counted, axis=1, out=rank)
+    rank -= 1
+    np.copyto(rank, length, where=fixed)
+    rank += starts
+    free_position = workspace.array('fill_free_position', (n_pairs, width))
+    np.put(free_position, rank, workspace.columns(n_pairs, length), mode='clip')
+    free_position[:, length] = length
+
+    # Rank of each kept room of donor, and the position it goes to
+    unkept = workspace.array('fill_unkept', (n_pairs, length), bool)
+    np.copyto(counted, keep)
+    np.cumsum(counted, axis=1, out=rank)
+    rank -= 1
+    np.logical_not(keep, out=unkept)
+    np.copyto(rank, length, where=unkept)
+    rank += starts
+    target = workspace.array('fill_target', (n_pairs, length))
+    np.take(free_position, rank, out=target, mode='clip')
+    target += starts
+
+    extended = workspace.array('fill_extended', (n_pairs, width))
+    np.copyto(extended[:, :length], offspring)
+    np.put(extended, target, donor, mode='clip')
+    np.copyto(offspring, extended[:, :length])
+    return offspring
+
+
+def absent_rooms_from(offspring, other_parent, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+    """
+    Batch version of absent_room_case. In the list crossovers, parent1 is changed to have the same optional rooms as
+    parent2 (2 or 99), so an optional room is skipped in the offspring exactly when it's skipped in parent2
+    --------
+    Parameters:
+        offspring : numpy array
+                (n_pairs, length) rooms of the offspring
+        other_parent : tuple
+                (rooms, skip) of the parents given as parent2
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms, with the optional rooms
+        out : numpy array, default None
+                Boolean array where the skip mask is written. If None, a new array is created
+        workspace : Workspace, default None
+                Arrays to reuse. If None, new arrays are created
+    Returns:
+        numpy array
+            Skip mask of the offspring
+    """
+    workspace = workspace or Workspace()
+    # Numpy functions given views with gaps between the rows (every other row of the population) allocate buffers
+    rooms = workspace.contiguous('absent_rooms', other_parent[0])
+    skip = workspace.contiguous('absent_skip', other_parent[1])
+    offspring_skip = np.empty(offspring.shape, dtype=bool) if out is None else out
+    offspring_skip.fill(False)
+    is_room = workspace.array('absent_is_room', rooms.shape, bool)
+    skipped = workspace.array('absent_skipped', (rooms.shape[0],), bool)
+    at_room = workspace.array('absent_at_room', offspring.shape, bool)
+    for room in problem.optional:
+        np.equal(rooms, room, out=is_room)
+        np.logical_and(is_room, skip, out=is_room)
+        np.any(is_room, axis=1, out=skipped)   # Parents where the room is replaced by its marker
+        np.equal(offspring, room, out=at_room)
+        np.logical_and(at_room, workspace.by_row('absent_skipped_rows', skipped, offspring.shape[1]), out=at_room)
+        np.logical_or(offspring_skip, at_room, out=offspring_skip)
+    return offspring_skip
+
+
+def _crossover(kernel, parents1, parents2, points, problem, out, workspace):
+    """
+    Applies a kernel to every pair, and to every pair with the parents switched, giving the two offspring of each pair
+    with the optional rooms of the other parent. The parents are copied into the workspace if they are views that
+    np.take and np.put cannot use directly (such as every other row of the population)
+    """
+    workspace = workspace or Workspace()
+    rooms1 = workspace.contiguous('parents1', parents1[0])
+    rooms2 = workspace.contiguous('parents2', parents2[0])
+    if out is None:
+        out = tuple((np.empty(rooms1.shape, dtype=np.int64), np.empty(rooms1.shape, dtype=bool)) for _ in range(2))
+    (offspring1, skip1), (offspring2, skip2) = out
+    kernel(rooms1, rooms2, *points, problem.size, offspring1, workspace)
+    kernel(rooms2, rooms1, *points, problem.size, offspring2, workspace)
+    absent_rooms_from(offspring1, parents2, problem, skip1, workspace)
+    absent_rooms_from(offspring2, parents1, problem, skip2, workspace)
+    return out
+
+
+def _pmx(parent1, parent2, cut_start, cut_end, size, offspring, workspace):
+    n_pairs, length = parent1.shape
+    rows_length = workspace.row_starts(n_pairs, length)
+    rows_contained = workspace.row_starts(n_pairs, size + 1)
+
+    segment = _segment(cut_start, cut_end, n_pairs, length, workspace)
+    np.copyto(offspring, parent1)   # Only the segment is kept, every other position is written below
+    filled = workspace.array('pmx_filled', (n_pairs, length), bool)
+    np.copyto(filled, segment)
+    in_segment = _contains(parent1, segment, size, workspace, 'pmx_in_segment')
+
+    # Mapping used by pmx: from a position i, the next position is the one of parent1[i] in parent2
+    position2 = _positions(parent2, size, workspace, 'pmx_position2')
+    index = workspace.array('pmx_index', (n_pairs, length))
+    np.add(parent1, workspace.row_starts(n_pairs, size, length), out=index)
+    mapping = workspace.array('pmx_mapping', (n_pairs, length))
+    np.take(position2, index, out=mapping, mode='clip')
+
+    room, position, following, current = (workspace.array(name, (n_pairs,))
+                                          for name in ('pmx_room', 'pmx_position', 'pmx_following', 'pmx_current'))
+    flat = workspace.array('pmx_flat', (n_pairs,))
+    active, blocked = workspace.array('pmx_active', (n_pairs,), bool), workspace.array('pmx_blocked', (n_pairs,), bool)
+
+    # The rooms of parent2 that are not in the segment are placed in the order of parent2. Each one is placed by
+    # following the mapping (at least once) until an empty position is found, as in the list version
+    for j in range(length):
+        np.copyto(room, parent2[:, j])
+        np.add(room, rows_contained, out=flat)
+        np.take(in_segment, flat, out=active, mode='clip')
+        np.logical_not(active, out=active)
+        np.copyto(position, mapping[:, j])
+        for _ in range(length):
+            np.add(position, rows_length, out=flat)
+            np.take(filled, flat, out=blocked, mode='clip')
+            np.logical_and(blocked, active, out=blocked)
+            if not blocked.any():
+                break
+            np.take(mapping, flat, out=following, mode='clip')
+            np.copyto(position, following, where=blocked)
+
+        # The rows where the room is not placed write back the values they already have
+        np.add(position, rows_length, out=flat)
+        np.take(offspring, flat, out=current, mode='clip')
+        np.copyto(current, room, where=active)
+        np.put(offspring, flat, current, mode='clip')
+        np.take(filled, flat, out=blocked, mode='clip')
+        np.logical_or(blocked, active, out=blocked)
+        np.put(filled, flat, blocked, mode='clip')
+
+    return offspring
+
+
+def batch_pmx_crossover(parents1, parents2, cut_start, cut_end, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+    """
+    Batch version of pmx_crossover. The loop goes over the positions of the parents, each step working on every pair
+
+    Parameters:
+    --------
+        parents1 : tuple
+                (rooms, skip) arrays of the first parents, without the final room.
+        parents2 : tuple
+                (rooms, skip) arrays of the second parents, without the final room.
+        cut_start, cut_end : numpy array
+                Crossover points of each pair, as given by random_cut_points
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms, with the optional rooms
+        out : tuple, default None
+                ((rooms, skip), (rooms, skip)) contiguous arrays where the offspring are written. If None, new arrays
+                are created
+        workspace : Workspace, default None
+                Arrays to reuse for the intermediate steps. If None, new arrays are created
+    Returns:
+    --------
+        offspring1, offspring2
+            (rooms, skip) arrays of the offspring obtained using partially mapped crossover.
+    """
+    return _crossover(_pmx, parents1, parents2, (cut_start, cut_end), problem, out, workspace)
+
+
+def _imx(parent1, parent2, size, offspring, workspace):
+    n_pairs, length = parent1.shape
+    rows_size = workspace.row_starts(n_pairs, size)
+
+    # Next room of the cycle for each room: the room of parent2 in the position where the room is in parent1
+    index = workspace.array('imx_index', (n_pairs, length))
+    np.add(parent1, workspace.row_starts(n_pairs, size, length), out=index)
+    next_room = workspace.array('imx_next_room', (n_pairs, size))
+    np.put(next_room, index, parent2, mode='clip')
+
+    # Following the cycle that starts in the first room of parent2. The cycle is stored by columns, so that each step
+    # writes a contiguous row
+    cycle = workspace.array('imx_cycle', (length, n_pairs))
+    flat = workspace.array('imx_flat', (n_pairs,))
+    np.copyto(cycle[0], parent2[:, 0])
+    for k in range(1, length):
+        np.add(cycle[k - 1], rows_size, out=flat)
+        np.take(next_room, flat, out=cycle[k], mode='clip')
+
+    # The cycle ends when it gets back to the first room (going backwards, the first time is the last one written),
+    # the rest of the offspring comes from parent2, in order
+    closed = workspace.array('imx_closed', (n_pairs,), bool)
+    cycle_length = workspace.array('imx_cycle_length', (n_pairs,))
+    cycle_length.fill(length)
+    for k in range(length - 1, 0, -1):
+        np.equal(cycle[k], cycle[0], out=closed)
+        np.copyto(cycle_length, k, where=closed)
+    fixed = workspace.array('imx_fixed', (n_pairs, length), bool)
+    np.less(workspace.columns(n_pairs, length), workspace.by_row('imx_cycle_rows', cycle_length, length), out=fixed)
+
+    for k in range(length):
+        np.copyto(offspring[:, k], cycle[k])
+    in_cycle = _contains(offspring, fixed, size, workspace, 'imx_in_cycle')
+    keep = _look_up(in_cycle, parent2, size, workspace, 'imx_keep')
+    np.logical_not(keep, out=keep)
+    return _fill(offspring, fixed, parent2, keep, workspace)
+
+
+def batch_improved_cycle_crossover(parents1, parents2, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+    """
+    Batch version of improved_cycle_crossover
+
+    Parameters:
+    --------
+        parents1 : tuple
+                (rooms, skip) arrays of the first parents, without the final room.
+        parents2 : tuple
+                (rooms, skip) arrays of the second parents, without the final room.
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms, with the optional rooms
+        out, workspace
+                Arrays where the offspring are written, and arrays to reuse, as in batch_pmx_crossover
+    Returns:
+    --------
+        offspring1, offspring2
+            (rooms, skip) arrays of the offspring generated using improved cycle crossover
+    """
+    return _crossover(_imx, parents1, parents2, (), problem, out, workspace)
+
+
+def _ox(parent1, parent2, cut_start, cut_end, size, offspring, workspace):
+    n_pairs, length = parent1.shape
+
+    segment = _segment(cut_start, cut_end, n_pairs, length, workspace)
+    in_segment = _contains(parent1, segment, size, workspace, 'ox_in_segment')
+
+    # Working with everything rotated to start at the crossover end, where ordered crossover starts filling
+    rotation = workspace.array('ox_rotation', (n_pairs, length))
+    np.add(workspace.columns(n_pairs, length), workspace.by_row('ox_end', cut_end, length), out=rotation)
+    np.remainder(rotation, length, out=rotation)
+    rotation += workspace.row_starts(n_pairs, length, length)
+    rotated2 = workspace.array('ox_rotated2', (n_pairs, length))
+    np.take(parent2, rotation, out=rotated2, mode='clip')
+    rotated_fixed = workspace.array('ox_rotated_fixed', (n_pairs, length), bool)
+    np.take(segment, rotation, out=rotated_fixed, mode='clip')
+    rotated = workspace.array('ox_rotated', (n_pairs, length))
+    np.take(parent1, rotation, out=rotated, mode='clip')
+
+    keep = _look_up(in_segment, rotated2, size, workspace, 'ox_keep')
+    np.logical_not(keep, out=keep)
+    _fill(rotated, rotated_fixed, rotated2, keep, workspace)
+
+    np.put(offspring, rotation, rotated, mode='clip')
+    return offspring
+
+
+def batch_ordered_crossover(parents1, parents2, cut_start, cut_end, problem=DEFAULT_PROBLEM, out=None,
+                            workspace=None):
+    """
+    Batch version of ordered_crossover
+
+    Parameters:
+    --------
+        parents1 : tuple
+                (rooms, skip) arrays of the first parents, without the final room.
+        parents2 : tuple
+                (rooms, skip) arrays of the second parents, without the final room.
+        cut_start, cut_end : numpy array
+                Crossover points of each pair, as given by random_cut_points
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms, with the optional rooms
+        out, workspace
+                Arrays where the offspring are written, and arrays to reuse, as in batch_pmx_crossover
+    Returns:
+    --------
+        offspring1, offspring2
+            (rooms, skip) arrays of the offspring generated using ordered crossover.
+    """
+    return _crossover(_ox, parents1, parents2, (cut_start, cut_end), problem, out, workspace)
+
+
+def _shifted(parent1, parent2, fixed, source, size, offspring, workspace):
+    """
+    Offspring with parent1[source] in the fixed positions and the remaining rooms of parent2, in order, in the others
+    """
+    n_pairs, length = parent1.shape
+    np.clip(source, 0, length - 1, out=source)
+    source += workspace.row_starts(n_pairs, length, length)
+    np.take(parent1, source, out=offspring, mode='clip')
+    kept = _contains(offspring, fixed, size, workspace, 'shifted_kept')
+    keep = _look_up(kept, parent2, size, workspace, 'shifted_keep')
+    np.logical_not(keep, out=keep)
+    return _fill(offspring, fixed, parent2, keep, workspace)
+
+
+def _fx(parent1, parent2, break_index, size, offspring, workspace):
+    n_pairs, length = parent1.shape
+    columns = workspace.columns(n_pairs, length)
+    # The rooms of parent1 from the break point are moved one position to the right
+    fixed = workspace.array('shifted_fixed', (n_pairs, length), bool)
+    np.greater(columns, workspace.by_row('fog_break', break_index, length), out=fixed)
+    source = workspace.array('shifted_source', (n_pairs, length))
+    np.subtract(columns, 1, out=source)
+    return _shifted(parent1, parent2, fixed, source, size, offspring, workspace)
+
+
+def _slide(parent1, parent2, break_index, size, offspring, workspace):
+    n_pairs, length = parent1.shape
+    columns = workspace.columns(n_pairs, length)
+    # The rooms of parent1 up to the break point are moved to the end
+    start = workspace.array('slide_start', (n_pairs,))
+    np.subtract(length, break_index, out=start)
+    start = workspace.by_row('slide_start_rows', start, length)
+    fixed = workspace.array('shifted_fixed', (n_pairs, length), bool)
+    np.greater_equal(columns, start, out=fixed)
+    source = workspace.array('shifted_source', (n_pairs, length))
+    np.subtract(columns, start, out=source)
+    return _shifted(parent1, parent2, fixed, source, size, offspring, workspace)
+
+
+def batch_fog_crossover(parents1, parents2, break_index, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+    """
+    Batch version of fog_crossover
+
+    Parameters:
+    --------
+        parents1 : tuple
+                (rooms, skip) arrays of the first parents, without the final room.
+        parents2 : tuple
+                (rooms, skip) arrays of the second parents, without the final room.
+        break_index : numpy array
+                Break point of each pair, as given by random_break_points
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms, with the optional rooms
+        out, workspace
+                Arrays where the offspring are written, and arrays to reuse, as in batch_pmx_crossover
+    Returns:
+    --------
+        offspring1, offspring2
+            (rooms, skip) arrays of the offspring obtained using fog crossover.
+    """
+    return _crossover(_fx, parents1, parents2, (break_index,), problem, out, workspace)
+
+
+def batch_slide_crossover(parents1, parents2, break_index, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+    """
+    Batch version of slide_crossover
+
+    Parameters:
+    --------
+        parents1 : tuple
+                (rooms, skip) arrays of the first parents, without the final room.
+        parents2 : tuple
+                (rooms, skip) arrays of the second parents, without the final room.
+        break_index : numpy array
+                Break point of each pair, as given by random_break_points
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms, with the optional rooms
+        out, workspace
+                Arrays where the offspring are written, and arrays to reuse, as in batch_pmx_crossover
+    Returns:
+    --------
+        offspring1, offspring2
+            (rooms, skip) arrays of the offspring obtained using slide crossover.
+    """
+    return _crossover(_slide, parents1, parents2, (break_index,), problem, out, workspace)
+
+
+def _with_cut_points(kernel):
+    """
+    Returns a crossover(parents1, parents2, rng, problem, out, workspace) that draws the cut points of each pair and
+    applies kernel
+    """
+    def crossover(parents1, parents2, rng, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+        workspace = workspace or Workspace()
+        cut_start, cut_end = random_cut_points(*parents1[0].shape, rng, workspace)
+        return kernel(parents1, parents2, cut_start, cut_end, problem, out, workspace)
+    return crossover
+
+
+def _with_break_points(kernel):
+    """
+    Returns a crossover(parents1, parents2, rng, problem, out, workspace) that draws the break point of each pair and
+    applies kernel
+    """
+    def crossover(parents1, parents2, rng, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+        workspace = workspace or Workspace()
+        break_index = random_break_points(*parents1[0].shape, rng, workspace)
+        return kernel(parents1, parents2, break_index, problem, out, workspace)
+    return crossover
+
+
+def _without_points(kernel):
+    """
+    Returns a crossover(parents1, parents2, rng, problem, out, workspace) for a kernel that does not use random points
+    """
+    def crossover(parents1, parents2, rng, problem=DEFAULT_PROBLEM, out=None, workspace=None):
+        return kernel(parents1, parents2, problem, out, workspace)
+    return crossover
+
+
+# Batch version of each crossover, with the random points drawn for every pair, so that the array GA can be given the
+# same operators as GA
+BATCH_CROSSOVERS = {pmx_crossover: _with_cut_points(batch_pmx_crossover),
+                    improved_cycle_crossover: _without_points(batch_improved_cycle_crossover),
+                    ordered_crossover: _with_cut_points(batch_ordered_crossover),
+                    fog_crossover: _with_break_points(batch_fog_crossover),
+                    slide_crossover: _with_break_points(batch_slide_crossover)}
@@ -0,0 +1,243 @@
+import numpy as np
+from base.workspace import Workspace
+from operators.mutators import twors_mutation, reverse_sequence_mutation, inverted_exchange_mutation, \
+    partial_shuffle_mutation
+
+# Batch versions of the mutators in operators/mutators.py. They change, in place, the rows of a population in the array
+# representation of base/population.py that are marked in mutate. rooms and skip are (n, length) arrays (or views) without
+# the final room. Each mutation is described by the new order of the positions of each row, which is applied to both
+# arrays, so that the skipped rooms move with their room. The new order is found for every row (and only applied to the
+# rows in mutate), so that every step writes into the same arrays of a Workspace, like the batch crossovers
+
+
+def _apply_order(rooms, skip, mutate, order, workspace):
+    """
+    Rearranges the rows of rooms and skip marked in mutate following order (one row of positions for each row)
+    """
+    n, length = rooms.shape
+    order += workspace.row_starts(n, length, length)
+    mutated = workspace.by_row('mutated', mutate, length)
+    for name, values in (('rooms', rooms), ('skip', skip)):
+        source = workspace.array('order_' + name, values.shape, values.dtype)
+        np.copyto(source, values)
+        result = workspace.array('ordered_' + name, values.shape, values.dtype)
+        np.take(source, order, out=result, mode='clip')
+        np.copyto(values, result, where=mutated)
+
+
+def _two_positions(n, length, rng, workspace):
+    """
+    Two different random positions for each row, in increasing order, like sorted(random.sample(range(length), 2))
+    """
+    draws = workspace.array('mutation_draws', (2, n), float)
+    rng.random(out=draws)
+    draws[0] *= length
+    draws[1] *= length - 1
+    positions = workspace.array('mutation_positions', (2, n))
+    np.copyto(positions, draws, casting='unsafe')   # Truncating the positive draws, like floor
+    first, second = positions
+
+    later = workspace.array('mutation_later', (n,), bool)
+    np.greater_equal(second, first, out=later)
+    np.add(second, 1, out=second, where=later)
+    start, end = workspace.array('mutation_start', (n,)), workspace.array('mutation_end', (n,))
+    np.minimum(first, second, out=start)
+    np.maximum(first, second, out=end)
+    return start, end
+
+
+def _inside(start, end, length, workspace):
+    """
+    (n, length) boolean array, True for the positions between start and end (both included)
+    """
+    n = len(start)
+    columns = workspace.columns(n, length)
+    inside = workspace.array('mutation_inside', (n, length), bool)
+    before_end = workspace.array('mutation_before_end', (n, length), bool)
+    np.greater_equal(columns, workspace.by_row('mutation_start_rows', start, length), out=inside)
+    np.less_equal(columns, workspace.by_row('mutation_end_rows', end, length), out=before_end)
+    np.logical_and(inside, before_end, out=inside)
+    return inside
+
+
+def _reversed_order(start, end, length, workspace):
+    """
+    Order of the positions after reversing the rooms between start and end (both included)
+    """
+    n = len(start)
+    columns = workspace.columns(n, length)
+    outside = _inside(start, end, length, workspace)
+    np.logical_not(outside, out=outside)
+    total = workspace.array('mutation_total', (n,))
+    np.add(start, end, out=total)
+    order = workspace.array('mutation_order', (n, length))
+    np.subtract(workspace.by_row('mutation_total_rows', total, length), columns, out=order)
+    np.copyto(order, columns, where=outside)
+    return order
+
+
+def batch_twors_mutation(rooms, skip, mutate, rng, workspace=None):
+    """
+    Batch version of twors_mutation: the rooms in two random positions of each mutated row are switched
+    --------
+    Parameters:
+        rooms : numpy array
+                (n, length) rooms of the population, without the final room
+        skip : numpy array
+                Skip mask with the same shape as rooms
+        mutate : numpy array
+                Boolean array, True for the rows to mutate
+        rng : numpy Generator
+                Random number generator
+        workspace : Workspace, default None
+                Arrays to reuse. If None, new arrays are created
+    """
+    if not mutate.any():
+        return
+    workspace = workspace or Workspace()
+    n, length = rooms.shape
+    pos1, pos2 = _two_positions(n, length, rng, workspace)
+
+    order = workspace.array('mutation_order', (n, length))
+    np.copyto(order, workspace.columns(n, length))
+    flat = workspace.array('mutation_flat', (n,))
+    np.add(pos1, workspace.row_starts(n, length), out=flat)
+    np.put(order, flat, pos2, mode='clip')
+    np.add(pos2, workspace.row_starts(n, length), out=flat)
+    np.put(order, flat, pos1, mode='clip')
+    _apply_order(rooms, skip, mutate, order, workspace)
+
+
+def batch_reverse_sequence_mutation(rooms, skip, mutate, rng, workspace=None):
+    """
+    Batch version of reverse_sequence_mutation: the rooms between two random positions of each mutated row are reversed
+    --------
+    Parameters:
+        rooms : numpy array
+                (n, length) rooms of the population, without the final room
+        skip : numpy array
+                Skip mask with the same shape as rooms
+        mutate : numpy array
+                Boolean array, True for the rows to mutate
+        rng : numpy Generator
+                Random number generator
+        workspace : Workspace, default None
+                Arrays to reuse. If None, new arrays are created
+    """
+    if not mutate.any():
+        return
+    workspace = workspace or Workspace()
+    n, length = rooms.shape
+    start, end = _two_positions(n, length, rng, workspace)
+    _apply_order(rooms, skip, mutate, _reversed_order(start, end, length, workspace), workspace)
+
+
+def batch_inverted_exchange_mutation(rooms, skip, mutate, rng, workspace=None):
+    """
+    Batch version of inverted_exchange_mutation: the rooms between two random positions are reversed, and then a random
+    room from inside that sequence is switched with a random room from outside of it
+    --------
+    Parameters:
+        rooms : numpy array
+                (n, length) rooms of the population, without the final room
+        skip : numpy array
+                Skip mask with the same shape as rooms
+        mutate : numpy array
+                Boolean array, True for the rows to mutate
+        rng : numpy Generator
+                Random number generator
+        workspace : Workspace, default None
+                Arrays to reuse. If None, new arrays are created
+    """
+    if not mutate.any():
+        return
+    workspace = workspace or Workspace()
+    n, length = rooms.shape
+    start, end = _two_positions(n, length, rng, workspace)
+    order = _reversed_order(start, end, length, workspace)
+
+    # Position inside the reversed sequence and position outside of it. The rows with no rooms outside switch the room
+    # inside with itself
+    counts = workspace.array('exchange_counts', (2, n))
+    inside_count, outside_count = counts
+    np.subtract(end, start, out=inside_count)
+    inside_count += 1
+    np.subtract(length, inside_count, out=outside_count)
+    scale = workspace.array('exchange_scale', (2, n), float)
+    np.copyto(scale, counts)
+    np.maximum(scale[1], 1, out=scale[1])
+    draws = workspace.array('exchange_draws', (2, n), float)
+    rng.random(out=draws)
+    draws *= scale
+    positions = workspace.array('exchange_positions', (2, n))
+    np.copyto(positions, draws, casting='unsafe')
+    inside, outside = positions
+    inside += start
+
+    after = workspace.array('exchange_after', (n,), bool)
+    np.greater_equal(outside, start, out=after)
+    np.add(outside, inside_count, out=outside, where=after)
+    np.equal(outside_count, 0, out=after)
+    np.copyto(outside, inside, where=after)
+
+    rows = workspace.row_starts(n, length)
+    inside += rows
+    outside += rows
+    values = workspace.array('exchange_values', (2, n))
+    np.take(order, positions, out=values, mode='clip')
+    np.put(order, inside, values[1], mode='clip')
+    np.put(order, outside, values[0], mode='clip')
+    _apply_order(rooms, skip, mutate, order, workspace)
+
+
+def batch_partial_shuffle_mutation(rooms, skip, mutate, rng, workspace=None):
+    """
+    Batch version of partial_shuffle_mutation: the rooms between two random positions of each mutated row are shuffled
+    --------
+    Parameters:
+        rooms : numpy array
+                (n, length) rooms of the population, without the final room
+        skip : numpy array
+                Skip mask with the same shape as rooms
+        mutate : numpy array
+                Boolean array, True for the rows to mutate
+        rng : numpy Generator
+                Random number generator
+        workspace : Workspace, default None
+                Arrays to reuse. If None, new arrays are created
+    """
+    if not mutate.any():
+        return
+    workspace = workspace or Workspace()
+    n, length = rooms.shape
+    start, end = _two_positions(n, length, rng, workspace)
+    columns = workspace.columns(n, length)
+
+    # Sorting keys: positions outside keep their own index, positions inside get random keys between start and end,
+    # so sorting them shuffles the sequence and leaves everything else in place
+    bounds = workspace.array('shuffle_bounds', (2, n), float)
+    np.copyto(bounds[0], start)
+    np.copyto(bounds[1], end)
+    bounds[1] -= bounds[0]
+    random_keys = workspace.array('shuffle_random_keys', (n, length), float)
+    rng.random(out=random_keys)
+    random_keys *= workspace.by_row('shuffle_span', bounds[1], length)
+    random_keys += workspace.by_row('shuffle_start', bounds[0], length)
+
+    # Each key is sorted together with its position (as the imaginary part), which breaks ties like a stable argsort
+    # and gives the order without the arrays argsort creates
+    keys = workspace.array('shuffle_keys', (n, length), complex)
+    np.copyto(keys.real, columns)
+    np.copyto(keys.real, random_keys, where=_inside(start, end, length, workspace))
+    np.copyto(keys.imag, columns)
+    keys.sort(axis=1)
+    order = workspace.array('mutation_order', (n, length))
+    np.copyto(order, keys.imag, casting='unsafe')
+    _apply_order(rooms, skip, mutate, order, workspace)
+
+
+# Batch version of each mutator, so that the array GA can be given the same operators as GA
+BATCH_MUTATORS = {twors_mutation: batch_twors_mutation,
+                  reverse_sequence_mutation: batch_reverse_sequence_mutation,
+                  inverted_exchange_mutation: batch_inverted_exchange_mutation,
+                  partial_shuffle_mutation: batch_partial_shuffle_mutation}
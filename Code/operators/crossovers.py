@@ -2,7 +2,7 @@ from base.individual import *
 import random
 
 
-def absent_room_case(p1):
+def absent_room_case(p1, problem=DEFAULT_PROBLEM, rooms=None):
     """
     Returns the a parent, in the case where one parent has room C and the other does not have room C inside, after
     altering the value to correspond to the second parent. So, if p1 has a 2, it's changed to a 99 and vice-versa.
@@ -12,20 +12,56 @@ def absent_room_case(p1):
     --------
         p1 : list
                   List representing the first parent.
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, with the optional rooms and the values that replace them
+        rooms : list, default None
+                  Optional rooms to change. If None, every optional room is changed
     Returns:
     --------
         list
             Parent after making sure that it has the same rooms as the other parent
     """
-    for room in range(len(p1)):
-        if p1[room] == 2:           # Case when p1 has room C but p2 does not
-            p1[p1.index(2)] = 99
-        elif p1[room] == 99:        # Case when p2 does not have room C but p2 does
-            p1[p1.index(99)] = 2
+    toggle = {}   # Value that each room or marker is changed to
+    for room in (problem.markers if rooms is None else rooms):
+        toggle[room] = problem.markers[room]      # Case when p1 has room C but p2 does not
+        toggle[problem.markers[room]] = room      # Case when p1 does not have room C but p2 does
+
+    for index in range(len(p1)):
+        if p1[index] in toggle:
+            p1[index] = toggle[p1[index]]
     return p1
 
 
-def pmx_crossover(p1, p2):
+def match_absent_rooms(parent1, parent2, problem=DEFAULT_PROBLEM):
+    """
+    Returns parent1 after changing the optional rooms that are visited in one parent and skipped in the other, so that
+    both parents have the same values (needed for the mapping in the crossovers)
+
+    Parameters:
+    --------
+        parent1 : list
+                  List representing the first parent.
+        parent2 : list
+                  List representing the second parent.
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, with the optional rooms and the values that replace them
+    Returns:
+    --------
+        list
+            Parent1 with the same rooms as parent2
+    """
+    rooms1, rooms2 = set(parent1), set(parent2)
+
+    # Handle the case where one parent has a value of 2 and the other 99, since the values need to match
+    mismatched = [room for room, marker in problem.markers.items()
+                  if (room in rooms1 and marker in rooms2) or (marker in rooms1 and room in rooms2)]
+
+    if mismatched:
+        parent1 = absent_room_case(parent1, problem, mismatched)
+    return parent1
+
+
+def pmx_crossover(p1, p2, problem=DEFAULT_PROBLEM):
     """
     Returns the offspring after applying a partially mapped crossover (in the nested function).
 
@@ -35,6 +71,8 @@ def pmx_crossover(p1, p2):
                 List representing the first parent.
         parent2 : list
                   List representing the second parent.
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, used to get the final room (room H) and the optional rooms
     Returns:
     --------
         list
@@ -49,23 +87,25 @@ def pmx_crossover(p1, p2):
         offspring = [None] * len(parent1)   # Initializing the offspring
 
         # Handle the case where one parent has a value of 2 and the other 99, since the values need to match, for the mapping part
-        if (2 in parent1 and 99 in parent2) or (99 in parent1 and 2 in parent2):
-            parent1 = absent_room_case(parent1)
+        parent1 = match_absent_rooms(parent1, parent2, problem)
 
         # Assigning values from x between the crossover points to offspring
         offspring[crossover_start:crossover_end] = parent1[crossover_start:crossover_end]
 
         # Getting values not present in offspring after copying right values from parent1
         #remaining_bits = set(parent2[crossover_start:crossover_end]) - set(parent1[crossover_start:crossover_end])
-        remaining_bits = [x for x in parent2 if x not in offspring]
+        placed = set(offspring)   # Set of the rooms already in the offspring, so that each check takes constant time
+        remaining_bits = [x for x in parent2 if x not in placed]
+
+        position2 = {room: i for i, room in enumerate(parent2)}   # Position of each room in parent2, instead of .index
 
         # Mapping process:
         for elem in remaining_bits:
             temp = elem
-            index = parent2.index(parent1[parent2.index(temp)])  # Getting the correct value of p2
+            index = position2[parent1[position2[temp]]]  # Getting the correct value of p2
             while offspring[index] is not None:  # Finding an empty position in offspring
                 temp = index  # Getting the index element to be mapped
-                index = parent2.index(parent1[temp])  # Finding the next corresponding element of parent1 in parent2
+                index = position2[parent1[temp]]  # Finding the next corresponding element of parent1 in parent2
             offspring[index] = elem  # Assigning said empty position the value
 
         for i in range(len(offspring)):
@@ -82,13 +122,13 @@ def pmx_crossover(p1, p2):
     off2 = pmx(p2, p1, cross_start, cross_end)
 
     # Getting the correct format of the offspring, with 7 (room H) at the end
-    off1.append(7)
-    off2.append(7)
+    off1.append(problem.final_room)
+    off2.append(problem.final_room)
 
     return off1, off2
 
 
-def improved_cycle_crossover(p1, p2):
+def improved_cycle_crossover(p1, p2, problem=DEFAULT_PROBLEM):
     """
     Returns the offspring after applying an improved cycle crossover
 
@@ -98,6 +138,8 @@ def improved_cycle_crossover(p1, p2):
                   List representing the first parent.
         p2 : list
                   List representing the second parent.
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, used to get the final room (room H) and the optional rooms
     Returns:
     --------
         list
@@ -112,34 +154,37 @@ def improved_cycle_crossover(p1, p2):
         offspring = [None] * len(parent1)  # Initializing an offspring with the correct length
 
         # Making sure that the values match for the cases where we have 99 in one parent and 2 in the other
-        if (2 in parent1 and 99 in parent2) or (99 in parent1 and 2 in parent2):
-            parent1 = absent_room_case(parent1)      # Temporarily altering the value 2 or 99 in parent1
+        parent1 = match_absent_rooms(parent1, parent2, problem)      # Temporarily altering the value 2 or 99 in parent1
+
+        position1 = {room: i for i, room in enumerate(parent1)}   # Position of each room in parent1, instead of .index
 
         # Set the first number of the offspring to be the 1st of parent2
         offspring[0] = parent2[0]
+        placed = {parent2[0]}   # Rooms already in the offspring, so that checking them takes constant time
         index = 1
 
         valid = True
         # First cycle
-        while None in offspring and valid:
+        while len(placed) < len(offspring) and valid:
             if offspring[index] is None:
-                next_number = parent2[parent1.index(offspring[index - 1])]  # Getting the next value in the cycle
-                if next_number not in offspring:  # Seeing if the value is not already in the offspring
+                next_number = parent2[position1[offspring[index - 1]]]  # Getting the next value in the cycle
+                if next_number not in placed:  # Seeing if the value is not already in the offspring
                     offspring[index] = next_number
+                    placed.add(next_number)
                 else:
                     valid = False  # Terminating the cycle if we find a value that is already in the offspring
             index = (index + 1) % len(parent1)
 
         # Confirming if there are any empty places in the offspring after the first cycle is over
-        if None in offspring:
+        if len(placed) < len(offspring):
             last_index = offspring[offspring.index(parent1[0])]
             if last_index == parent1[0]:  # The last index in the offspring needs to be equal to the first index in parent1
 
                 # Complete the offspring using the remaining bits from parents
-                remaining_bits = [x for x in parent2 if x not in offspring]
+                remaining_bits = iter([x for x in parent2 if x not in placed])
                 for i in range(len(offspring)):
                     if offspring[i] is None:
-                        offspring[i] = remaining_bits.pop(0)  # Assigning the remaining bits to the offspring
+                        offspring[i] = next(remaining_bits)  # Assigning the remaining bits to the offspring
         return offspring
 
     # Calling the function to generate the offspring, with the parents in opposite positions, so that the offspring are
@@ -148,13 +193,13 @@ def improved_cycle_crossover(p1, p2):
     offspring2 = imx(p2, p1)
 
     # Appending room H to the end
-    offspring1.append(7)  # Appending room H at the end
-    offspring2.append(7)
+    offspring1.append(problem.final_room)  # Appending room H at the end
+    offspring2.append(problem.final_room)
 
     return offspring1, offspring2
 
 
-def ordered_crossover(p1, p2):
+def ordered_crossover(p1, p2, problem=DEFAULT_PROBLEM):
     """
     Returns the offspring after applying an ordered crossover.
 
@@ -164,6 +209,8 @@ def ordered_crossover(p1, p2):
                   List representing the first parent.
         parent2 : list
                   List representing the second parent.
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, used to get the final room (room H) and the optional rooms
     Returns:
     --------
         list
@@ -177,8 +224,7 @@ def ordered_crossover(p1, p2):
 
         # Case where one parent has a value of 2 and the other 99: need to be the same values, so we temporarily replace
         # one of them
-        if (2 in parent1 and 99 in parent2) or (99 in parent1 and 2 in parent2):
-            parent1 = absent_room_case(parent1)    # Temporarily altering the value 2 or 99 in parent1
+        parent1 = match_absent_rooms(parent1, parent2, problem)    # Temporarily altering the value 2 or 99 in parent1
 
         offspring = [None] * len(parent1)  # Initializing the offspring with the correct length
 
@@ -186,15 +232,16 @@ def ordered_crossover(p1, p2):
         offspring[crossover_start:crossover_end] = parent1[crossover_start:crossover_end]
 
         # Getting the remaining bits, starting from the end of the crossover points, from p2
-        remaining_bits = [parent2[(crossover_end + i) % len(parent2)]  # %len(p2) is to avoid the index getting out of bounds
-                             for i in range(len(parent2))
-                             if parent2[(crossover_end + i) % len(parent2)] not in offspring]
+        placed = set(offspring)   # Set of the rooms already in the offspring, so that each check takes constant time
+        remaining_bits = iter([parent2[(crossover_end + i) % len(parent2)]  # %len(p2) is to avoid the index getting out of bounds
+                               for i in range(len(parent2))
+                               if parent2[(crossover_end + i) % len(parent2)] not in placed])
 
         ind = crossover_end
 
         for i in range(len(parent1)):
             if offspring[ind] is None:  # Appending the remaining bits to offspring, starting at the crossover end
-                offspring[ind] = remaining_bits.pop(0)
+                offspring[ind] = next(remaining_bits)
 
             ind = (ind + 1) % len(parent1)  # Updating the index and using %len(p1) so that it does not get out of bounds,
             # when it reaches the last value, it returns to the first index
@@ -209,13 +256,13 @@ def ordered_crossover(p1, p2):
     offspring2 = ox(p2, p1, cross_start, cross_end)
 
     # Appending room H to the end
-    offspring1.append(7)
-    offspring2.append(7)
+    offspring1.append(problem.final_room)
+    offspring2.append(problem.final_room)
 
     return offspring1, offspring2
 
 
-def fog_crossover(p1, p2):
+def fog_crossover(p1, p2, problem=DEFAULT_PROBLEM):
     """
     Returns the offspring after applying a fog crossover (created by us). It chooses a random point. After that point,
     the rooms on parent one are copied to the offspring, but one position to the right. The remaining bits are assigned
@@ -227,6 +274,8 @@ def fog_crossover(p1, p2):
             List representing the first parent.
         p2 : list
             List representing the second parent.
+        problem : Problem, default DEFAULT_PROBLEM
+            Definition of the rooms, used to get the final room (room H) and the optional rooms
     Returns:
     --------
         list
@@ -239,8 +288,7 @@ def fog_crossover(p1, p2):
 
         # Case where one parent has a value of 2 and the other 99: need to be the same values, so we temporarily replace
         # one of them
-        if (2 in parent1 and 99 in parent2) or (99 in parent1 and 2 in parent2):
-            parent1 = absent_room_case(parent1)    # Temporarily altering the value 2 or 99 in parent1
+        parent1 = match_absent_rooms(parent1, parent2, problem)    # Temporarily altering the value 2 or 99 in parent1
 
         offspring = [None] * len(parent1)   # Initializing the offspring
 
@@ -249,7 +297,8 @@ def fog_crossover(p1, p2):
         # otherwise it would be out of bounds
 
         # Checking what are the remaining rooms not in the offspring, in the order of parent2
-        remaining_bits = [x for x in parent2 if x not in offspring]
+        placed = set(offspring)   # Set of the rooms already in the offspring, so that each check takes constant time
+        remaining_bits = [x for x in parent2 if x not in placed]
 
         for i in range(len(remaining_bits)):
             if offspring[i] is None:
@@ -266,13 +315,13 @@ def fog_crossover(p1, p2):
     offspring2 = fx(p2, p1)
 
     # Appending room H to the end
-    offspring1.append(7)
-    offspring2.append(7)
+    offspring1.append(problem.final_room)
+    offspring2.append(problem.final_room)
 
     return offspring1, offspring2
 
 
-def slide_crossover(p1, p2):
+def slide_crossover(p1, p2, problem=DEFAULT_PROBLEM):
     """
     Returns the offspring after applying a slide crossover (created by us). Similar to fog crossover.
     A breaking point is chosen. The rooms up to that point on parent1 are put at the end of the offspring. The remaining
@@ -284,6 +333,8 @@ def slide_crossover(p1, p2):
             List representing the first parent.
         p2 : list
             List representing the second parent.
+        problem : Problem, default DEFAULT_PROBLEM
+            Definition of the rooms, used to get the final room (room H) and the optional rooms
     Returns:
     --------
         list
@@ -297,8 +348,7 @@ def slide_crossover(p1, p2):
 
         # Case where one parent has a value of 2 and the other 99: need to be the same values, so we temporarily replace
         # one of them
-        if (2 in parent1 and 99 in parent2) or (99 in parent1 and 2 in parent2):
-            parent1 = absent_room_case(parent1)    # Temporarily altering the value 2 or 99 in parent1
+        parent1 = match_absent_rooms(parent1, parent2, problem)    # Temporarily altering the value 2 or 99 in parent1
 
         offspring = [None] * len(parent1)     # Initializing the offspring with the correct length
 
@@ -306,7 +356,8 @@ def slide_crossover(p1, p2):
         offspring[len(offspring) - break_index:] = parent1[:break_index]
 
         # Checking what are the remaining rooms not in the offspring, in the order of parent2
-        remaining_bits = [x for x in parent2 if x not in offspring]
+        placed = set(offspring)   # Set of the rooms already in the offspring, so that each check takes constant time
+        remaining_bits = [x for x in parent2 if x not in placed]
 
         for i in range(len(remaining_bits)):
             if offspring[i] is None:
@@ -323,7 +374,7 @@ def slide_crossover(p1, p2):
     offspring2 = slide(p2, p1)
 
     # Getting the correct format of the offspring, with 7 (room H) at the end
-    offspring1.append(7)
-    offspring2.append(7)
+    offspring1.append(problem.final_room)
+    offspring2.append(problem.final_room)
 
     return offspring1, offspring2
@@ -0,0 +1,159 @@
+import random
+from base.individual import valid_indiv
+from base.problem import DEFAULT_PROBLEM
+
+
+class LocalSearch:
+    """
+    Improves an individual with 2-opt moves (reversing the rooms between two positions), Or-opt moves (moving a
+    sequence of 1 to 3 rooms to another position) and, when the rule allows it, skipping an optional room (room C).
+    Each move replaces the rooms of a window of positions, so it's scored from the loss of focus around that window
+    only, and it's only accepted if it lowers the loss of focus and the individual still follows the rules (room H last,
+    room A before room F, room C skipped only if room B is right after room F). The first improving move found is
+    applied, and the search starts again, until no move improves the individual or the budget of moves is used up
+    --------
+    Parameters:
+        focus_loss : list
+                List with our data, that has the losses of focus from room to room.
+        max_moves : integer, default 100
+                Maximum number of moves evaluated for each individual
+        share : float, default 1.0
+                Number between 0 and 1 that indicates the probability of the local search being applied to an individual
+        problem : Problem, default DEFAULT_PROBLEM
+                Definition of the rooms and of the rules a valid individual needs to follow
+    """
+
+    def __init__(self, focus_loss, max_moves=100, share=1.0, problem=DEFAULT_PROBLEM):
+        self.focus_loss = focus_loss
+        self.max_moves = max_moves
+        self.share = share
+        self.problem = problem
+        self.moves_evaluated = 0
+        self.improvements = 0
+
+    def __call__(self, individual, changed=None):
+        """
+        Returns the individual after the local search (the list given is not changed). Like the mutators, the ranges of
+        changed positions are appended to changed, if indicated
+        """
+        if self.share < 1 and random.random() >= self.share:
+            return individual
+        return self.improve(individual, changed)
+
+    def improve(self, individual, changed=None):
+        """
+        Applies the local search to an individual, returning a new list. Invalid individuals are returned unchanged
+        --------
+        Parameters:
+            individual : list
+                        List representing an individual, with room H at the end
+            changed : list, default None
+                        If indicated, the (start, end) ranges of the positions changed by each applied move are appended
+        Returns:
+            list
+                Improved individual
+        """
+        individual = list(individual)
+        if not valid_indiv(individual, self.problem):
+            return individual
+        position = self.problem.positions(individual)
+
+        budget = self.max_moves
+        improved = True
+        while improved and budget > 0:
+            improved = False
+            for start, window in self._moves(individual, position):
+                budget -= 1
+                self.moves_evaluated += 1
+                if self._delta(individual, start, window) < -1e-9 and self._valid(individual, position, start, window):
+                    self._apply(individual, position, start, window)
+                    self.improvements += 1
+                    if changed is not None:
+                        changed.append((start, start + len(window) - 1))
+                    improved = True
+                    break
+                if budget == 0:
+                    break
+        return individual
+
+    def _moves(self, individual, position):
+        """
+        Generates every move as (start, window): the rooms from position start are replaced by the ones in window
+        """
+        last = len(individual) - 1   # Position of room H, that is never moved
+
+        # Skipping an optional room, if the room after it would still be right after the room before it
+        for room, (first, second) in self.problem.optional.items():
+            if individual[position[room]] == room and position[second] == position[first] + 1:
+                yield position[room], [self.problem.markers[room]]
+
+        # 2-opt: reversing the rooms between positions i and j
+        for i in range(last):
+            for j in range(i + 1, last):
+                yield i, individual[i:j + 1][::-1]
+
+        # Or-opt: moving the sequence of length rooms that starts at i to after position k, or to before position k
+        for length in (1, 2, 3):
+            for i in range(last - length + 1):
+                sequence = individual[i:i + length]
+                for k in range(i + length, last):
+                    yield i, individual[i + length:k + 1] + sequence
+                for k in range(i):
+                    yield k, sequence + individual[k:i]
+
+    def _delta(self, individual, start, window):
+        """
+        Change in the loss of focus if the rooms from position start are replaced by window
+        """
+        markers = self.problem.room_of
+        end = start + len(window) - 1
+
+        # Extending the window to the closest visited rooms outside of it, since skipped rooms are not part of the path
+        low, high = start - 1, end + 1
+        while low >= 0 and individual[low] in markers:
+            low -= 1
+        while high < len(individual) and individual[high] in markers:
+            high += 1
+        before = individual[max(low, 0):start]
+        after = individual[end + 1:high + 1]
+
+        return self._path_cost(before + window + after) - self._path_cost(individual[max(low, 0):high + 1])
+
+    def _path_cost(self, rooms):
+        focus_loss, markers = self.focus_loss, self.problem.room_of
+        cost = 0
+        previous_room = None
+        for room in rooms:
+            if room in markers:
+                continue
+            if previous_room is not None:
+                cost += focus_loss[previous_room][room]
+            previous_room = room
+        return cost
+
+    def _valid(self, individual, position, start, window):
+        """
+        Checks the rules after the move, using the positions of the rooms in window and the current positions of the
+        others
+        """
+        room_of = self.problem.room_of
+        moved = {room_of.get(room, room): start + offset for offset, room in enumerate(window)}
+
+        def new_position(room):
+            return moved.get(room, position[room])
+
+        for before, after in self.problem.precedence:
+            if new_position(before) > new_position(after):
+                return False
+        for room, (first, second) in self.problem.optional.items():
+            index = new_position(room)
+            value = window[index - start] if start <= index < start + len(window) else individual[index]
+            if value != room and new_position(second) != new_position(first) + 1:
+                return False
+        return True
+
+    def _apply(self, individual, position, start, window):
+        room_of = self.problem.room_of
+        individual[start:start + len(window)] = window
+        for offset, room in enumerate(window):
+            position[room_of.get(room, room)] = start + offset
@@ -1,7 +1,8 @@
 import random
+from base.problem import DEFAULT_PROBLEM
 
 
-def twors_mutation(individual, p_m):
+def twors_mutation(individual, p_m, problem=DEFAULT_PROBLEM, changed=None):
     """
     Returns the offspring after applying an twors mutation. Two random points are selected, and the numbers in
     those positions are switched.
@@ -10,6 +11,13 @@ def twors_mutation(individual, p_m):
     --------
         individual : list
                   List representing the individual.
+        p_m : float
+                  Number between 0 and 1 that indicates the probability of mutation happening
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, used to get the final room (room H)
+        changed : list, default None
+                  If indicated, the (start, end) ranges of positions that were changed are appended to it, so that the
+                  fitness of the offspring can be updated from the changed positions only (see base/delta.py)
     Returns:
     --------
         list
@@ -24,12 +32,15 @@ def twors_mutation(individual, p_m):
         # Swap the values in those positions
         individual[pos1], individual[pos2] = individual[pos2], individual[pos1]
 
+        if changed is not None:
+            changed.extend([(pos1, pos1), (pos2, pos2)])
+
     # Getting the correct format of the offspring, with 7 (room H) at the end
-    individual.append(7)
+    individual.append(problem.final_room)
     return individual
 
 
-def reverse_sequence_mutation(individual, p_m):
+def reverse_sequence_mutation(individual, p_m, problem=DEFAULT_PROBLEM, changed=None):
     """
     Returns the offspring after applying a reverse sequence mutation. We select two random positions and invert the
     elements in between.
@@ -38,6 +49,13 @@ def reverse_sequence_mutation(individual, p_m):
     --------
         individual : list
                   List representing the individual.
+        p_m : float
+                  Number between 0 and 1 that indicates the probability of mutation happening
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, used to get the final room (room H)
+        changed : list, default None
+                  If indicated, the (start, end) ranges of positions that were changed are appended to it, so that the
+                  fitness of the offspring can be updated from the changed positions only (see base/delta.py)
     Returns:
     --------
         list
@@ -54,13 +72,16 @@ def reverse_sequence_mutation(individual, p_m):
         # Updating the individual with the changes
         individual[start_pos:end_pos + 1] = reversed_substring
 
+        if changed is not None:
+            changed.append((start_pos, end_pos))
+
     # Getting the correct format of the offspring, with 7 (room H) at the end
-    individual.append(7)
+    individual.append(problem.final_room)
     return individual
 
 
 # Similar to reverse_sequence_mutation, but with an extra step:
-def inverted_exchange_mutation(individual, p_m):
+def inverted_exchange_mutation(individual, p_m, problem=DEFAULT_PROBLEM, changed=None):
     """
     Returns the offspring after applying an inverted exchange mutation. Two positions are randomly selected and the
     numbers in those positions are inverted. A room is selected from outside the inverted substring and one from inside
@@ -69,6 +90,13 @@ def inverted_exchange_mutation(individual, p_m):
     --------
         individual : list
                   List representing the individual.
+        p_m : float
+                  Number between 0 and 1 that indicates the probability of mutation happening
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, used to get the final room (room H)
+        changed : list, default None
+                  If indicated, the (start, end) ranges of positions that were changed are appended to it, so that the
+                  fitness of the offspring can be updated from the changed positions only (see base/delta.py)
     Returns:
     --------
         list
@@ -86,23 +114,31 @@ def inverted_exchange_mutation(individual, p_m):
         selected_room = random.choice(inverted_substring)
 
         # Determine the rooms outside the inverted substring
-        rooms_outside = [c for c in individual if c not in inverted_substring]
+        inverted_rooms = set(inverted_substring)   # Set, so that checking each room takes constant time
+        rooms_outside = [c for c in individual if c not in inverted_rooms]
 
         if rooms_outside:
             replacement_room = random.choice(rooms_outside)
             # Replace the selected room with a random room outside the inverted substring
             inverted_substring[inverted_substring.index(selected_room)] = replacement_room
-            individual[individual.index(replacement_room)] = selected_room
+            replacement_pos = individual.index(replacement_room)
+            individual[replacement_pos] = selected_room
+
+            if changed is not None:
+                changed.append((replacement_pos, replacement_pos))
 
         for i in range(start_pos, end_pos + 1):
             individual[i] = inverted_substring[i - start_pos]  # Updating the individual with the individual substring
 
+        if changed is not None:
+            changed.append((start_pos, end_pos))
+
     # Getting the correct format of the offspring, with 7 (room H) at the end
-    individual.append(7)
+    individual.append(problem.final_room)
     return individual
 
 
-def partial_shuffle_mutation(individual, p_m):
+def partial_shuffle_mutation(individual, p_m, problem=DEFAULT_PROBLEM, changed=None):
     """
     Returns the offspring after applying a partial shuffle mutation. We select two random points and shuffle the
     elements in between.
@@ -111,6 +147,13 @@ def partial_shuffle_mutation(individual, p_m):
     --------
         individual : list
                   List representing the individual.
+        p_m : float
+                  Number between 0 and 1 that indicates the probability of mutation happening
+        problem : Problem, default DEFAULT_PROBLEM
+                  Definition of the rooms, used to get the final room (room H)
+        changed : list, default None
+                  If indicated, the (start, end) ranges of positions that were changed are appended to it, so that the
+                  fitness of the offspring can be updated from the changed positions only (see base/delta.py)
     Returns:
     --------
         list
@@ -129,6 +172,9 @@ def partial_shuffle_mutation(individual, p_m):
         # Updating the individual with the changes made
         individual[start_pos:end_pos + 1] = substring
 
+        if changed is not None:
+            changed.append((start_pos, end_pos))
+
     # Getting the correct format of the offspring, with 7 (room H) at the end
-    individual.append(7)
+    individual.append(problem.final_room)
     return individual
@@ -1,4 +1,7 @@
+import abc
+import itertools
 import random
+import numpy as np
 
 
 # Defining a function that performs a roulette wheel selection
@@ -23,3 +26,299 @@ def roulette_selection(population, fits):
     # associated with an individual, the more likely it is for him to be chosen
     return random.choices(population, weights=probabilities)[0]
 
+
+
+# The selections below are prepared once per generation (GA calls prepare when the selector has it), so that each
+# parent is then drawn in O(log n) with a binary search, instead of recomputing the probabilities at each call.
+# They can still be called as selector(population, fits), like roulette_selection
+class CumulativeSelection(abc.ABC):
+    """
+    Base class for the selections that draw individuals with fixed weights in a generation. Subclasses only need to
+    define weights(fits)
+    """
+
+    def __init__(self):
+        self.population = None
+        self.cum_weights = None
+
+    @abc.abstractmethod
+    def weights(self, fits):
+        """
+        Returns the weight of each individual, from the list with the fitness of the population
+        """
+
+    def prepare(self, population, fits):
+        """
+        Builds the cumulative weights of the population, once per generation
+        --------
+        Parameters:
+            population : list
+                        Matrix composed of individuals from a population
+            fits : list
+                    List with values of fitness from all individuals in the population
+        Returns:
+            self
+        """
+        self.population = population
+        self.cum_weights = list(itertools.accumulate(self.weights(fits)))
+        return self
+
+    def select(self):
+        """
+        Returns an individual from the prepared population, using a binary search over the cumulative weights
+        """
+        return random.choices(self.population, cum_weights=self.cum_weights)[0]
+
+    def select_indices(self, n, rng):
+        """
+        Returns the indices of n individuals drawn from the prepared population, all at once
+        --------
+        Parameters:
+            n : integer
+                Number of individuals to draw
+            rng : numpy Generator
+                Random number generator
+        Returns:
+            numpy array
+                Indices of the chosen individuals
+        """
+        cum_weights = np.asarray(self.cum_weights)
+        draws = rng.random(n) * cum_weights[-1]
+        return np.minimum(np.searchsorted(cum_weights, draws, side='right'), len(cum_weights) - 1)
+
+    def array_weights(self, fits, out):
+        """
+        Writes the weight of each individual into out, from the array with the fitness of the population. Subclasses
+        can replace it with a version that does not create lists
+        """
+        out[:] = self.weights(fits.tolist())
+
+    def select_into(self, fits, out, rng, workspace):
+        """
+        Draws len(out) individuals from a population given by the array of its fitness, and writes their indices into
+        out, in a random order. It only writes into arrays of the workspace, so that array_GA can select its parents
+        without creating new arrays: instead of a binary search, the cumulative weights and the draws are sorted
+        together (as complex numbers, with the imaginary part placing each weight before an equal draw), so the number
+        of cumulative weights before a draw is the index that select_indices would give for it
+        --------
+        Parameters:
+            fits : numpy array
+                    Fitness of each individual in the population
+            out : numpy array
+                    Integer array where the indices of the chosen individuals are written
+            rng : numpy Generator
+                    Random number generator
+            workspace : Workspace
+                    Arrays to reuse (see base/workspace.py)
+        """
+        n, m = len(fits), len(out)
+        cum_weights = workspace.array('selection_cum_weights', (n,), float)
+        self.array_weights(fits, cum_weights)
+        np.cumsum(cum_weights, out=cum_weights)
+        draws = workspace.array('selection_draws', (m,), float)
+        rng.random(out=draws)
+        draws *= cum_weights[-1]
+
+        merged = workspace.array('selection_merged', (n + m,), complex)
+        merged.real[:n] = cum_weights
+        merged.imag[:n] = 0
+        merged.real[n:] = draws
+        merged.imag[n:] = 1
+        merged.sort()
+
+        # Counting the weights up to each position. The counts of the weights are then moved after those of the draws,
+        # which are already in order
+        is_weight = workspace.array('selection_is_weight', (n + m,), float)
+        np.subtract(1, merged.imag, out=is_weight)
+        counts = workspace.array('selection_counts', (n + m,), float)
+        np.cumsum(is_weight, out=counts)
+        is_weight *= n + 1
+        counts += is_weight
+        counts.sort()
+        np.minimum(counts[:m], n - 1, out=counts[:m])
+        np.copyto(out, counts[:m], casting='unsafe')
+        rng.shuffle(out)   # The draws were sorted, so the chosen individuals are put back in a random order
+
+    def replica_weights(self, fits):
+        """
+        Weights of several populations at once, one row of fits for each. Subclasses can replace it with a vectorized
+        version
+        """
+        return np.array([self.weights(row) for row in fits.tolist()], dtype=float)
+
+    def select_replica_indices(self, fits, n, rng):
+        """
+        Returns the indices of n individuals drawn from each of several populations, with a single binary search: the
+        cumulative weights of each population are normalized to [0, 1] and shifted by its row number, so the rows can be
+        searched as one sorted array
+        --------
+        Parameters:
+            fits : numpy array
+                    (replicas, pop_size) fitness of each population
+            n : integer
+                Number of individuals to draw from each population
+            rng : numpy Generator
+                Random number generator
+        Returns:
+            numpy array
+                (replicas, n) indices of the chosen individuals, in their own population
+        """
+        replicas, pop_size = fits.shape
+        cum_weights = np.cumsum(self.replica_weights(fits), axis=1)
+        offsets = np.arange(replicas)[:, None]
+        flat = (cum_weights / cum_weights[:, -1:] + offsets).ravel()
+        flat[pop_size - 1::pop_size] = offsets[:, 0] + 1   # Exactly the end of each row, despite the rounding
+        draws = rng.random((replicas, n)) + offsets
+        indices = np.searchsorted(flat, draws, side='right') - offsets * pop_size
+        return np.minimum(indices, pop_size - 1)
+
+    def __call__(self, population, fits):
+        return self.prepare(population, fits).select()
+
+
+class RouletteSelection(CumulativeSelection):
+    """
+    Roulette wheel selection, with the same probabilities as roulette_selection. For the same random state, it chooses
+    the same individuals as roulette_selection
+    """
+
+    def weights(self, fits):
+        sum_of_fits = sum(fits)  # Getting the total sum of fitness
+        return [1 - fitness / sum_of_fits for fitness in fits]
+
+    def array_weights(self, fits, out):
+        np.divide(fits, fits.sum(), out=out)
+        np.subtract(1, out, out=out)
+
+    def replica_weights(self, fits):
+        return 1 - fits / fits.sum(axis=1, keepdims=True)
+
+
+class RankSelection(CumulativeSelection):
+    """
+    Linear rank selection: the probability of each individual depends only on its position when the population is
+    sorted by fitness, going linearly from (2 - pressure) / n for the worst to pressure / n for the best
+    --------
+    Parameters:
+        pressure : float, default 1.5
+                Number between 1 (all individuals equally likely) and 2 (the worst individual is never chosen)
+        maximization : Boolean, default False
+                Boolean value to indicate if it's a maximization (True) or minimization (False) problem.
+    """
+
+    def __init__(self, pressure=1.5, maximization=False):
+        super().__init__()
+        if not 1 <= pressure <= 2:
+            raise ValueError('pressure should be between 1 and 2')
+        self.pressure = pressure
+        self.maximization = maximization
+
+    def weights(self, fits):
+        n = len(fits)
+        if n == 1:
+            return [1.0]
+
+        # Sorting from the worst to the best individual, the rank is the position in this order
+        order = sorted(range(n), key=lambda i: fits[i], reverse=not self.maximization)
+        weights = [0.0] * n
+        for rank, i in enumerate(order):
+            weights[i] = (2 - self.pressure) / n + 2 * rank * (self.pressure - 1) / (n * (n - 1))
+        return weights
+
+    def replica_weights(self, fits):
+        n = fits.shape[1]
+        if n == 1:
+            return np.ones(fits.shape)
+        order = np.argsort(fits if self.maximization else -fits, axis=1, kind='stable')
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(n)[None, :].repeat(len(fits), axis=0), axis=1)
+        return (2 - self.pressure) / n + 2 * rank * (self.pressure - 1) / (n * (n - 1))
+
+
+class TournamentSelection:
+    """
+    Tournament selection: size individuals are drawn at random and the best of them is chosen. Each draw costs O(size),
+    whatever the size of the population
+    --------
+    Parameters:
+        size : integer, default 2
+                Number of individuals in each tournament
+        maximization : Boolean, default False
+                Boolean value to indicate if it's a maximization (True) or minimization (False) problem.
+    """
+
+    def __init__(self, size=2, maximization=False):
+        self.size = size
+        self.maximization = maximization
+        self.population = None
+        self.fits = None
+
+    def prepare(self, population, fits):
+        """
+        Keeps the population and its fitness, nothing else needs to be computed for a tournament
+        """
+        self.population = population
+        self.fits = fits
+        return self
+
+    def select(self):
+        """
+        Returns the best of size individuals drawn from the prepared population
+        """
+        n = len(self.population)
+        contestants = [random.randrange(n) for _ in range(self.size)]
+        best = max if self.maximization else min
+        return self.population[best(contestants, key=self.fits.__getitem__)]
+
+    def select_indices(self, n, rng):
+        """
+        Returns the indices of n individuals chosen by tournament, all at once
+        --------
+        Parameters:
+            n : integer
+                Number of individuals to draw
+            rng : numpy Generator
+                Random number generator
+        Returns:
+            numpy array
+                Indices of the chosen individuals
+        """
+        contestants = rng.integers(0, len(self.population), (n, self.size))
+        contestant_fits = np.asarray(self.fits)[contestants]
+        winner = contestant_fits.argmax(axis=1) if self.maximization else contestant_fits.argmin(axis=1)
+        return contestants[np.arange(n), winner]
+
+    def select_into(self, fits, out, rng, workspace):
+        """
+        Chooses len(out) individuals by tournament from a population given by the array of its fitness, and writes their
+        indices into out, using only arrays of the workspace (see CumulativeSelection.select_into)
+        """
+        m = len(out)
+        draws = workspace.array('tournament_draws', (m, self.size), float)
+        rng.random(out=draws)
+        draws *= len(fits)
+        contestants = workspace.array('tournament_contestants', (m, self.size))
+        np.copyto(contestants, draws, casting='unsafe')
+        contestant_fits = workspace.array('tournament_fits', (m, self.size), float)
+        np.take(fits, contestants, out=contestant_fits, mode='clip')
+        winner = workspace.array('tournament_winner', (m,))
+        if self.maximization:
+            np.argmax(contestant_fits, axis=1, out=winner)
+        else:
+            np.argmin(contestant_fits, axis=1, out=winner)
+        winner += workspace.row_starts(m, self.size)
+        np.take(contestants, winner, out=out, mode='clip')
+
+    def select_replica_indices(self, fits, n, rng):
+        """
+        Returns the indices of n individuals chosen by tournament in each of several populations, given as the
+        (replicas, pop_size) array fits
+        """
+        replicas, pop_size = fits.shape
+        contestants = rng.integers(0, pop_size, (replicas, n, self.size))
+        contestant_fits = np.take_along_axis(fits, contestants.reshape(replicas, -1), axis=1).reshape(contestants.shape)
+        winner = contestant_fits.argmax(axis=2) if self.maximization else contestant_fits.argmin(axis=2)
+        return np.take_along_axis(contestants, winner[:, :, None], axis=2)[:, :, 0]
+
+    def __call__(self, population, fits):
+        return self.prepare(population, fits).select()
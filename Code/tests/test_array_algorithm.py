@@ -0,0 +1,53 @@
+import tracemalloc
+import pytest
+from algorithm.array_algorithm import array_GA
+from base.data import random_focus_gen
+from base.individual import calculate_individual_fitness
+from base.initialization import create_feasible_pop
+from base.population import calculate_pop_fit_array
+from operators.batch_crossovers import BATCH_CROSSOVERS
+from operators.batch_mutators import BATCH_MUTATORS
+from operators.selectors import RouletteSelection, TournamentSelection
+
+
+class AllocationProbe:
+    """
+    Termination that never stops the run, and records how much memory each generation needs on top of the memory in
+    use at the end of the previous one
+    """
+
+    def start(self):
+        self.current = None
+        self.peaks = []
+        tracemalloc.start()
+
+    def update(self, it, fits, evaluations, maximization):
+        current, peak = tracemalloc.get_traced_memory()
+        if self.current is not None:
+            self.peaks.append(peak - self.current)
+        self.current = current
+        tracemalloc.reset_peak()
+        return False
+
+
+@pytest.mark.parametrize('crossover, mutator', list(zip(BATCH_CROSSOVERS, list(BATCH_MUTATORS) * 2)))
+@pytest.mark.parametrize('selector', [RouletteSelection, TournamentSelection])
+def test_generations_do_not_allocate_arrays(crossover, mutator, selector):
+    focus_loss = random_focus_gen(seed=1)
+    peaks = {}
+    for pop_size in (100, 4000):
+        probe = AllocationProbe()
+        try:
+            pop, fit_pop = array_GA(create_feasible_pop, calculate_pop_fit_array(focus_loss), False, 8, pop_size,
+                                    selector(), mutator, crossover, 0.8, 0.3, True, False, False, None, seed=1,
+                                    termination=probe)
+        finally:
+            tracemalloc.stop()
+        peaks[pop_size] = max(probe.peaks[1:])   # The workspace is filled in the first generation
+
+        assert fit_pop == [calculate_individual_fitness(individual, focus_loss) for individual in pop]
+
+    # Only a few kilobytes of numpy objects, whatever the size of the population (a single array with one number for
+    # each individual of the larger population already takes 32 kilobytes)
+    assert peaks[4000] < 8 * 1024
+    assert peaks[4000] - peaks[100] < 1024
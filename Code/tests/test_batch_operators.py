@@ -0,0 +1,94 @@
+import contextlib
+import random
+from unittest import mock
+import numpy as np
+import pytest
+import operators.crossovers as crossovers
+from base.data import random_focus_gen
+from base.individual import create_pop, calculate_individual_fitness
+from base.population import encode_pop, decode_pop, score_pop
+from base.problem import Problem
+from base.workspace import Workspace
+from operators.batch_crossovers import batch_pmx_crossover, batch_ordered_crossover, batch_fog_crossover, \
+    batch_slide_crossover, batch_improved_cycle_crossover
+from operators.batch_mutators import BATCH_MUTATORS
+
+
+def as_lists(offspring):
+    rooms, skip = offspring
+    final_room = np.full((len(rooms), 1), 7)
+    return decode_pop(np.hstack([rooms, final_room]), np.hstack([skip, np.zeros(final_room.shape, dtype=bool)]))
+
+
+@pytest.mark.parametrize('crossover, batch_crossover, drawn', [
+    (crossovers.pmx_crossover, batch_pmx_crossover, 'sample'),
+    (crossovers.ordered_crossover, batch_ordered_crossover, 'sample'),
+    (crossovers.fog_crossover, batch_fog_crossover, 'randint'),
+    (crossovers.slide_crossover, batch_slide_crossover, 'randint'),
+    (crossovers.improved_cycle_crossover, batch_improved_cycle_crossover, None)])
+def test_batch_crossovers_match_the_list_versions(crossover, batch_crossover, drawn):
+    random.seed(5)
+    population = create_pop(400)
+    rooms, skip = encode_pop(population)
+    parents1, parents2 = (rooms[0::2, :-1], skip[0::2, :-1]), (rooms[1::2, :-1], skip[1::2, :-1])
+    n_pairs, length = parents1[0].shape
+
+    # The points of each pair are given to the list version through the random function it uses
+    if drawn == 'sample':
+        points = [sorted(random.sample(range(length), 2)) for _ in range(n_pairs)]
+        arguments = tuple(np.array(column) for column in zip(*points))
+    elif drawn == 'randint':
+        points = [random.randint(0, length - 1) for _ in range(n_pairs)]
+        arguments = (np.array(points),)
+    else:
+        points, arguments = [None] * n_pairs, ()
+    expected = []
+    for k, point in enumerate(points):
+        with mock.patch.object(crossovers.random, drawn, return_value=point) if drawn else contextlib.nullcontext():
+            expected.extend(crossover(population[2 * k][:-1], population[2 * k + 1][:-1]))
+
+    # The workspace and the output arrays are used once before, so the values they already have must not matter
+    workspace = Workspace()
+    out = tuple((np.empty((n_pairs, length), dtype=np.int64), np.empty((n_pairs, length), dtype=bool))
+                for _ in range(2))
+    batch_crossover(parents2, parents1, *arguments, out=out, workspace=workspace)
+    offspring1, offspring2 = batch_crossover(parents1, parents2, *arguments, out=out, workspace=workspace)
+
+    offspring = [individual for pair in zip(as_lists(offspring1), as_lists(offspring2)) for individual in pair]
+    assert offspring == expected
+
+
+@pytest.mark.parametrize('mutator', BATCH_MUTATORS.values())
+def test_batch_mutators_only_change_the_marked_rows(mutator):
+    random.seed(1)
+    rooms, skip = encode_pop(create_pop(300))
+    before_rooms, before_skip = rooms.copy(), skip.copy()
+    rng = np.random.default_rng(0)
+    mutate = rng.random(300) < 0.5
+
+    mutator(rooms[:, :-1], skip[:, :-1], mutate, rng, Workspace())
+
+    assert (rooms[~mutate] == before_rooms[~mutate]).all() and (skip[~mutate] == before_skip[~mutate]).all()
+    assert (np.sort(rooms, axis=1) == np.arange(8)).all()
+    assert (rooms[:, -1] == 7).all()
+    assert (rooms[skip] == 2).all() and (skip.sum(axis=1) == before_skip.sum(axis=1)).all()   # Room C keeps its mark
+    assert (rooms[mutate] != before_rooms[mutate]).any(axis=1).mean() > 0.5
+
+
+@pytest.mark.parametrize('problem', [None, Problem(30, precedence=[(0, 5), (3, 20)], optional={2: (5, 1), 9: (4, 8)})])
+def test_score_pop_matches_calculate_individual_fitness(problem):
+    problem_args = {} if problem is None else {'problem': problem}
+    focus_loss = random_focus_gen(**({} if problem is None else {'size': 30, 'problem': problem}), seed=2)
+    random.seed(2)
+    population = create_pop(500, **problem_args)
+    for individual in population[::3]:   # Switching two rooms, which often breaks a rule
+        i, j = random.sample(range(len(individual)), 2)
+        individual[i], individual[j] = individual[j], individual[i]
+    expected = [calculate_individual_fitness(individual, focus_loss, **problem_args) for individual in population]
+
+    rooms, skip = encode_pop(population, **problem_args)
+    workspace, fitness = Workspace(), np.empty(len(population))
+    score_pop(rooms[::-1], skip[::-1], np.asarray(focus_loss), **problem_args, out=fitness, workspace=workspace)
+    score_pop(rooms, skip, np.asarray(focus_loss), **problem_args, out=fitness, workspace=workspace)
+    assert fitness.tolist() == expected
+    assert 0 < expected.count(150) < len(expected)
@@ -0,0 +1,85 @@
+import random
+import pytest
+from base.constraints import ConstraintModel
+from base.data import random_focus_gen
+from base.delta import DeltaFitness
+from base.individual import valid_indiv, calculate_individual_fitness
+from base.problem import DEFAULT_PROBLEM, Problem
+from operators.mutators import twors_mutation, reverse_sequence_mutation, inverted_exchange_mutation, \
+    partial_shuffle_mutation
+
+BIG_PROBLEM = Problem(30, precedence=[(0, 5), (5, 12), (3, 12), (20, 4)], optional={2: (5, 1), 9: (4, 8)})
+
+
+def random_input(problem, rng):
+    """
+    Random list for the repair: a shuffled path (with the optional rooms sometimes skipped), of the wrong length, with
+    repeated rooms, or with values that are not rooms
+    """
+    values = list(range(problem.size))
+    rng.shuffle(values)
+    values = [problem.markers[room] if room in problem.markers and rng.random() < 0.5 else room for room in values]
+    kind = rng.randrange(4)
+    if kind == 1:   # Wrong length
+        values = values[:rng.randrange(problem.size)] if rng.random() < 0.5 else values + values[:rng.randrange(1, 4)]
+    elif kind == 2:   # Repeated rooms
+        for _ in range(rng.randrange(1, 4)):
+            values[rng.randrange(len(values))] = rng.choice(values)
+    elif kind == 3:   # Unknown values
+        for _ in range(rng.randrange(1, 3)):
+            values[rng.randrange(len(values))] = rng.choice([-50, problem.size, problem.size + 5, 'x', None, 2.5])
+    return values
+
+
+def changed_positions(changed):
+    return {index for start, end in changed for index in range(start, end + 1)}
+
+
+@pytest.mark.parametrize('problem, n', [(DEFAULT_PROBLEM, 20000), (BIG_PROBLEM, 5000)])
+def test_repair_always_gives_a_valid_individual(problem, n):
+    rng = random.Random(11)
+    model = ConstraintModel(problem)
+    for _ in range(n):
+        individual = random_input(problem, rng)
+        original = list(individual)
+        valid = valid_indiv(individual, problem)
+        assert model.valid(individual) == valid
+
+        changed = []
+        repaired = model.repair(individual, changed=changed)
+        assert individual == original   # The list given is not changed
+        assert valid_indiv(repaired, problem) and model.valid(repaired)
+        if valid:
+            assert repaired == individual and changed == []
+
+        # Every position that is different is in the changed ranges
+        if len(individual) == problem.size:
+            different = {index for index, (old, new) in enumerate(zip(individual, repaired)) if old != new}
+            assert different <= changed_positions(changed)
+
+
+@pytest.mark.parametrize('problem', [DEFAULT_PROBLEM, BIG_PROBLEM])
+@pytest.mark.parametrize('mutator', [twors_mutation, reverse_sequence_mutation, inverted_exchange_mutation,
+                                     partial_shuffle_mutation])
+def test_changed_ranges_of_mutation_and_repair_update_delta_fitness(problem, mutator):
+    # The ranges of the mutation and of the repair are given together, as GA does, and the fitness of the repaired
+    # offspring is computed from them only
+    random.seed(4)
+    rng = random.Random(4)
+    model = ConstraintModel(problem)
+    focus_loss = random_focus_gen(size=problem.size, seed=4, problem=problem)
+    delta = DeltaFitness(focus_loss, problem)
+    parents = [model.repair(random_input(problem, rng)) for _ in range(300)]
+    delta(parents)
+
+    offspring, changes = [], []
+    for parent in parents:
+        changed = []
+        child = model.repair(mutator(parent[:-1], 1.0, problem=problem, changed=changed), changed=changed)
+        offspring.append(child)
+        changes.append(changed)
+
+    fitness_scores = delta.evaluate_offspring(offspring, parents, changes)
+    assert delta.delta_evaluations == len(offspring)
+    assert fitness_scores == [calculate_individual_fitness(child, focus_loss, problem) for child in offspring]
+    assert problem.penalty not in fitness_scores
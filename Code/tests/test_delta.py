@@ -0,0 +1,76 @@
+import random
+from unittest import mock
+import pytest
+from algorithm.algorithm import GA
+from base.constraints import ConstraintModel
+from base.data import random_focus_gen
+from base.delta import DeltaFitness
+from base.individual import create_pop, calculate_pop_fit
+from base.problem import DEFAULT_PROBLEM, Problem
+from operators.crossovers import pmx_crossover
+from operators.local_search import LocalSearch
+from operators.mutators import twors_mutation, reverse_sequence_mutation, inverted_exchange_mutation, \
+    partial_shuffle_mutation
+from operators.selectors import RouletteSelection
+
+BIG_PROBLEM = Problem(30, precedence=[(0, 5)], optional={2: (5, 1)})
+
+
+class CheckedDelta(DeltaFitness):
+    """
+    DeltaFitness that checks every population it scores against calculate_pop_fit
+    """
+
+    def __init__(self, focus_loss, problem):
+        super().__init__(focus_loss, problem)
+        self.expected = calculate_pop_fit(focus_loss, problem=problem)
+
+    def evaluate_offspring(self, population, parents, changes):
+        fitness_scores = super().evaluate_offspring(population, parents, changes)
+        assert fitness_scores == self.expected(population)
+        return fitness_scores
+
+
+def run(evaluate_population, focus_loss, problem, mutator, with_repair, with_local_search):
+    repair = ConstraintModel(problem) if with_repair else None
+    local_search = LocalSearch(focus_loss, max_moves=20, share=0.5, problem=problem) if with_local_search else None
+    return GA(create_pop, evaluate_population, False, 15, 40, RouletteSelection(), mutator, pmx_crossover, 0.5, 0.9,
+              True, False, False, None, seed=3, problem=problem, repair=repair, local_search=local_search)
+
+
+@pytest.mark.parametrize('problem', [DEFAULT_PROBLEM, BIG_PROBLEM])
+@pytest.mark.parametrize('mutator', [twors_mutation, reverse_sequence_mutation, inverted_exchange_mutation,
+                                     partial_shuffle_mutation])
+@pytest.mark.parametrize('with_repair, with_local_search', [(False, False), (True, False), (False, True), (True, True)])
+def test_delta_fitness_matches_calculate_pop_fit(problem, mutator, with_repair, with_local_search):
+    focus_loss = random_focus_gen(size=problem.size, seed=5, problem=problem)
+    delta = CheckedDelta(focus_loss, problem)
+    result = run(delta, focus_loss, problem, mutator, with_repair, with_local_search)
+    assert delta.delta_evaluations > 0
+
+    # The whole run is the same as with calculate_pop_fit, since every fitness value is the same
+    assert result == run(calculate_pop_fit(focus_loss, problem=problem), focus_loss, problem, mutator, with_repair,
+                         with_local_search)
+
+
+@pytest.mark.parametrize('parent, positions, expected_valid', [
+    ([0, 5, 1, 99, 3, 4, 6, 7], (2, 4), False),   # Room C is skipped, and moving room B away from room F breaks the rule
+    ([0, 5, 4, 99, 3, 1, 6, 7], (2, 5), True),    # Moving room B back after room F makes the individual valid again
+    ([0, 5, 99, 1, 3, 4, 6, 7], (2, 3), True),    # Room B moved after room F across the skipped room C
+    ([0, 3, 5, 1, 99, 4, 6, 7], (1, 2), False),   # Room F moved away from room B, with room C skipped after them
+])
+def test_skipped_room_and_rule_of_rooms_f_and_b(parent, positions, expected_valid):
+    focus_loss = random_focus_gen(seed=7)
+    delta = DeltaFitness(focus_loss)
+    expected = calculate_pop_fit(focus_loss)
+    delta([parent])
+
+    changed = []
+    with mock.patch.object(random, 'random', return_value=0), \
+            mock.patch.object(random, 'sample', return_value=list(positions)):
+        child = twors_mutation(list(parent[:-1]), 1.0, changed=changed)
+
+    fitness, = delta.evaluate_offspring([child], [parent], [changed])
+    assert fitness == expected([child])[0]
+    assert (fitness != DEFAULT_PROBLEM.penalty) == expected_valid
+    assert delta.delta_evaluations == 1
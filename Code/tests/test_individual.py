@@ -0,0 +1,16 @@
+import pytest
+from base.individual import Individual
+
+
+def test_slice_assignment_reads_an_iterator_once():
+    individual = Individual([0, 1, 2, 3, 4, 5, 6, 7])
+    individual[1:4] = iter([99, 1, 3])   # Room C (2) given by its marker, so it's placed and skipped
+    assert individual.tolist() == [0, 99, 1, 3, 4, 5, 6, 7]
+    assert individual.skipped(2)
+
+
+def test_slice_assignment_keeps_the_length():
+    individual = Individual([0, 1, 2, 3, 4, 5, 6, 7])
+    with pytest.raises(ValueError):
+        individual[1:4] = [3, 2]
+    assert individual.tolist() == [0, 1, 2, 3, 4, 5, 6, 7]
@@ -0,0 +1,23 @@
+import numpy as np
+from base.initialization import MAX_ORDERS, feasible_pop_array, precedence_groups
+from base.population import valid_pop
+from base.problem import Problem
+
+
+def test_sampled_orders_follow_the_rules():
+    # Room 5 before 8 others: the group has 8! valid orders, too many to list, so they are sampled. The rule does not
+    # start from the lowest room of the group, so the position of each room needs to be read correctly
+    problem = Problem(12, precedence=[(5, room) for room in (0, 1, 2, 3, 4, 6, 7, 8)])
+    (_, _, orders), = precedence_groups(problem)
+    assert orders is None
+
+    rooms, skip = feasible_pop_array(2000, np.random.default_rng(1), problem)
+    assert valid_pop(rooms, skip, problem).all()
+
+
+def test_listed_orders_follow_the_rules():
+    problem = Problem(10, precedence=[(6, 2), (2, 4), (7, 1)], optional={3: (4, 5)})
+    assert all(orders is not None and len(orders) <= MAX_ORDERS for _, _, orders in precedence_groups(problem))
+
+    rooms, skip = feasible_pop_array(2000, np.random.default_rng(2), problem)
+    assert valid_pop(rooms, skip, problem).all()
@@ -0,0 +1,21 @@
+import pytest
+from algorithm.islands import island_GA
+from base.data import random_focus_gen
+from base.individual import valid_indiv
+
+
+def failing_mutation(individual, p_m, **kwargs):
+    raise ValueError('mutation failed')
+
+
+def test_islands_with_default_operators():
+    best_solution, best_fitness, island_results = island_GA(random_focus_gen(seed=1), 3, 20, 5, seed=1)
+    assert len(island_results) == 3
+    assert valid_indiv(best_solution)
+    assert best_fitness == min(min(fit_pop) for _, fit_pop, _ in island_results)
+
+
+def test_failing_island_stops_the_run():
+    # The other islands wait for the migrants of the failing one, so they need to be stopped for the run to end
+    with pytest.raises(ValueError, match='mutation failed'):
+        island_GA(random_focus_gen(seed=1), [{}, {'mutator': failing_mutation, 'p_m': 1.0}, {}], 20, 5, seed=1)
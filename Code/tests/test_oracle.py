@@ -0,0 +1,22 @@
+from algorithm.grid_search import grid_tasks, run_grid
+from base import oracle
+from base.data import random_focus_gen
+from operators.crossovers import pmx_crossover
+from operators.mutators import twors_mutation
+
+
+def test_exact_solutions_are_bounded(monkeypatch):
+    monkeypatch.setattr(oracle, 'EXACT_CACHE_SIZE', 3)
+    oracle._exact_solutions.clear()
+    for seed in range(5):
+        oracle.solve_exact(random_focus_gen(seed=seed))
+    assert len(oracle._exact_solutions) == 3
+
+
+def test_exact_tasks_skip_the_ga():
+    tasks = grid_tasks([1], [50], [0.1], [0.9], [pmx_crossover], [twors_mutation], [100])
+    exact, = run_grid(tasks, workers=1, exact=True)
+    ga, = run_grid(tasks, workers=1)
+    assert exact.reason == 'exact' and exact.evaluations == 2880
+    assert exact.best_fitness <= ga.best_fitness
+    assert exact.best_fitness == oracle.solve_exact(random_focus_gen(seed=1))[1]
@@ -0,0 +1,18 @@
+import multiprocessing
+import random
+from base.data import random_focus_gen
+from base.individual import create_pop
+from base.population import calculate_pop_fit_array
+from base.shared import SharedEvaluator
+
+
+def test_spawned_workers_keep_the_matrix_while_buffers_grow():
+    # Each new size makes the buffers grow, so the workers attach many new blocks. With spawn, the matrix is attached in
+    # the same way, and needs to stay usable
+    focus_loss = random_focus_gen(seed=1)
+    expected = calculate_pop_fit_array(focus_loss)
+    random.seed(0)
+    with SharedEvaluator(focus_loss, workers=1, mp_context=multiprocessing.get_context('spawn')) as evaluate_population:
+        for pop_size in [2 ** exponent for exponent in range(10)]:
+            population = create_pop(pop_size)
+            assert evaluate_population(population) == expected(population)